@@ -0,0 +1,199 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from urllib3.util.retry import Retry
+
+API_BASE = os.getenv("API_BASE", "http://localhost:8000")
+# How long GET responses are reused across reruns and sessions
+CACHE_TTL_SECONDS = int(os.getenv("API_CACHE_TTL", "60"))
+# (connect, read) timeouts in seconds
+REQUEST_TIMEOUT = (3.05, 60)
+MAX_PARALLEL_REQUESTS = 8
+# Responses kept for If-None-Match revalidation after their cache entry expires
+MAX_VALIDATORS = 256
+# Listings the API serves from secondaries. For this long after a session's
+# own write they are requested with fresh=true, i.e. from the primary, so the
+# saved record shows up (match the API's MONGO_SEARCH_MAX_STALENESS_SECONDS)
+FRESH_PATHS = ("/cases/", "/reports/", "/victims/")
+FRESH_AFTER_WRITE_SECONDS = int(os.getenv("API_FRESH_AFTER_WRITE", "90"))
+LAST_WRITE_KEY = "api_last_write"
+
+
+@dataclass
+class ApiResult:
+    """The parts of a response the UI uses; picklable so it can be cached"""
+
+    status_code: int
+    text: str
+    data: Any = None
+    etag: Optional[str] = None
+    # Cursor for the next page of keyset-paginated listings
+    next_after: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self) -> Any:
+        return self.data
+
+
+class _RequestFailed(Exception):
+    """Raised inside cached calls so error responses are never cached"""
+
+    def __init__(self, result: ApiResult):
+        self.result = result
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One keep-alive connection pool shared by every Streamlit session"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=32,
+        # Idempotent reads are retried on connection errors and 502/503/504
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _to_result(response: requests.Response) -> ApiResult:
+    try:
+        data = response.json()
+    except ValueError:
+        data = None
+    return ApiResult(
+        response.status_code, response.text, data,
+        response.headers.get("ETag"), response.headers.get("X-Next-After"),
+    )
+
+
+def request(method: str, path: str, token: Optional[str] = None, **kwargs) -> ApiResult:
+    """Send a request through the shared session; writes clear the GET cache"""
+    headers = kwargs.pop("headers", {})
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    try:
+        response = get_session().request(
+            method, f"{API_BASE}{path}", headers=headers, timeout=REQUEST_TIMEOUT, **kwargs
+        )
+    except requests.RequestException as e:
+        return ApiResult(503, f"API unavailable: {e}")
+    # A 412 means our cached copy is stale, so it is cleared as well
+    if method != "GET" and (response.ok or response.status_code == 412):
+        _cached_get.clear()
+        if response.ok:
+            _note_write()
+    return _to_result(response)
+
+
+def _note_write() -> None:
+    # Outside a script run (e.g. a plain thread) there is no session to mark
+    if get_script_run_ctx() is not None:
+        st.session_state[LAST_WRITE_KEY] = time.monotonic()
+
+
+def _wrote_recently() -> bool:
+    if get_script_run_ctx() is None or LAST_WRITE_KEY not in st.session_state:
+        return False
+    return time.monotonic() - st.session_state[LAST_WRITE_KEY] < FRESH_AFTER_WRITE_SECONDS
+
+
+_validators: "OrderedDict[tuple, ApiResult]" = OrderedDict()
+_validators_lock = threading.Lock()
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def _cached_get(path: str, params: Tuple[Tuple[str, Any], ...], token: Optional[str]) -> ApiResult:
+    # Revalidate the last response instead of downloading it again; the API
+    # answers 304 with no body while the data behind it is unchanged
+    key = (path, params, token)
+    with _validators_lock:
+        previous = _validators.get(key)
+    headers = {"If-None-Match": previous.etag} if previous else {}
+    result = request("GET", path, token=token, params=list(params), headers=headers)
+    if result.status_code == 304 and previous:
+        return previous
+    if not result.ok:
+        raise _RequestFailed(result)
+    if result.etag:
+        with _validators_lock:
+            _validators[key] = result
+            _validators.move_to_end(key)
+            while len(_validators) > MAX_VALIDATORS:
+                _validators.popitem(last=False)
+    return result
+
+
+def get(path: str, params: Optional[Dict[str, Any]] = None, token: Optional[str] = None, cache: bool = True) -> ApiResult:
+    """GET a read endpoint, reusing a cached response for CACHE_TTL_SECONDS"""
+    if path in FRESH_PATHS and _wrote_recently():
+        params = {**(params or {}), "fresh": "true"}
+    if not cache:
+        return request("GET", path, token=token, params=params)
+    items = tuple(sorted((k, v) for k, v in (params or {}).items() if v is not None))
+    try:
+        return _cached_get(path, items, token)
+    except _RequestFailed as e:
+        return e.result
+
+
+def download(path: str, token: Optional[str] = None) -> Optional[bytes]:
+    """Raw response body of a file endpoint, or None if the request failed"""
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    try:
+        response = get_session().get(f"{API_BASE}{path}", headers=headers, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException:
+        return None
+    return response.content if response.ok else None
+
+
+def post(path: str, token: Optional[str] = None, **kwargs) -> ApiResult:
+    return request("POST", path, token=token, **kwargs)
+
+
+def patch(path: str, token: Optional[str] = None, **kwargs) -> ApiResult:
+    return request("PATCH", path, token=token, **kwargs)
+
+
+def delete(path: str, token: Optional[str] = None, **kwargs) -> ApiResult:
+    return request("DELETE", path, token=token, **kwargs)
+
+
+_executor = ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS, thread_name_prefix="api")
+_executor_lock = threading.Lock()
+
+
+def fetch_all(calls: Dict[str, Tuple[str, Optional[Dict[str, Any]]]], token: Optional[str] = None) -> Dict[str, ApiResult]:
+    """Run independent GETs concurrently; returns results under the same keys
+
+    Page render time is then bounded by the slowest call instead of the sum.
+    """
+    ctx = get_script_run_ctx()
+
+    def run(path, params):
+        # Cached functions look up the session's script context
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return get(path, params, token=token)
+
+    with _executor_lock:
+        futures = {name: _executor.submit(run, path, params) for name, (path, params) in calls.items()}
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,127 @@
+"""Import-time profile of the API (or any module).
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters and
+summarises the slowest imports by cumulative and self time, plus the total
+wall-clock time to import. Use it to check that worker boot stays fast:
+
+    python benchmarks/importtime.py                   # profile main
+    python benchmarks/importtime.py --module streamlit_app --top 30
+    python benchmarks/importtime.py --json > bench/importtime.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+# Heavy optional dependencies that should not be loaded just by importing the app
+WATCHED = ["pandas", "pyarrow", "numpy", "scipy", "statsmodels", "fpdf", "folium", "streamlit"]
+
+
+def profile_once(module: str) -> dict:
+    """Import `module` in a fresh interpreter and parse the -X importtime log"""
+    code = f"import sys, {module}; print(','.join(m for m in {WATCHED!r} if m in sys.modules))"
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    imports: Dict[str, dict] = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports[name] = {
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": len(indent) // 2,
+            }
+    loaded = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ""
+    return {
+        "wall_ms": wall * 1000,
+        "imports": imports,
+        "heavy_modules_loaded": [m for m in loaded.split(",") if m],
+    }
+
+
+def summarize(module: str, repeat: int, top: int) -> dict:
+    runs = [profile_once(module) for _ in range(repeat)]
+    # Per-module minimum over runs filters out disk cache and scheduling noise
+    names = set().union(*(run["imports"] for run in runs))
+    merged = {}
+    for name in names:
+        samples = [run["imports"][name] for run in runs if name in run["imports"]]
+        merged[name] = {
+            "self_ms": round(min(s["self_ms"] for s in samples), 3),
+            "cumulative_ms": round(min(s["cumulative_ms"] for s in samples), 3),
+            "depth": samples[0]["depth"],
+        }
+
+    def ranked(key: str) -> List[dict]:
+        rows = sorted(merged.items(), key=lambda item: item[1][key], reverse=True)[:top]
+        return [{"module": name, **stats} for name, stats in rows]
+
+    # Self time summed per top-level package
+    packages: Dict[str, float] = {}
+    for name, stats in merged.items():
+        if name == module:
+            continue
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0.0) + stats["self_ms"]
+
+    return {
+        "module": module,
+        "python": sys.version.split()[0],
+        "repeat": repeat,
+        "wall_ms": round(min(run["wall_ms"] for run in runs), 1),
+        "import_ms": merged.get(module, {}).get("cumulative_ms"),
+        "modules_imported": len(merged),
+        "heavy_modules_loaded": runs[0]["heavy_modules_loaded"],
+        "by_cumulative": ranked("cumulative_ms"),
+        "by_self": ranked("self_ms"),
+        "by_package": [
+            {"package": name, "self_ms": round(ms, 3)}
+            for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        ],
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"import {report['module']}: {report['import_ms']:.1f} ms "
+          f"({report['modules_imported']} modules, interpreter wall {report['wall_ms']:.0f} ms, best of {report['repeat']})")
+    heavy = report["heavy_modules_loaded"]
+    print(f"heavy modules loaded at import: {', '.join(heavy) if heavy else 'none'}\n")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for row in report["by_cumulative"]:
+        print(f"{row['cumulative_ms']:>14.1f} {row['self_ms']:>9.1f}  {'  ' * row['depth']}{row['module']}")
+    print(f"\n{'self ms':>14}  package (sum of self time)")
+    for row in report["by_package"]:
+        print(f"{row['self_ms']:>14.1f}  {row['package']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    report = summarize(args.module, args.repeat, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,633 @@
+"""Reproducible API benchmarks.
+
+Runs the FastAPI app in-process (uvicorn on a background thread) against a
+local mongod or mongomock, seeds a synthetic dataset of each requested size,
+and drives every route in routers/ at each concurrency level. Results
+(p50/p95/p99 latency, throughput, error counts and per-scenario RSS) are written as
+JSON; --compare flags regressions between two result files.
+
+    python benchmarks/run_benchmarks.py --backend mongod --sizes 1000 10000 \
+        --concurrency 1 8 32 --requests 500 --output bench/after.json
+    python benchmarks/run_benchmarks.py --compare bench/before.json bench/after.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+BENCH_USER = "bench-admin"
+# Archival jobs only scan for candidates; no seeded case is this old
+ARCHIVE_NOTHING_DAYS = 36500
+# Smaller differences in a scenario's RSS growth are allocator noise
+MEMORY_NOISE_MB = 10
+
+
+# === Scenarios ===
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    route: str  # route template as registered, e.g. "/cases/{case_id}"
+    request: Callable[["Fixtures", int], Optional[dict]]  # -> kwargs for Session.request
+    # Scenarios that consume documents run after all read scenarios
+    destructive: bool = False
+    # Runs once before the scenario is timed, e.g. to create what it reads
+    setup: Optional[Callable[["Fixtures"], None]] = None
+
+
+class Fixtures:
+    """Identifiers sampled from the seeded dataset, shared by all scenarios"""
+
+    def __init__(self, database, seed: int):
+        rng = random.Random(seed)
+
+        def sample(collection, field_name, n=2000):
+            values = [d[field_name] for d in database[collection].find({}, {field_name: 1}).limit(20000)]
+            rng.shuffle(values)
+            return values[:n]
+
+        self.case_ids = sample("cases", "case_id")
+        self.case_oids = [str(v) for v in sample("cases", "_id")]
+        self.report_oids = [str(v) for v in sample("incident_reports", "_id")]
+        self.report_ids = sample("incident_reports", "report_id")
+        self.victim_ids = [str(v) for v in sample("individuals", "_id")]
+        self.linked_case_oids = [
+            str(v) for d in database["individuals"].find({"cases_involved.0": {"$exists": True}}, {"cases_involved": 1}).limit(2000)
+            for v in d["cases_involved"][:1]
+        ] or self.case_oids
+        self.countries = sorted(database["cases"].distinct("location.country")) or ["Palestine"]
+
+        # Destructive scenarios each get disjoint documents
+        self._pools: Dict[str, List[str]] = {
+            "cases": list(reversed(self.case_ids)),
+            "reports": list(reversed(self.report_ids)),
+            "victims": list(reversed(self.victim_ids)),
+        }
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._pdf_job_id: Optional[str] = None
+        self._archive_job_id: Optional[str] = None
+
+    def pick(self, values: list, i: int):
+        return values[i % len(values)]
+
+    def take(self, pool: str) -> Optional[str]:
+        with self._lock:
+            return self._pools[pool].pop() if self._pools[pool] else None
+
+    def unique(self) -> int:
+        return next(self._counter)
+
+    def pdf_job_id(self) -> str:
+        """One PDF job, submitted on first use and awaited, for the status and download scenarios"""
+        from services import pdf_reports
+
+        with self._lock:
+            if self._pdf_job_id is None:
+                job = pdf_reports.submit("reports", {"country": self.countries[0]})
+                deadline = time.monotonic() + 120
+                while job["status"] == "pending" and time.monotonic() < deadline:
+                    time.sleep(0.2)
+                    job = pdf_reports.get_job(job["_id"])
+                self._pdf_job_id = job["_id"]
+            return self._pdf_job_id
+
+    def archive_job_id(self) -> str:
+        """A finished archival job with nothing to move, for the job status scenario"""
+        from services import archival
+
+        with self._lock:
+            if self._archive_job_id is None:
+                job = archival.start_job(ARCHIVE_NOTHING_DAYS, 500, BENCH_USER)
+                archival.run_job(job["_id"])
+                self._archive_job_id = job["_id"]
+            return self._archive_job_id
+
+
+def _case_payload(fx: Fixtures, i: int) -> dict:
+    n = fx.unique()
+    case = {
+        "case_id": f"HRM-BENCH-{os.getpid()}-{n}",
+        "title": f"Benchmark case {n}",
+        "description": "Created by the benchmark harness.",
+        "violation_types": ["arbitrary_detention"],
+        "status": "new",
+        "priority": "medium",
+        "location": {"country": fx.pick(fx.countries, i), "region": None,
+                     "coordinates": {"type": "Point", "coordinates": [35.2, 31.9]}},
+        "date_occurred": "2025-01-01T00:00:00",
+        "date_reported": "2025-01-02T00:00:00",
+        "created_by": BENCH_USER,
+    }
+    return {"data": {"case": json.dumps(case)}}
+
+
+def _report_payload(fx: Fixtures, i: int) -> dict:
+    n = fx.unique()
+    return {
+        "data": {
+            "report_id": f"IR-BENCH-{os.getpid()}-{n}",
+            "reporter_type": "witness",
+            "anonymous": "true",
+            "date": "2025-01-01",
+            "country": fx.pick(fx.countries, i),
+            "city": "Benchmark",
+            "lat": "31.9",
+            "lon": "35.2",
+            "description": "Created by the benchmark harness.",
+            "violation_types_str": "arbitrary_detention,torture",
+        }
+    }
+
+
+def _victim_payload(fx: Fixtures, i: int) -> dict:
+    return {
+        "json": {
+            "type": "victim",
+            "anonymous": False,
+            "pseudonym": f"Bench-{fx.unique()}",
+            "contact_info": {"email": "bench@example.org", "phone": "+970000000", "preferred_contact": "email"},
+            "risk_assessment": {"level": "medium", "threats": ["intimidation"], "protection_needed": False},
+        }
+    }
+
+
+def _cycle(values: list, i: int, n: int) -> str:
+    # Successive updates to the same document always change its value
+    return values[(i // max(n, 1)) % len(values)]
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("root", "GET", "/", lambda fx, i: {}),
+    # Cases
+    Scenario("cases.list", "GET", "/cases/", lambda fx, i: {}),
+    Scenario("cases.list_filtered", "GET", "/cases/", lambda fx, i: {"params": {"status": "new", "country": fx.pick(fx.countries, i)}}),
+    Scenario("cases.get", "GET", "/cases/{case_id}", lambda fx, i: {"path": {"case_id": fx.pick(fx.case_ids, i)}}),
+    Scenario("cases.create", "POST", "/cases/", _case_payload),
+    Scenario("cases.update_status", "PATCH", "/cases/{case_id}", lambda fx, i: {
+        "path": {"case_id": fx.pick(fx.case_ids, i)},
+        "params": {"status": _cycle(["under_investigation", "resolved", "new"], i, len(fx.case_ids))}}),
+    Scenario("cases.bulk_status", "POST", "/cases/bulk-status", lambda fx, i: {
+        "json": {"case_ids": [fx.pick(fx.case_ids, i * 50 + k) for k in range(50)],
+                 "status": _cycle(["under_investigation", "resolved", "new"], i * 50, len(fx.case_ids))}}),
+    Scenario("cases.archive", "DELETE", "/cases/{case_id}", lambda fx, i: (
+        {"path": {"case_id": fx.take("cases")}} if fx._pools["cases"] else None), destructive=True),
+    # Reports
+    Scenario("reports.list", "GET", "/reports/", lambda fx, i: {"params": {"country": fx.pick(fx.countries, i)}}),
+    Scenario("reports.create", "POST", "/reports/", _report_payload),
+    Scenario("reports.update_status", "PATCH", "/reports/{report_id}", lambda fx, i: {
+        "path": {"report_id": fx.pick(fx.report_oids, i)},
+        "params": {"status": _cycle(["under_review", "verified", "rejected"], i, len(fx.report_oids))}}),
+    Scenario("reports.delete", "DELETE", "/reports/{report_id}", lambda fx, i: (
+        {"path": {"report_id": fx.take("reports")}} if fx._pools["reports"] else None), destructive=True),
+    Scenario("reports.analytics", "GET", "/reports/analytics", lambda fx, i: {}),
+    Scenario("reports.timeline", "GET", "/reports/analytics/timeline", lambda fx, i: {"params": {"time_period": "week"}}),
+    Scenario("reports.geodata", "GET", "/reports/analytics/geodata", lambda fx, i: {}),
+    # Identical requests share one cached file, so this mostly measures the cache lookup
+    Scenario("reports.pdf_request", "POST", "/reports/pdf", lambda fx, i: {
+        "json": {"dataset": "reports", "filters": {"country": fx.pick(fx.countries, i)}}}),
+    Scenario("reports.pdf_status", "GET", "/reports/pdf/{job_id}", lambda fx, i: {"path": {"job_id": fx.pdf_job_id()}},
+             setup=Fixtures.pdf_job_id),
+    Scenario("reports.pdf_download", "GET", "/reports/pdf/{job_id}/download", lambda fx, i: {"path": {"job_id": fx.pdf_job_id()}},
+             setup=Fixtures.pdf_job_id),
+    # Analytics
+    Scenario("analytics.violations", "GET", "/analytics/violations", lambda fx, i: {"params": {"source": ("reports", "cases")[i % 2]}}),
+    Scenario("analytics.timeline", "GET", "/analytics/timeline", lambda fx, i: {"params": {"time_period": "month"}}),
+    Scenario("analytics.geodata", "GET", "/analytics/geodata", lambda fx, i: {"params": {"source": ("reports", "cases")[i % 2]}}),
+    Scenario("analytics.geodata_clusters", "GET", "/analytics/geodata/clusters", lambda fx, i: {
+        "params": {"source": ("reports", "cases")[i % 2], "cell": 1.0}}),
+    Scenario("analytics.summary", "GET", "/analytics/summary", lambda fx, i: {}),
+    Scenario("analytics.cube", "GET", "/analytics/cube", lambda fx, i: {"params": {"by": ["violation_type", "country"]}}),
+    Scenario("analytics.crosstab", "GET", "/analytics/crosstab", lambda fx, i: {"params": {"rows": ["violation_type"], "columns": "country"}}),
+    Scenario("analytics.percentiles", "GET", "/analytics/percentiles", lambda fx, i: {"params": {"by": ["country"]}}),
+    Scenario("analytics.trends", "GET", "/analytics/trends", lambda fx, i: {"params": {"period": "week"}}),
+    Scenario("analytics.snapshot", "GET", "/analytics/snapshot", lambda fx, i: {}),
+    Scenario("analytics.snapshot_refresh", "POST", "/analytics/snapshot/refresh", lambda fx, i: {}),
+    # Geospatial
+    Scenario("geo.near", "GET", "/geo/near", lambda fx, i: {"params": {"lat": 31.9, "lon": 35.2, "radius_km": 50}}),
+    Scenario("geo.within", "GET", "/geo/within", lambda fx, i: {"params": {"bbox": "34.2,29.4,35.9,33.4"}}),
+    Scenario("cases.nearby", "GET", "/cases/{case_id}/nearby", lambda fx, i: {"path": {"case_id": fx.pick(fx.case_ids, i)}}),
+    # Exports
+    Scenario("exports.cases", "GET", "/exports/cases", lambda fx, i: {"params": {"format": "arrow"}}),
+    Scenario("exports.reports", "GET", "/exports/reports", lambda fx, i: {"params": {"format": "parquet"}}),
+    Scenario("exports.status_history", "GET", "/exports/status-history", lambda fx, i: {"params": {"format": "arrow"}}),
+    Scenario("exports.risk_assessments", "GET", "/exports/risk-assessments", lambda fx, i: {"params": {"format": "arrow"}}),
+    # Administration
+    Scenario("admin.slow_queries", "GET", "/admin/slow-queries", lambda fx, i: {}),
+    Scenario("admin.archive_start", "POST", "/admin/archive", lambda fx, i: {"params": {"older_than_days": ARCHIVE_NOTHING_DAYS}}),
+    Scenario("admin.archive_job", "GET", "/admin/archive/{job_id}", lambda fx, i: {"path": {"job_id": fx.archive_job_id()}},
+             setup=Fixtures.archive_job_id),
+    # Authentication
+    Scenario("auth.login", "POST", "/auth/login", lambda fx, i: {"auth": (BENCH_USER, BENCH_USER)}),
+    # Victims
+    Scenario("victims.create", "POST", "/victims/", _victim_payload),
+    Scenario("victims.bulk_create", "POST", "/victims/bulk", lambda fx, i: {
+        "json": [_victim_payload(fx, i)["json"] for _ in range(100)]}),
+    Scenario("victims.list", "GET", "/victims/", lambda fx, i: {}),
+    Scenario("victims.get", "GET", "/victims/{victim_id}", lambda fx, i: {"path": {"victim_id": fx.pick(fx.victim_ids, i)}}),
+    Scenario("victims.update", "PATCH", "/victims/{victim_id}", lambda fx, i: {
+        "path": {"victim_id": fx.pick(fx.victim_ids, i)},
+        "json": {"risk_assessment": {"level": _cycle(["high", "medium", "low"], i, len(fx.victim_ids))}}}),
+    Scenario("victims.by_case", "GET", "/victims/case/{case_id}", lambda fx, i: {"path": {"case_id": fx.pick(fx.linked_case_oids, i)}}),
+    Scenario("victims.risk_history", "GET", "/victims/{victim_id}/risk-history", lambda fx, i: {"path": {"victim_id": fx.pick(fx.victim_ids, i)}}),
+    Scenario("victims.watchlist", "GET", "/victims/watchlist", lambda fx, i: {"params": {"limit": 50}}),
+    Scenario("victims.risk_escalations", "GET", "/victims/risk/escalations", lambda fx, i: {"params": {"weeks": 26}}),
+    Scenario("victims.risk_time_at_high", "GET", "/victims/risk/time-at-high", lambda fx, i: {"params": {"days": 365}}),
+    Scenario("victims.risk_rising", "GET", "/victims/risk/rising", lambda fx, i: {"params": {"days": 90}}),
+    Scenario("victims.delete", "DELETE", "/victims/{victim_id}", lambda fx, i: (
+        {"path": {"victim_id": fx.take("victims")}} if fx._pools["victims"] else None), destructive=True),
+]
+
+
+def uncovered_routes(app) -> List[str]:
+    """Routes declared in routers/ that no scenario exercises"""
+    from fastapi.routing import APIRoute
+
+    covered = {(s.method, s.route) for s in SCENARIOS}
+    missing = []
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or not route.endpoint.__module__.startswith("routers."):
+            continue
+        for method in route.methods:
+            if (method, route.path) not in covered:
+                missing.append(f"{method} {route.path}")
+    return sorted(missing)
+
+
+# === Environment ===
+def configure_backend(backend: str, mongodb_url: str, database: str) -> None:
+    """Point db.py at the benchmark database; must run before the app is imported"""
+    os.environ["MONGODB_URL"] = mongodb_url
+    os.environ["DATABASE_NAME"] = database
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    if not os.environ.get("ENCRYPTION_KEY"):
+        from cryptography.fernet import Fernet
+
+        os.environ["ENCRYPTION_KEY"] = Fernet.generate_key().decode()
+    if backend == "mongomock":
+        import mongomock
+        import pymongo
+
+        pymongo.MongoClient = mongomock.MongoClient
+        _accept_bulk_sort(mongomock.collection.BulkOperationBuilder)
+
+
+def _accept_bulk_sort(builder) -> None:
+    """pymongo passes `sort` to bulk update and replace operations; mongomock predates it"""
+    import inspect
+
+    for name in ("add_update", "add_replace"):
+        original = getattr(builder, name)
+        if "sort" in inspect.signature(original).parameters:
+            continue
+
+        def accept_sort(self, *args, sort=None, _original=original, **kwargs):
+            return _original(self, *args, **kwargs)
+
+        setattr(builder, name, accept_sort)
+
+
+def seed_dataset(backend: str, database, size: int, seed: int, workers: int) -> None:
+    """Drop the benchmark database and load `size` cases (2x reports, 0.5x individuals)"""
+    import generate_synthetic_data as synthetic
+
+    database.client.drop_database(database.name)
+    counts = {"cases": size, "incident_reports": size * 2, "individuals": max(size // 2, 1)}
+    if backend == "mongod":
+        synthetic.generate(
+            cases=counts["cases"], reports=counts["incident_reports"], individuals=counts["individuals"],
+            seed=seed, workers=workers, evidence_files=0,
+            mongodb_url=os.environ["MONGODB_URL"], database_name=database.name,
+        )
+        return
+    # mongomock lives in this process, so generate in-process
+    batch = 5000
+    options = {"evidence_files": [], "evidence_fraction": 0.0, "case_count": size, "batch_size": batch,
+               "dry_run": False, "validate_all": False}
+    for kind, total in counts.items():
+        for chunk_index, start in enumerate(range(0, total, batch)):
+            rng = np.random.default_rng([seed, synthetic.KIND_IDS[kind], chunk_index])
+            documents = synthetic.BUILDERS[kind](rng, seed, start, min(batch, total - start), options)
+            for name, docs in documents.items():
+                if docs:
+                    database[name].insert_many(docs, ordered=False)
+
+
+def create_bench_user(database) -> str:
+    from security.auth import create_access_token, get_password_hash
+
+    database["users"].update_one(
+        {"username": BENCH_USER},
+        {"$set": {
+            "username": BENCH_USER,
+            "email": "bench@example.org",
+            "roles": ["admin", "case_manager", "analyst", "viewer"],
+            "is_active": True,
+            "hashed_password": get_password_hash(BENCH_USER),
+        }},
+        upsert=True,
+    )
+    return create_access_token({"sub": BENCH_USER})
+
+
+def start_server(app):
+    import uvicorn
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False))
+    thread = threading.Thread(target=server.run, name="bench-server", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Benchmark server failed to start")
+        time.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS of the whole process so far"""
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def current_rss_mb() -> Optional[float]:
+    """RSS right now; None where neither /proc nor psutil is available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / (1024 * 1024)
+    except OSError:
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+class RssSampler:
+    """Highest RSS seen while a scenario runs, sampled on a background thread
+
+    ru_maxrss only ever grows across scenarios, so it cannot attribute memory
+    to one route; the peak here is relative to this scenario's own run.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.baseline: Optional[float] = None
+        self.peak: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _sample(self) -> None:
+        rss = current_rss_mb()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "RssSampler":
+        self.baseline = current_rss_mb()
+        self.peak = self.baseline
+        if self.baseline is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._thread.is_alive():
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+
+
+# === Measurement ===
+def run_scenario(base_url: str, token: str, scenario: Scenario, fx: Fixtures,
+                 requests_count: int, concurrency: int, warmup: int) -> dict:
+    local = threading.local()
+
+    def session() -> requests.Session:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+            local.session.headers["Authorization"] = f"Bearer {token}"
+        return local.session
+
+    def call(i: int):
+        kwargs = scenario.request(fx, i)
+        if kwargs is None:
+            return None
+        path = scenario.route.format(**kwargs.pop("path", {}))
+        if "auth" in kwargs:
+            kwargs["headers"] = {"Authorization": None}  # Basic auth only
+        started = time.perf_counter()
+        try:
+            response = session().request(scenario.method, base_url + path, timeout=300, **kwargs)
+        except requests.RequestException as e:
+            # Unhandled server exceptions drop the connection; count them as errors
+            local.__dict__.pop("session", None)
+            return time.perf_counter() - started, 599, 0, str(e)[:200]
+        elapsed = time.perf_counter() - started
+        return elapsed, response.status_code, len(response.content), (response.text[:200] if response.status_code >= 400 else None)
+
+    if scenario.setup:
+        scenario.setup(fx)
+    with RssSampler() as rss, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, range(warmup)))
+        started = time.perf_counter()
+        outcomes = [o for o in pool.map(call, range(warmup, warmup + requests_count)) if o is not None]
+        wall = time.perf_counter() - started
+
+    if not outcomes:
+        return {"requests": 0, "skipped": True}
+    latencies = np.array([o[0] for o in outcomes]) * 1000
+    errors = [o for o in outcomes if o[1] >= 400]
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    result = {
+        "requests": len(outcomes),
+        "errors": len(errors),
+        "status_codes": {str(code): sum(1 for o in outcomes if o[1] == code) for code in sorted({o[1] for o in outcomes})},
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(latencies.mean()), 3),
+        "max_ms": round(float(latencies.max()), 3),
+        "throughput_rps": round(len(outcomes) / wall, 2) if wall else None,
+        "mean_response_bytes": int(np.mean([o[2] for o in outcomes])),
+    }
+    if rss.peak is not None:
+        result["peak_rss_mb"] = round(rss.peak, 1)
+        result["rss_delta_mb"] = round(rss.peak - rss.baseline, 1)
+    else:
+        # No way to sample RSS here; fall back to the (cumulative) process peak
+        result["process_peak_rss_mb"] = round(peak_rss_mb(), 1)
+    if errors:
+        result["sample_error"] = errors[0][3]
+    return result
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> dict:
+    configure_backend(args.backend, args.mongodb_url, args.database)
+    os.chdir(ROOT)  # main.py mounts media/ relative to the working directory
+    os.makedirs("media", exist_ok=True)
+
+    from main import app
+    from db import db
+    from services.analytics_engine import snapshot
+
+    missing = uncovered_routes(app)
+    for route in missing:
+        print(f"WARNING: no benchmark scenario for {route}", file=sys.stderr)
+
+    selected = [s for s in SCENARIOS if not args.only or any(p in s.name for p in args.only)]
+    # Reads first, so destructive scenarios don't change what reads see
+    selected.sort(key=lambda s: s.destructive)
+
+    server, thread, base_url = start_server(app)
+    results = []
+    try:
+        for size in args.sizes:
+            print(f"Seeding dataset size {size:,} ...", file=sys.stderr)
+            seed_dataset(args.backend, db, size, args.seed, args.workers)
+            token = create_bench_user(db)
+            snapshot.refresh()
+            for concurrency in args.concurrency:
+                fx = Fixtures(db, args.seed)
+                for scenario in selected:
+                    result = run_scenario(base_url, token, scenario, fx, args.requests, concurrency, args.warmup)
+                    result.update(scenario=scenario.name, method=scenario.method, route=scenario.route,
+                                  size=size, concurrency=concurrency)
+                    results.append(result)
+                    if not result.get("skipped"):
+                        print(f"{size:>9,} c={concurrency:<3} {scenario.name:<28} p50={result['p50_ms']:>9.2f}ms "
+                              f"p95={result['p95_ms']:>9.2f}ms p99={result['p99_ms']:>9.2f}ms "
+                              f"{result['throughput_rps']:>8.1f} req/s errors={result['errors']}", file=sys.stderr)
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+    return {
+        "meta": {
+            "git_revision": git_revision(),
+            "started_at": datetime.utcnow().isoformat() + "Z",
+            "backend": args.backend,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "sizes": args.sizes,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "uncovered_routes": missing,
+        },
+        "results": results,
+    }
+
+
+# === Comparison ===
+def compare(base_path: str, new_path: str, threshold: float) -> int:
+    """Print per-scenario deltas; returns the number of regressions"""
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    def index(run):
+        return {(r["size"], r["concurrency"], r["scenario"]): r for r in run["results"] if not r.get("skipped")}
+
+    base_results, new_results = index(base), index(new)
+    regressions = 0
+    print(f"{'size':>9} {'conc':>4} {'scenario':<28} {'p95 base':>10} {'p95 new':>10} {'Δp95':>8} "
+          f"{'rps base':>9} {'rps new':>9} {'Δrps':>8} {'Δmem MB':>8}")
+    for key in sorted(base_results.keys() & new_results.keys()):
+        b, n = base_results[key], new_results[key]
+        p95_delta = (n["p95_ms"] - b["p95_ms"]) / b["p95_ms"] if b["p95_ms"] else 0.0
+        rps_delta = (n["throughput_rps"] - b["throughput_rps"]) / b["throughput_rps"] if b["throughput_rps"] else 0.0
+        flags = []
+        if p95_delta > threshold:
+            flags.append("p95")
+        if rps_delta < -threshold:
+            flags.append("throughput")
+        if n["errors"] > b["errors"]:
+            flags.append("errors")
+        # Memory growth during the scenario; older result files do not have it
+        mem_delta = None
+        if "rss_delta_mb" in b and "rss_delta_mb" in n:
+            mem_delta = n["rss_delta_mb"] - b["rss_delta_mb"]
+            if mem_delta > max(MEMORY_NOISE_MB, threshold * b["rss_delta_mb"]):
+                flags.append("memory")
+        if flags:
+            regressions += 1
+        size, concurrency, name = key
+        print(f"{size:>9,} {concurrency:>4} {name:<28} {b['p95_ms']:>10.2f} {n['p95_ms']:>10.2f} {p95_delta:>+8.1%} "
+              f"{b['throughput_rps']:>9.1f} {n['throughput_rps']:>9.1f} {rps_delta:>+8.1%} "
+              f"{'' if mem_delta is None else f'{mem_delta:+.1f}':>8}"
+              + (f"  REGRESSION ({', '.join(flags)})" if flags else ""))
+    for key in sorted(base_results.keys() ^ new_results.keys()):
+        print(f"only in {'base' if key in base_results else 'new'}: {key}")
+    print(f"\n{regressions} regression(s) at threshold {threshold:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--backend", choices=["mongod", "mongomock"], default="mongod")
+    parser.add_argument("--mongodb-url", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="hrm_benchmark", help="dropped and reseeded for every size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000], help="number of cases; reports are 2x, individuals 0.5x")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario and concurrency level")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes used to seed mongod")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="*", help="run scenarios whose name contains any of these substrings")
+    parser.add_argument("--output", help="write JSON results here (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two result files and exit")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    report = run(args)
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(payload)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,14 @@
-from pymongo import MongoClient
+from datetime import datetime
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import CollectionInvalid, OperationFailure, PyMongoError
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+import importlib.util
 import os
+import threading
+from urllib.parse import parse_qsl, urlsplit
 from dotenv import load_dotenv
+from monitoring.metrics import MongoCommandMetrics, MongoPoolMetrics
+from monitoring.slow_queries import slow_query_recorder
 
 load_dotenv()
 
@@ -8,8 +16,312 @@ load_dotenv()
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017/")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "human_rights_mis")
 
-client = MongoClient(MONGODB_URL)
-db = client[DATABASE_NAME]
+# Pool sizing and timeouts. Options given in the connection URL take precedence.
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+# How long a request may wait for a free pooled connection before failing
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "0")) or None
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+# Client-side operation timeout covering selection, checkout and execution (0 = off)
+MONGO_TIMEOUT_MS = int(os.getenv("MONGO_TIMEOUT_MS", "0")) or None
+# Preferred wire compressors; ones whose Python module is missing are skipped
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib")
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+
+# Read routing. Writes and read-your-writes paths (lookups by id, updates) use
+# the primary; heavy or staleness-tolerant reads go through a read tier:
+#   analytics - analytics router, report aggregates, exports, analytics snapshot
+#   search    - filtered list endpoints for cases, reports and victims
+# MONGODB_ANALYTICS_URL optionally points the analytics tier at a dedicated
+# client, e.g. a hidden analytics member or an Atlas analytics node.
+MONGODB_ANALYTICS_URL = os.getenv("MONGODB_ANALYTICS_URL")
+READ_TIERS = {
+    "analytics": {
+        "read_preference": os.getenv("MONGO_ANALYTICS_READ_PREFERENCE", "secondaryPreferred"),
+        "max_staleness": int(os.getenv("MONGO_ANALYTICS_MAX_STALENESS_SECONDS", "120")),
+        # e.g. "nodeType:ANALYTICS"; falls back to any eligible member
+        "tags": os.getenv("MONGO_ANALYTICS_READ_TAGS", ""),
+    },
+    "search": {
+        "read_preference": os.getenv("MONGO_SEARCH_READ_PREFERENCE", "secondaryPreferred"),
+        "max_staleness": int(os.getenv("MONGO_SEARCH_MAX_STALENESS_SECONDS", "90")),
+        "tags": os.getenv("MONGO_SEARCH_READ_TAGS", ""),
+    },
+}
+
+COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+
+def available_compressors(preferred: str = MONGO_COMPRESSORS) -> list:
+    names = [c.strip() for c in preferred.split(",") if c.strip()]
+    return [c for c in names if c in COMPRESSOR_MODULES and importlib.util.find_spec(COMPRESSOR_MODULES[c])]
+
+
+def client_options(url: str = MONGODB_URL) -> dict:
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "readPreference": MONGO_READ_PREFERENCE,
+        "retryReads": True,
+        "retryWrites": True,
+    }
+    if MONGO_TIMEOUT_MS:
+        options["timeoutMS"] = MONGO_TIMEOUT_MS
+    compressors = available_compressors()
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+    # Keyword arguments would override the URL, so leave out whatever it sets
+    in_url = {key.lower() for key, _ in parse_qsl(urlsplit(url).query)}
+    return {key: value for key, value in options.items() if key.lower() not in in_url}
+
+
+READ_PREFERENCE_MODES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def tier_read_preference(tier: str):
+    """Read preference for a read tier, with bounded staleness and tag sets"""
+    spec = READ_TIERS[tier]
+    mode = READ_PREFERENCE_MODES[spec["read_preference"]]
+    if mode is Primary:
+        return Primary()
+    tags = dict(pair.split(":", 1) for pair in spec["tags"].split(",") if ":" in pair)
+    # maxStalenessSeconds must be at least 90; -1 disables the bound
+    return mode(tag_sets=[tags, {}] if tags else None, max_staleness=spec["max_staleness"])
+
+
+# Clients (and their monitor threads) are created on first use, i.e. inside
+# each uvicorn worker rather than in the process that imported this module.
+_clients = {}
+_client_lock = threading.Lock()
+
+
+def _new_client(url: str) -> MongoClient:
+    return MongoClient(
+        url,
+        event_listeners=[MongoCommandMetrics(), MongoPoolMetrics(), slow_query_recorder],
+        **client_options(url),
+    )
+
+
+def get_client(name: str = "primary") -> MongoClient:
+    """The application client, or the dedicated analytics client if configured"""
+    if name == "analytics" and not MONGODB_ANALYTICS_URL:
+        name = "primary"
+    client = _clients.get(name)
+    if client is None:
+        with _client_lock:
+            client = _clients.get(name)
+            if client is None:
+                url = MONGODB_ANALYTICS_URL if name == "analytics" else MONGODB_URL
+                client = _clients[name] = _new_client(url)
+    return client
+
+
+def get_database(tier: str = None):
+    if tier is None:
+        return get_client()[DATABASE_NAME]
+    # Only the analytics tier may have a client of its own
+    client = get_client("analytics" if tier == "analytics" else "primary")
+    return client.get_database(
+        DATABASE_NAME, read_preference=tier_read_preference(tier)
+    )
+
+
+def close_client() -> None:
+    with _client_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+class _LazyDatabase:
+    """Stand-in for the Database object that connects on first attribute access"""
+
+    def __init__(self, tier: str = None):
+        self._tier = tier
+
+    def database(self):
+        return get_database(self._tier)
+
+    def __getitem__(self, name):
+        return _LazyCollection(name, self)
+
+    def __getattr__(self, name):
+        return getattr(self.database(), name)
+
+
+class _LazyCollection:
+    """Stand-in for a Collection so routers can keep `from db import cases`"""
+
+    def __init__(self, name: str, database: _LazyDatabase):
+        self._name = name
+        self._database = database
+
+    def __getattr__(self, attribute):
+        return getattr(self._database.database()[self._name], attribute)
+
+    def __repr__(self):
+        return f"<lazy collection {DATABASE_NAME}.{self._name}>"
+
+
+# Risk assessments are an append-only log per victim, stored as a time-series
+# collection: documents are bucketed by victim and ordered by assessment time.
+RISK_TIMESERIES = {"timeField": "assessed_at", "metaField": "victim_id", "granularity": "hours"}
+
+
+def ensure_risk_timeseries(database=None) -> bool:
+    """Create victim_risk_assessments as a time-series collection if it does not exist
+
+    An existing regular collection is left alone; convert it with
+    scripts/migrate_risk_timeseries.py.
+    """
+    database = database if database is not None else get_database()
+    if database.list_collection_names(filter={"name": "victim_risk_assessments"}):
+        return False
+    try:
+        database.create_collection("victim_risk_assessments", timeseries=RISK_TIMESERIES)
+    except CollectionInvalid:
+        return False  # created concurrently by another worker
+    return True
+
+
+# Protection watchlist: high-risk individuals who need protection, most
+# recently assessed first. The partial index only holds watchlist members,
+# so a page costs the same however large the registry grows.
+WATCHLIST_FILTER = {"risk_assessment.level": "high", "risk_assessment.protection_needed": True}
+WATCHLIST_INDEX = "watchlist_last_assessed"
+
+
+def ensure_watchlist_index(database=None) -> str:
+    database = database if database is not None else get_database()
+    return database["individuals"].create_index(
+        [("last_assessed_at", -1), ("_id", -1)],
+        name=WATCHLIST_INDEX,
+        partialFilterExpression=WATCHLIST_FILTER,
+    )
+
+
+# Bulk imports pass the source system's id; the unique index makes a retried
+# import skip rows that were already written
+def ensure_individual_indexes(database=None) -> None:
+    database = database if database is not None else get_database()
+    database["individuals"].create_index(
+        "legacy_id", unique=True, partialFilterExpression={"legacy_id": {"$type": "string"}}
+    )
+
+
+# Case lookups and status changes (single and bulk) address cases by case_id
+def ensure_case_indexes(database=None) -> None:
+    database = database if database is not None else get_database()
+    database["cases"].create_index("case_id")
+    database["case_status_history"].create_index([("case_id", 1), ("timestamp", -1)])
+    # Finds archival candidates (services/archival.py)
+    database["cases"].create_index([("status", 1), ("updated_at", 1)])
+
+
+# Cold tier: closed cases and their history are moved out of the working
+# collections into these, stored with zstd block compression.
+ARCHIVE_COLLECTIONS = {"cases": "cases_archive", "case_status_history": "case_status_history_archive"}
+ARCHIVE_STORAGE = {"wiredTiger": {"configString": "block_compressor=zstd"}}
+
+
+def ensure_archive_collections(database=None) -> None:
+    database = database if database is not None else get_database()
+    existing = set(database.list_collection_names())
+    for name in ARCHIVE_COLLECTIONS.values():
+        if name not in existing:
+            try:
+                database.create_collection(name, storageEngine=ARCHIVE_STORAGE)
+            except CollectionInvalid:
+                pass  # created concurrently by another worker
+    database[ARCHIVE_COLLECTIONS["cases"]].create_index("case_id")
+    database[ARCHIVE_COLLECTIONS["case_status_history"]].create_index([("case_id", 1), ("timestamp", -1)])
+
+
+# GeoJSON points queried by routers/geo.py. Index creation fails while any
+# document holds coordinates in another shape; scripts/migrate_geo.py fixes them.
+GEO_INDEXES = {"cases": "location.coordinates", "incident_reports": "incident_details.location.coordinates"}
+
+
+def ensure_geo_indexes(database=None) -> bool:
+    database = database if database is not None else get_database()
+    try:
+        for collection, field in GEO_INDEXES.items():
+            database[collection].create_index([(field, "2dsphere")])
+    except OperationFailure as e:
+        print(f"Could not create 2dsphere indexes ({e}); run scripts/migrate_geo.py")
+        return False
+    return True
+
+
+SETUP_STEPS = (
+    ensure_risk_timeseries,
+    ensure_watchlist_index,
+    ensure_individual_indexes,
+    ensure_case_indexes,
+    ensure_archive_collections,
+    ensure_geo_indexes,
+)
+
+
+def prepare_collections(database=None) -> list:
+    """Collection options and indexes the API relies on; safe to run repeatedly
+
+    Each step runs on its own, so one failure does not skip the others.
+    Returns the names of the steps that failed.
+    """
+    database = database if database is not None else get_database()
+    failed = []
+    for step in SETUP_STEPS:
+        try:
+            step(database)
+        # NotImplementedError: backends without collection options (mongomock in benchmarks)
+        except (PyMongoError, NotImplementedError) as e:
+            print(f"Setup step {step.__name__} failed: {e}")
+            failed.append(step.__name__)
+    return failed
+
+
+# Per-collection change counters. Writes through the API bump them, and the
+# conditional GET middleware derives ETags from them (middleware/etag.py).
+def bump_data_version(*collections: str, database=None) -> None:
+    if not collections:
+        return
+    database = database if database is not None else get_database()
+    now = datetime.utcnow()
+    database["data_versions"].bulk_write(
+        [
+            UpdateOne({"_id": name}, {"$inc": {"version": 1}, "$set": {"updated_at": now}}, upsert=True)
+            for name in collections
+        ],
+        ordered=False,
+    )
+
+
+def get_data_versions(collections) -> dict:
+    """{collection: {"version": n, "updated_at": datetime}}; never-bumped collections are absent"""
+    cursor = get_database()["data_versions"].find({"_id": {"$in": list(collections)}})
+    return {doc["_id"]: doc for doc in cursor}
+
+
+db = _LazyDatabase()
+analytics_db = _LazyDatabase(tier="analytics")
+search_db = _LazyDatabase(tier="search")
+slow_query_recorder.attach(db)
 
 #Collections
 cases = db["cases"]
@@ -18,4 +330,8 @@ incident_reports = db["incident_reports"]
 report_evidence = db["report_evidence"]
 individuals_collection = db["individuals"]  # Changed from "victims" to "individuals"
 users_collection = db["users"]
-victim_risk_assessments = db["victim_risk_assessments"]
\ No newline at end of file
+victim_risk_assessments = db["victim_risk_assessments"]
+pdf_jobs = db["pdf_jobs"]
+cases_archive = db[ARCHIVE_COLLECTIONS["cases"]]
+case_status_history_archive = db[ARCHIVE_COLLECTIONS["case_status_history"]]
+archive_jobs = db["archive_jobs"]
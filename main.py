@@ -1,18 +1,45 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from routers.cases import case_router
 from routers.reports import report_router
 from routers.analytics import analytics_router
+from routers.exports import export_router
+from routers.admin import admin_router
+from routers.geo import geo_router
 from routers import auth, victims
+from monitoring.metrics import PrometheusMiddleware, render_metrics
+from middleware.compression import CompressionMiddleware
+from middleware.etag import ConditionalGetMiddleware
+from db import close_client, get_client, prepare_collections
+from services import pdf_reports
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Importing this module stays cheap; the MongoDB client is created here,
+    # inside the worker process, and closed on graceful shutdown.
+    get_client()
+    # Failed steps are logged and skipped; the API starts either way
+    prepare_collections()
+    yield
+    pdf_reports.shutdown()
+    close_client()
+
 
 app = FastAPI(
     title="Human Rights MIS",
     description="Document, manage, and analyze human rights violations.",
     version="1.0",
+    lifespan=lifespan,
 )
 
+# Outermost last: metrics see the compressed size, compression never sees a 304
+app.add_middleware(ConditionalGetMiddleware)
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -20,10 +47,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(PrometheusMiddleware)
 
 app.include_router(case_router, prefix="/cases", tags=["Case Management"])
 app.include_router(report_router, prefix="/reports", tags=["Incident Reporting"])
 app.include_router(analytics_router, prefix="/analytics", tags=["Analytics"])
+app.include_router(export_router, prefix="/exports", tags=["Data Export"])
+app.include_router(admin_router, prefix="/admin", tags=["Administration"])
+app.include_router(geo_router, prefix="/geo", tags=["Geospatial"])
 app.include_router(auth.router)
 app.include_router(victims.router)
 
@@ -34,3 +65,9 @@ app.mount("/media", StaticFiles(directory="media"), name="media")
 @app.get("/")
 def read_root():
     return {"message": "Human Rights MIS API is active"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -0,0 +1,89 @@
+import os
+from typing import List, Optional
+
+import folium
+import numpy as np
+from folium.plugins import FastMarkerCluster, HeatMap, MarkerCluster
+
+# Up to this many points get individual markers with popups (clustered)
+MARKER_POPUP_LIMIT = int(os.getenv("MAP_MARKER_POPUP_LIMIT", "500"))
+# Up to this many points are fetched and drawn client-side with FastMarkerCluster;
+# above it the map is drawn from server-side grid clusters instead
+MAP_POINT_LIMIT = int(os.getenv("MAP_POINT_LIMIT", "20000"))
+# Heatmap points are binned to a grid of this many degrees
+HEAT_CELL_DEGREES = float(os.getenv("MAP_HEAT_CELL_DEGREES", "0.05"))
+SERVER_CLUSTER_CELL_DEGREES = 0.5
+
+
+def to_arrays(markers: List[dict]):
+    """Latitude and longitude columns of the API's geodata as float arrays"""
+    lat = np.fromiter((m["lat"] for m in markers), dtype=float, count=len(markers))
+    lon = np.fromiter((m["lon"] for m in markers), dtype=float, count=len(markers))
+    return lat, lon
+
+
+def heat_points(lat: np.ndarray, lon: np.ndarray, cell: float = HEAT_CELL_DEGREES, weights: Optional[np.ndarray] = None) -> list:
+    """Bin points to a grid and return [lat, lon, weight] rows, one per occupied cell"""
+    if lat.size == 0:
+        return []
+    cells = np.column_stack([np.floor(lat / cell), np.floor(lon / cell)])
+    occupied, inverse = np.unique(cells, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    weight = np.bincount(inverse, weights=weights, minlength=len(occupied))
+    centers = (occupied + 0.5) * cell
+    # HeatMap expects intensities in 0..1
+    return np.column_stack([centers, weight / weight.max()]).tolist()
+
+
+def _base_map(lat: np.ndarray, lon: np.ndarray) -> folium.Map:
+    m = folium.Map(location=[float(lat.mean()), float(lon.mean())], zoom_start=5, prefer_canvas=True)
+    m.fit_bounds([[float(lat.min()), float(lon.min())], [float(lat.max()), float(lon.max())]])
+    return m
+
+
+def _popup(marker: dict) -> str:
+    violations = ", ".join(marker.get("violations") or [])
+    date = marker.get("date")
+    return f"<b>Violations:</b> {violations}" + (f"<br><b>Date:</b> {date}" if date else "")
+
+
+def incident_map(markers: List[dict]) -> Optional[folium.Map]:
+    """Heatmap plus clustered markers for point-level geodata"""
+    if not markers:
+        return None
+    lat, lon = to_arrays(markers)
+    m = _base_map(lat, lon)
+    HeatMap(heat_points(lat, lon), name="Density").add_to(m)
+
+    if len(markers) <= MARKER_POPUP_LIMIT:
+        cluster = MarkerCluster(name="Incidents").add_to(m)
+        for marker, y, x in zip(markers, lat.tolist(), lon.tolist()):
+            folium.Marker(
+                [y, x],
+                tooltip=(marker.get("description") or "Incident")[:50],
+                popup=_popup(marker),
+            ).add_to(cluster)
+    else:
+        # Points are clustered in the browser from one JS array, without popups
+        FastMarkerCluster(np.column_stack([lat, lon]).tolist(), name="Incidents").add_to(m)
+    return m
+
+
+def cluster_map(clusters: List[dict]) -> Optional[folium.Map]:
+    """Map of server-side grid clusters (see /analytics/geodata/clusters)"""
+    if not clusters:
+        return None
+    lat, lon = to_arrays(clusters)
+    counts = np.fromiter((c["count"] for c in clusters), dtype=float, count=len(clusters))
+    m = _base_map(lat, lon)
+    HeatMap(heat_points(lat, lon, weights=counts), name="Density").add_to(m)
+
+    # Circle area proportional to the incident count
+    radii = 4 + 20 * np.sqrt(counts / counts.max())
+    layer = folium.FeatureGroup(name="Clusters").add_to(m)
+    for y, x, count, radius in zip(lat.tolist(), lon.tolist(), counts.astype(int).tolist(), radii.tolist()):
+        folium.CircleMarker(
+            [y, x], radius=radius, weight=1, fill=True, fill_opacity=0.6,
+            tooltip=f"{count} incidents",
+        ).add_to(layer)
+    return m
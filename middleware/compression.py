@@ -0,0 +1,123 @@
+import gzip
+import os
+from typing import Callable, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# zstd and brotli compress JSON better and faster than gzip, but are optional:
+# an encoding whose module is missing is simply not offered.
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent as they are
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Larger bodies are compressed in a worker thread instead of on the event loop
+COMPRESSION_THREAD_MIN_SIZE = 256 * 1024
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def _encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    """Available encodings, in order of preference"""
+    encoders = {}
+    if zstandard is not None:
+        # ZstdCompressor instances are not thread-safe, so each call gets its own
+        encoders["zstd"] = lambda body: zstandard.ZstdCompressor(level=3).compress(body)
+    if brotli is not None:
+        encoders["br"] = lambda body: brotli.compress(body, quality=4)
+    encoders["gzip"] = lambda body: gzip.compress(body, compresslevel=6, mtime=0)
+    return encoders
+
+
+ENCODERS = _encoders()
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Most preferred encoding the client accepts (q > 0), or None"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name and quality > 0:
+            accepted.add(name.strip())
+    for encoding in ENCODERS:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """Compress complete JSON/text responses with zstd, brotli or gzip
+
+    Only single-message responses above COMPRESSION_MIN_SIZE are compressed.
+    Streaming responses (exports, file downloads) pass through untouched, as
+    do bodies that already carry a Content-Encoding.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Dict[str, Optional[Message]] = {"message": None}
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether to compress
+                start["message"] = message
+                return
+            if message["type"] != "http.response.body" or start["message"] is None:
+                await send(message)
+                return
+
+            response_start, start["message"] = start["message"], None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=response_start["headers"])
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(response_start)
+                await send(message)
+                return
+
+            encode = ENCODERS[encoding]
+            if len(body) >= COMPRESSION_THREAD_MIN_SIZE:
+                body = await run_in_threadpool(encode, body)
+            else:
+                body = encode(body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            # The compressed bytes differ from the identity ones, so a strong
+            # validator becomes weak (If-Match and If-None-Match accept both)
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            await send(response_start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,162 @@
+import hashlib
+import os
+import time
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from pymongo.errors import PyMongoError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from db import READ_TIERS, bump_data_version, get_data_versions
+
+# GET routes whose body depends only on the query string and these collections
+REPORTS = ("incident_reports",)
+CASES_AND_REPORTS = ("cases", "incident_reports")
+CONDITIONAL_ROUTES = {
+    "/analytics/violations": CASES_AND_REPORTS,
+    "/analytics/timeline": CASES_AND_REPORTS,
+    "/analytics/geodata": CASES_AND_REPORTS,
+    "/analytics/geodata/clusters": CASES_AND_REPORTS,
+    "/analytics/summary": CASES_AND_REPORTS,
+    "/reports/": REPORTS,
+    "/reports/analytics": REPORTS,
+    "/reports/analytics/timeline": REPORTS,
+    "/reports/analytics/geodata": REPORTS,
+    "/cases/": ("cases",),
+    "/geo/near": CASES_AND_REPORTS,
+    "/geo/within": CASES_AND_REPORTS,
+}
+# Successful writes under these prefixes bump the collections they change;
+# the first matching prefix wins
+WRITE_ROUTES = (
+    ("/reports/pdf", ()),
+    # Deleting a report also unlinks it from its cases
+    ("/reports", CASES_AND_REPORTS),
+    ("/cases", ("cases",)),
+    # Not conditional, but versioned for the PDF cache (services/pdf_reports.py)
+    ("/victims", ("individuals",)),
+)
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# These routes read from secondaries, so a version bump can arrive before the
+# data it describes. No ETag is issued until the read tiers' allowed
+# staleness has passed since the last bump.
+ETAG_SETTLE_SECONDS = int(os.getenv("ETAG_SETTLE_SECONDS", max(
+    [tier["max_staleness"] for tier in READ_TIERS.values() if tier["read_preference"] != "primary"] or [0]
+)))
+# Some responses are relative to the current time (e.g. ?days=7), so ETags
+# also roll over every ETAG_MAX_AGE_SECONDS even without writes
+ETAG_MAX_AGE_SECONDS = int(os.getenv("ETAG_MAX_AGE_SECONDS", "300"))
+
+
+def collections_written(path: str) -> Tuple[str, ...]:
+    for prefix, collections in WRITE_ROUTES:
+        if path.startswith(prefix):
+            return collections
+    return ()
+
+
+def compute_etag(scope: Scope, versions: dict, collections: Iterable[str]) -> str:
+    headers = Headers(scope=scope)
+    digest = hashlib.blake2b(digest_size=12)
+    for part in (
+        scope["path"],
+        "&".join(sorted(scope.get("query_string", b"").decode("latin-1").split("&"))),
+        # Responses may depend on who is asking
+        headers.get("authorization", ""),
+        str(int(time.time() // ETAG_MAX_AGE_SECONDS)),
+        *(f"{name}:{versions.get(name, {}).get('version', 0)}" for name in collections),
+    ):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return f'W/"{digest.hexdigest()}"'
+
+
+def settled(versions: dict) -> bool:
+    now = datetime.utcnow()
+    return all(
+        (now - doc["updated_at"]).total_seconds() >= ETAG_SETTLE_SECONDS
+        for doc in versions.values()
+        if doc.get("updated_at")
+    )
+
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+class ConditionalGetMiddleware:
+    """ETags and 304 Not Modified for list and analytics responses
+
+    The ETag of a conditional route is a hash of the request and the version
+    counters of the collections it reads (db.data_versions). A request whose
+    If-None-Match still matches is answered with 304 before the route runs,
+    so an unchanged dashboard costs one small lookup instead of its queries.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method, path = scope["method"], scope["path"]
+        if method in ("GET", "HEAD") and path in CONDITIONAL_ROUTES:
+            await self.conditional(scope, receive, send, CONDITIONAL_ROUTES[path])
+        elif method in WRITE_METHODS and collections_written(path):
+            await self.track_writes(scope, receive, send, collections_written(path))
+        else:
+            await self.app(scope, receive, send)
+
+    async def conditional(self, scope: Scope, receive: Receive, send: Send, collections) -> None:
+        try:
+            versions = await run_in_threadpool(get_data_versions, collections)
+        except PyMongoError:
+            await self.app(scope, receive, send)
+            return
+        if not settled(versions):
+            await self.app(scope, receive, send)
+            return
+
+        etag = compute_etag(scope, versions, collections)
+        if matches(Headers(scope=scope).get("if-none-match"), etag):
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [(b"etag", etag.encode()), (b"cache-control", b"no-cache")],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                if "etag" not in headers:
+                    headers["ETag"] = etag
+                    # Cache, but revalidate before every reuse
+                    headers["Cache-Control"] = "no-cache"
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def track_writes(self, scope: Scope, receive: Receive, send: Send, collections) -> None:
+        async def send_wrapper(message: Message) -> None:
+            # Bumped before the response goes out, so a client that reloads
+            # straight after its own write never gets a 304 for old data
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                try:
+                    await run_in_threadpool(bump_data_version, *collections)
+                except PyMongoError as e:
+                    print(f"Could not bump data versions for {collections}: {e}")
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
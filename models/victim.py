@@ -43,6 +43,8 @@ class SupportService(BaseModel):
     notes: Optional[str] = None
 
 class VictimCreate(BaseModel):
+    # Id in the system the record was imported from; unique, so a retried import skips it
+    legacy_id: Optional[str] = None
     type: VictimType
     anonymous: bool = False
     pseudonym: Optional[str] = None
@@ -64,6 +66,7 @@ class VictimUpdate(BaseModel):
 
 class VictimResponse(BaseModel):
     id: str = Field(alias="_id")
+    legacy_id: Optional[str] = None
     type: VictimType
     anonymous: bool
     pseudonym: Optional[str] = None
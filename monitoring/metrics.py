@@ -0,0 +1,276 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from pymongo import monitoring
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Endpoint handling the current request, e.g. "list_cases". Read by the Mongo
+# listener so database time can be attributed to the route that caused it.
+current_handler: ContextVar[str] = ContextVar("current_handler", default="none")
+current_route: ContextVar[str] = ContextVar("current_route", default="none")
+
+
+# === HTTP metrics ===
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "handler", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being processed",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "HTTP response body size by route",
+    ["method", "route"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+
+# === MongoDB metrics ===
+MONGO_COMMAND_LATENCY = Histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command latency by collection, command and calling handler",
+    ["collection", "command", "handler"],
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongo_command_failures_total",
+    "Failed MongoDB commands",
+    ["collection", "command", "handler"],
+)
+MONGO_DOCUMENTS_RETURNED = Counter(
+    "mongo_documents_returned_total",
+    "Documents returned to the client (cursor batches) or affected by writes (n)",
+    ["collection", "command", "handler"],
+)
+# Regular replies carry no execution statistics, so these two come from the
+# explain() samples taken by monitoring.slow_queries; their ratio is the
+# examined-per-returned ratio of the slow query shapes
+MONGO_DOCUMENTS_EXAMINED = Counter(
+    "mongo_documents_examined_total",
+    "Documents examined by the server in sampled slow-query explains",
+    ["collection", "command", "handler"],
+)
+MONGO_EXPLAINED_DOCUMENTS_RETURNED = Counter(
+    "mongo_explained_documents_returned_total",
+    "Documents returned in the same sampled slow-query explains",
+    ["collection", "command", "handler"],
+)
+# === MongoDB connection pool metrics ===
+MONGO_POOL_CHECKOUT_WAIT = Histogram(
+    "mongo_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    ["address"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+MONGO_POOL_CHECKOUT_FAILURES = Counter(
+    "mongo_pool_checkout_failures_total",
+    "Connection checkouts that failed, by reason (timeout, connectionError, poolClosed)",
+    ["address", "reason"],
+)
+MONGO_POOL_CHECKED_OUT = Gauge(
+    "mongo_pool_checked_out_connections",
+    "Connections currently checked out of the pool",
+    ["address"],
+    multiprocess_mode="livesum",
+)
+MONGO_POOL_CONNECTIONS = Gauge(
+    "mongo_pool_connections",
+    "Open pooled connections (idle and checked out)",
+    ["address"],
+    multiprocess_mode="livesum",
+)
+MONGO_POOL_CLEARED = Counter(
+    "mongo_pool_cleared_total",
+    "Times a pool was cleared, e.g. after a network error or failover",
+    ["address"],
+)
+
+
+def _route_for(app, scope: Scope) -> Tuple[str, str]:
+    """Return the (path template, endpoint name) a request will be routed to"""
+    for route in getattr(app, "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path, getattr(route, "name", route.path)
+    return "unmatched", "unmatched"
+
+
+class PrometheusMiddleware:
+    """Record latency, in-flight requests and response size per route template"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route, handler = _route_for(scope.get("app"), scope)
+        route_token = current_route.set(route)
+        handler_token = current_handler.set(handler)
+        status = {"code": 500}
+        size = {"bytes": 0}
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            elif message["type"] == "http.response.body":
+                size["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method, route)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            REQUEST_LATENCY.labels(method, route, handler, str(status["code"])).observe(
+                time.perf_counter() - started
+            )
+            RESPONSE_SIZE.labels(method, route).observe(size["bytes"])
+            current_route.reset(route_token)
+            current_handler.reset(handler_token)
+
+
+def _collection_name(event: monitoring.CommandStartedEvent) -> str:
+    command = event.command
+    if event.command_name == "getMore":
+        return str(command.get("collection", "unknown"))
+    if event.command_name == "explain":
+        inner = command.get("explain", {})
+        return str(next(iter(inner.values()), "unknown")) if inner else "unknown"
+    target = command.get(event.command_name)
+    return target if isinstance(target, str) else "admin"
+
+
+def _documents_returned(reply: dict) -> Optional[int]:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+        if batch is not None:
+            return len(batch)
+    if "n" in reply:
+        return int(reply["n"])
+    return None
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """PyMongo command listener feeding the mongo_* Prometheus metrics"""
+
+    def __init__(self):
+        self._pending = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        self._pending[(event.connection_id, event.request_id)] = (
+            _collection_name(event),
+            current_handler.get(),
+        )
+
+    def _labels(self, event) -> Tuple[str, str, str]:
+        collection, handler = self._pending.pop(
+            (event.connection_id, event.request_id), ("unknown", current_handler.get())
+        )
+        return collection, event.command_name, handler
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        labels = self._labels(event)
+        MONGO_COMMAND_LATENCY.labels(*labels).observe(event.duration_micros / 1e6)
+        returned = _documents_returned(event.reply)
+        if returned:
+            MONGO_DOCUMENTS_RETURNED.labels(*labels).inc(returned)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        labels = self._labels(event)
+        MONGO_COMMAND_LATENCY.labels(*labels).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(*labels).inc()
+
+
+def observe_explain(collection: str, command: str, handler: str, summary: dict) -> None:
+    """Count an explain sample (slow_queries.summarize_explain) against the handler that ran the query"""
+    if summary.get("total_docs_examined") is None:
+        return
+    MONGO_DOCUMENTS_EXAMINED.labels(collection, command, handler).inc(summary["total_docs_examined"])
+    MONGO_EXPLAINED_DOCUMENTS_RETURNED.labels(collection, command, handler).inc(summary.get("n_returned") or 0)
+
+
+def _address(event) -> str:
+    host, port = event.address
+    return f"{host}:{port}"
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """PyMongo pool listener feeding the mongo_pool_* Prometheus metrics
+
+    Checkout wait time shows requests queuing for a connection when
+    maxPoolSize is too small for the worker's concurrency.
+    """
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        MONGO_POOL_CLEARED.labels(_address(event)).inc()
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        MONGO_POOL_CONNECTIONS.labels(_address(event)).inc()
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        MONGO_POOL_CONNECTIONS.labels(_address(event)).dec()
+
+    def connection_check_out_started(self, event) -> None:
+        pass
+
+    def connection_check_out_failed(self, event) -> None:
+        address = _address(event)
+        MONGO_POOL_CHECKOUT_FAILURES.labels(address, str(event.reason)).inc()
+        if event.duration is not None:
+            MONGO_POOL_CHECKOUT_WAIT.labels(address).observe(event.duration)
+
+    def connection_checked_out(self, event) -> None:
+        address = _address(event)
+        MONGO_POOL_CHECKED_OUT.labels(address).inc()
+        if event.duration is not None:
+            MONGO_POOL_CHECKOUT_WAIT.labels(address).observe(event.duration)
+
+    def connection_checked_in(self, event) -> None:
+        MONGO_POOL_CHECKED_OUT.labels(_address(event)).dec()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Prometheus text exposition of every registered metric
+
+    With several uvicorn workers (PROMETHEUS_MULTIPROC_DIR set by run_all.py)
+    the values of all workers are merged, whichever worker serves /metrics.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,308 @@
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from bson import ObjectId
+from pymongo import monitoring
+from pymongo.errors import CollectionInvalid, PyMongoError
+from pymongo.read_preferences import ReadPreference, make_read_preference, read_pref_mode_from_name
+
+from monitoring.metrics import current_handler, current_route, observe_explain
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_COLLECTION = os.getenv("SLOW_QUERY_COLLECTION", "slow_queries")
+SLOW_QUERY_CAP_BYTES = int(os.getenv("SLOW_QUERY_CAP_BYTES", str(64 * 1024 * 1024)))
+# Run explain() at most once per query shape in this many seconds
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "300"))
+
+# Commands that can be explained, and the fields that define their shape
+EXPLAINABLE = {
+    "find": ["filter", "sort", "projection", "limit", "skip", "hint", "collation"],
+    "aggregate": ["pipeline", "hint", "collation"],
+    "count": ["query", "limit", "skip", "hint", "collation"],
+    "distinct": ["key", "query", "collation"],
+    "delete": ["deletes"],
+    "update": ["updates"],
+    "findAndModify": ["query", "sort", "fields", "update", "remove", "upsert", "new"],
+}
+# Fields whose values are structural (field names, directions) and kept as-is
+STRUCTURAL = {"sort", "projection", "fields", "key", "hint", "limit", "skip"}
+
+
+# === Redaction ===
+def _placeholder(value: Any) -> str:
+    if isinstance(value, bool):
+        return "?bool"
+    if isinstance(value, (int, float)):
+        return "?number"
+    if isinstance(value, str):
+        # "$field" paths in pipelines are structure, not data
+        return value if value.startswith("$") else "?string"
+    if isinstance(value, datetime):
+        return "?date"
+    if isinstance(value, ObjectId):
+        return "?objectId"
+    if value is None:
+        return None
+    return f"?{type(value).__name__}"
+
+
+def redact(value: Any) -> Any:
+    """Replace every literal in a filter or pipeline with a type placeholder
+
+    Field names and operators are kept so the shape can be matched to an
+    index; values are dropped because they may identify victims or witnesses.
+    """
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # $in: [a, b, c] and $in: [x] share a shape
+        shapes = []
+        for item in value:
+            shape = redact(item)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    return _placeholder(value)
+
+
+def query_shape(command_name: str, command: dict) -> dict:
+    shape = {}
+    for field in EXPLAINABLE[command_name]:
+        if field not in command:
+            continue
+        value = command[field]
+        if field in STRUCTURAL:
+            shape[field] = value if not isinstance(value, dict) else dict(value)
+        elif field in ("deletes", "updates"):
+            shape[field] = redact([{"q": op.get("q"), "multi": op.get("multi", False)} for op in value])
+        else:
+            shape[field] = redact(value)
+    return shape
+
+
+def shape_hash(collection: str, command_name: str, shape: dict) -> str:
+    payload = json.dumps([collection, command_name, shape], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+# === Explain summary ===
+def _find_key(document: Any, key: str) -> Optional[dict]:
+    """Depth-first search for a key; aggregate explains nest it under $cursor"""
+    if isinstance(document, dict):
+        if key in document:
+            return document[key]
+        children = document.values()
+    elif isinstance(document, list):
+        children = document
+    else:
+        return None
+    for child in children:
+        found = _find_key(child, key)
+        if found is not None:
+            return found
+    return None
+
+
+def _plan_stages(plan: Optional[dict]) -> list:
+    stages = []
+    while isinstance(plan, dict):
+        stage = plan.get("stage")
+        if plan.get("indexName"):
+            stage = f"{stage}({plan['indexName']})"
+        stages.append(stage)
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return stages
+
+
+def summarize_explain(explain: dict) -> dict:
+    """Keep plan stages and counters only; parsedQuery and indexBounds hold literal values"""
+    planner = _find_key(explain, "queryPlanner") or {}
+    winning = planner.get("winningPlan", {})
+    winning = winning.get("queryPlan", winning)  # slot-based engine wraps the plan
+    stats = _find_key(explain, "executionStats") or {}
+    return {
+        "winning_plan": _plan_stages(winning),
+        "collection_scan": "COLLSCAN" in _plan_stages(winning),
+        "n_returned": stats.get("nReturned"),
+        "execution_time_ms": stats.get("executionTimeMillis"),
+        "total_keys_examined": stats.get("totalKeysExamined"),
+        "total_docs_examined": stats.get("totalDocsExamined"),
+    }
+
+
+def _explain_command(command_name: str, command: dict) -> Optional[dict]:
+    fields = EXPLAINABLE[command_name]
+    explained = {command_name: command[command_name]}
+    explained.update({f: command[f] for f in fields if f in command})
+    for batch in ("updates", "deletes"):
+        if batch in explained:
+            # explain() accepts a single write statement
+            explained[batch] = explained[batch][:1]
+    if command_name == "aggregate":
+        if any(("$out" in stage or "$merge" in stage) for stage in command.get("pipeline", [])):
+            return None
+        explained["cursor"] = {}
+    return explained
+
+
+def _read_preference(document: Optional[dict]):
+    """The read preference a command was sent with, from its $readPreference field
+
+    The driver leaves the field out of commands sent to the primary.
+    """
+    if not document:
+        return ReadPreference.PRIMARY
+    return make_read_preference(
+        read_pref_mode_from_name(document["mode"]),
+        document.get("tags"),
+        document.get("maxStalenessSeconds", -1),
+    )
+
+
+# === Recorder ===
+class SlowQueryRecorder(monitoring.CommandListener):
+    """Capture commands slower than SLOW_QUERY_MS into a capped collection
+
+    The listener only copies the command and queues it; redaction, explain()
+    and the insert happen on a background thread so requests are not delayed.
+    """
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_MS):
+        self.threshold_ms = threshold_ms
+        self._db = None
+        self._pending: Dict[tuple, tuple] = {}
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=1000)
+        self._last_explained: Dict[str, float] = {}
+        self._worker: Optional[threading.Thread] = None
+        self._collection_ready = False
+        self._lock = threading.Lock()
+
+    def attach(self, database) -> None:
+        self._db = database
+
+    def _ignored(self, event) -> bool:
+        return (
+            event.command_name not in EXPLAINABLE
+            or event.command.get(event.command_name) == SLOW_QUERY_COLLECTION
+        )
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if self._db is None or self._ignored(event):
+            return
+        self._pending[(event.connection_id, event.request_id)] = (
+            event.database_name,
+            dict(event.command),
+            current_route.get(),
+            current_handler.get(),
+        )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool) -> None:
+        pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        duration_ms = event.duration_micros / 1000.0
+        if duration_ms < self.threshold_ms:
+            return
+        database_name, command, route, handler = pending
+        try:
+            self._queue.put_nowait(
+                {
+                    "database": database_name,
+                    "command_name": event.command_name,
+                    "command": command,
+                    "read_preference": command.get("$readPreference"),
+                    "route": route,
+                    "handler": handler,
+                    "duration_ms": round(duration_ms, 2),
+                    "failed": failed,
+                    "recorded_at": datetime.utcnow(),
+                }
+            )
+        except queue.Full:
+            return
+        self._ensure_worker()
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="slow-query-recorder", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                self._record(item)
+            except PyMongoError as e:
+                print(f"Slow query recorder error: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _collection(self):
+        if not self._collection_ready:
+            try:
+                self._db.create_collection(
+                    SLOW_QUERY_COLLECTION, capped=True, size=SLOW_QUERY_CAP_BYTES
+                )
+            except CollectionInvalid:
+                pass  # already exists
+            self._collection_ready = True
+        return self._db[SLOW_QUERY_COLLECTION]
+
+    def _record(self, item: dict) -> None:
+        command_name, command = item.pop("command_name"), item.pop("command")
+        collection = command[command_name]
+        shape = query_shape(command_name, command)
+        digest = shape_hash(collection, command_name, shape)
+
+        entry = {
+            "shape_hash": digest,
+            "collection": collection,
+            "command": command_name,
+            "shape": shape,
+            "route": item["route"],
+            "handler": item["handler"],
+            "duration_ms": item["duration_ms"],
+            "failed": item["failed"],
+            "recorded_at": item["recorded_at"],
+        }
+
+        now = time.monotonic()
+        if (
+            not item["failed"]
+            and now - self._last_explained.get(digest, -SLOW_QUERY_EXPLAIN_INTERVAL)
+            >= SLOW_QUERY_EXPLAIN_INTERVAL
+        ):
+            explained = _explain_command(command_name, command)
+            if explained is not None:
+                self._last_explained[digest] = now
+                database = self._db.client[item["database"]]
+                # Explain where the command ran: analytics, export and search
+                # reads go to secondaries and must not load the primary
+                result = database.command(
+                    "explain",
+                    explained,
+                    verbosity="executionStats",
+                    read_preference=_read_preference(item["read_preference"]),
+                )
+                entry["explain"] = summarize_explain(result)
+                observe_explain(collection, command_name, item["handler"], entry["explain"])
+
+        self._collection().insert_one(entry)
+
+
+slow_query_recorder = SlowQueryRecorder()
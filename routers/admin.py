@@ -0,0 +1,121 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from datetime import datetime, timedelta
+from typing import Optional
+from models.user import User, UserRole
+from security.auth import require_roles
+from db import db
+from monitoring.slow_queries import SLOW_QUERY_COLLECTION, SLOW_QUERY_MS
+from services import archival
+
+admin_router = APIRouter()
+
+
+# === GET /admin/slow-queries ===
+@admin_router.get("/slow-queries")
+def list_slow_queries(
+    hours: int = Query(24, ge=1, le=24 * 30),
+    collection: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(require_roles([UserRole.ADMIN])),
+):
+    """Slow operations grouped by query shape, worst total time first
+
+    Each shape carries the routes that issued it and the most recent
+    explain("executionStats") summary, e.g. whether it was a COLLSCAN.
+    """
+    match = {"recorded_at": {"$gte": datetime.utcnow() - timedelta(hours=hours)}}
+    if collection:
+        match["collection"] = collection
+
+    pipeline = [
+        {"$match": match},
+        {"$sort": {"recorded_at": 1}},
+        {
+            "$group": {
+                "_id": "$shape_hash",
+                "collection": {"$first": "$collection"},
+                "command": {"$first": "$command"},
+                "shape": {"$first": "$shape"},
+                "routes": {"$addToSet": "$route"},
+                "handlers": {"$addToSet": "$handler"},
+                "count": {"$sum": 1},
+                "failures": {"$sum": {"$cond": ["$failed", 1, 0]}},
+                "total_ms": {"$sum": "$duration_ms"},
+                "avg_ms": {"$avg": "$duration_ms"},
+                "max_ms": {"$max": "$duration_ms"},
+                "last_seen": {"$last": "$recorded_at"},
+            }
+        },
+        {"$sort": {"total_ms": -1}},
+        {"$limit": limit},
+        {
+            "$lookup": {
+                "from": SLOW_QUERY_COLLECTION,
+                "let": {"shape": "$_id"},
+                "pipeline": [
+                    {
+                        "$match": {
+                            "$expr": {"$eq": ["$shape_hash", "$$shape"]},
+                            "explain": {"$exists": True},
+                        }
+                    },
+                    {"$sort": {"recorded_at": -1}},
+                    {"$limit": 1},
+                    {"$project": {"_id": 0, "explain": 1, "recorded_at": 1}},
+                ],
+                "as": "latest_explain",
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "shape_hash": "$_id",
+                "collection": 1,
+                "command": 1,
+                "shape": 1,
+                "routes": 1,
+                "handlers": 1,
+                "count": 1,
+                "failures": 1,
+                "total_ms": {"$round": ["$total_ms", 1]},
+                "avg_ms": {"$round": ["$avg_ms", 1]},
+                "max_ms": 1,
+                "last_seen": 1,
+                "explain": {"$first": "$latest_explain"},
+            }
+        },
+    ]
+
+    return {
+        "threshold_ms": SLOW_QUERY_MS,
+        "hours": hours,
+        "shapes": list(db[SLOW_QUERY_COLLECTION].aggregate(pipeline)),
+    }
+
+
+# === POST /admin/archive ===
+@admin_router.post("/archive", status_code=202)
+def start_archival(
+    background_tasks: BackgroundTasks,
+    older_than_days: int = Query(archival.ARCHIVE_AFTER_DAYS, ge=0),
+    batch_size: int = Query(archival.ARCHIVE_BATCH_SIZE, ge=1, le=5000),
+    current_user: User = Depends(require_roles([UserRole.ADMIN])),
+):
+    """Move closed cases untouched for `older_than_days` to the archive tier in batches"""
+    job = archival.start_job(older_than_days, batch_size, current_user.username)
+    background_tasks.add_task(archival.run_job, job["_id"])
+    return {"job_id": job["_id"], "status": job["status"], "statuses": job["statuses"]}
+
+
+# === GET /admin/archive/{job_id} ===
+@admin_router.get("/archive/{job_id}")
+def get_archival_job(
+    job_id: str,
+    current_user: User = Depends(require_roles([UserRole.ADMIN])),
+):
+    """Progress of an archival job"""
+    job = archival.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Archival job not found")
+    job["job_id"] = job.pop("_id")
+    return job
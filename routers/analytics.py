@@ -1,12 +1,23 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from pydantic import BaseModel
 from typing import List, Optional
-from db import cases, incident_reports
-import pandas as pd
+import re
+from db import analytics_db, bump_data_version
+from models.user import User, UserRole
+from security.auth import require_roles
+from services.responses import MongoJSONResponse
+
+# services.analytics_engine and services.trends pull in pandas, pyarrow and
+# statsmodels; they are imported inside the endpoints that need them.
 
 analytics_router = APIRouter()
 
+# Read-only aggregates; served by secondaries when MONGO_ANALYTICS_READ_PREFERENCE allows
+cases = analytics_db["cases"]
+incident_reports = analytics_db["incident_reports"]
+
 
 # === Models ===
 class ViolationCount(BaseModel):
@@ -17,6 +28,8 @@ class ViolationCount(BaseModel):
 class TimelineData(BaseModel):
     date: str
     count: int
+    label: Optional[str] = None
+    series: Optional[str] = None
 
 
 class GeoMarker(BaseModel):
@@ -26,6 +39,18 @@ class GeoMarker(BaseModel):
     description: str
 
 
+class GeoCluster(BaseModel):
+    lat: float
+    lon: float
+    count: int
+
+
+class GeoClusters(BaseModel):
+    total: int
+    cell: float
+    clusters: List[GeoCluster]
+
+
 # === GET /analytics/violations ===
 @analytics_router.get("/violations", response_model=List[ViolationCount])
 def get_violation_counts(source: str = "reports", days: Optional[int] = None):
@@ -68,28 +93,136 @@ def get_violation_counts(source: str = "reports", days: Optional[int] = None):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# === GET /analytics/timeline ===
-@analytics_router.get("/timeline", response_model=List[TimelineData])
-def get_timeline_data(source: str = "reports", time_period: str = "month"):
-    """Get timeline data grouped by day/week/month/year"""
-    collection = incident_reports if source == "reports" else cases
-    date_field = "incident_details.date" if source == "reports" else "date_occurred"
+# === Helper: zero-filled timeline pipeline ===
+TIME_UNITS = ["day", "week", "month", "quarter", "year"]
+LABEL_FORMATS = {
+    "day": "%Y-%m-%d",
+    "week": "%G-W%V",
+    "month": "%Y-%m",
+    "quarter": "%Y-%m",
+    "year": "%Y",
+}
 
-    format_map = {"day": "%Y-%m-%d", "week": "%Y-%U", "month": "%Y-%m", "year": "%Y"}
-    date_format = format_map.get(time_period, "%Y-%m")
 
-    pipeline = [
-        {"$match": {date_field: {"$exists": True, "$type": "date"}}},
+def validate_timezone(tz: str) -> str:
+    """Accept Olson names (Asia/Gaza) or UTC offsets (+03:00), as $dateTrunc does"""
+    if re.fullmatch(r"[+-]\d{2}(:?\d{2})?", tz):
+        return tz
+    try:
+        ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {tz}")
+    return tz
+
+
+def build_timeline_pipeline(
+    date_field: str,
+    unit: str = "month",
+    bin_size: int = 1,
+    tz: str = "UTC",
+    series_field: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> list:
+    """Bucket documents with $dateTrunc and zero-fill empty buckets with $densify
+
+    Buckets are truncated in the requested timezone (weeks start on Monday, as
+    in ISO 8601) and then re-expressed as the local calendar date at UTC
+    midnight, so $densify can step through them without DST drift. With a
+    series field every series is densified over the same full range.
+    """
+    date_match = {"$type": "date"}
+    if start:
+        date_match["$gte"] = start
+    if end:
+        date_match["$lt"] = end
+
+    pipeline = [{"$match": {date_field: date_match}}]
+    if series_field:
+        pipeline.append({"$unwind": f"${series_field}"})
+
+    truncated = {
+        "$dateTrunc": {
+            "date": f"${date_field}",
+            "unit": unit,
+            "binSize": bin_size,
+            "timezone": tz,
+            "startOfWeek": "monday",
+        }
+    }
+    local_date = {
+        "$dateFromString": {
+            "dateString": {
+                "$dateToString": {"format": "%Y-%m-%d", "date": truncated, "timezone": tz}
+            },
+            "format": "%Y-%m-%d",
+        }
+    }
+    group_id = {"bucket": local_date}
+    if series_field:
+        group_id["series"] = f"${series_field}"
+
+    densify = {"field": "bucket", "range": {"step": bin_size, "unit": unit, "bounds": "full"}}
+    if series_field:
+        densify["partitionByFields"] = ["series"]
+
+    pipeline += [
+        {"$group": {"_id": group_id, "count": {"$sum": 1}}},
+        {"$project": {"_id": 0, "bucket": "$_id.bucket", "series": "$_id.series", "count": 1}},
+        {"$densify": densify},
+        {"$set": {"count": {"$ifNull": ["$count", 0]}}},
+        {"$sort": {"series": 1, "bucket": 1}},
         {
-            "$group": {
-                "_id": {
-                    "$dateToString": {"format": date_format, "date": f"${date_field}"}
-                },
-                "count": {"$sum": 1},
+            "$project": {
+                "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$bucket"}},
+                "label": {"$dateToString": {"format": LABEL_FORMATS[unit], "date": "$bucket"}},
+                "series": 1,
+                "count": 1,
             }
         },
-        {"$sort": {"_id": 1}},
     ]
+    return pipeline
+
+
+# === GET /analytics/timeline ===
+@analytics_router.get("/timeline", response_model=List[TimelineData])
+def get_timeline_data(
+    source: str = "reports",
+    time_period: str = "month",
+    tz: str = "UTC",
+    bin_size: int = Query(1, ge=1, le=366),
+    group_by: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """Get zero-filled timeline data bucketed by day/ISO week/month/quarter/year
+
+    `date` is the first day of each bucket in the requested timezone, `label`
+    is a display label (ISO week for weeks). Pass group_by=violation_type to
+    get one series per violation type, all covering the same buckets.
+    """
+    if time_period not in TIME_UNITS:
+        raise HTTPException(
+            status_code=400, detail=f"time_period must be one of {TIME_UNITS}"
+        )
+    if group_by not in (None, "violation_type"):
+        raise HTTPException(status_code=400, detail="group_by must be violation_type")
+
+    collection = incident_reports if source == "reports" else cases
+    date_field = "incident_details.date" if source == "reports" else "date_occurred"
+    violation_field = (
+        "incident_details.violation_types" if source == "reports" else "violation_types"
+    )
+
+    pipeline = build_timeline_pipeline(
+        date_field,
+        unit=time_period,
+        bin_size=bin_size,
+        tz=validate_timezone(tz),
+        series_field=violation_field if group_by else None,
+        start=start,
+        end=end,
+    )
 
     try:
         results = list(collection.aggregate(pipeline))
@@ -106,9 +239,13 @@ def get_geodata(source: str = "reports"):
     location_field = "incident_details.location" if source == "reports" else "location"
 
     query = {f"{location_field}.coordinates": {"$ne": None}}
+    if source == "reports":
+        fields = ["incident_details.location.coordinates.coordinates", "incident_details.violation_types", "incident_details.description"]
+    else:
+        fields = ["location.coordinates.coordinates", "violation_types", "title"]
 
     markers = []
-    for doc in collection.find(query):
+    for doc in collection.find(query, {"_id": 0, **dict.fromkeys(fields, 1)}):
         if source == "reports":
             coords = doc["incident_details"]["location"]["coordinates"]["coordinates"]
             violations = doc["incident_details"]["violation_types"]
@@ -129,7 +266,49 @@ def get_geodata(source: str = "reports"):
             }
         )
 
-    return markers
+    # Built from typed fields above, so GeoMarker validation is skipped
+    return MongoJSONResponse(markers)
+
+
+# === GET /analytics/geodata/clusters ===
+@analytics_router.get("/geodata/clusters", response_model=GeoClusters)
+def get_geodata_clusters(
+    source: str = "reports",
+    cell: float = Query(0.5, gt=0, le=10, description="Grid cell size in degrees"),
+):
+    """Incident counts per grid cell, for maps too large to send point by point"""
+    collection = incident_reports if source == "reports" else cases
+    location_field = "incident_details.location" if source == "reports" else "location"
+    points = f"${location_field}.coordinates.coordinates"
+
+    pipeline = [
+        {"$match": {f"{location_field}.coordinates": {"$ne": None}}},
+        {
+            "$project": {
+                "lon": {"$arrayElemAt": [points, 0]},
+                "lat": {"$arrayElemAt": [points, 1]},
+            }
+        },
+        {
+            "$group": {
+                "_id": {
+                    "x": {"$floor": {"$divide": ["$lon", cell]}},
+                    "y": {"$floor": {"$divide": ["$lat", cell]}},
+                },
+                # Centroid of the cell's incidents rather than the cell corner
+                "lat": {"$avg": "$lat"},
+                "lon": {"$avg": "$lon"},
+                "count": {"$sum": 1},
+            }
+        },
+        {"$project": {"_id": 0, "lat": 1, "lon": 1, "count": 1}},
+    ]
+    clusters = list(collection.aggregate(pipeline))
+    return MongoJSONResponse({
+        "total": sum(c["count"] for c in clusters),
+        "cell": cell,
+        "clusters": clusters,
+    })
 
 
 # === GET /analytics/summary ===
@@ -179,3 +358,137 @@ def get_system_summary():
     }
 
     return {"cases": case_stats, "reports": report_stats}
+
+
+# === GET /analytics/cube ===
+@analytics_router.get("/cube")
+def get_cube(
+    source: str = "reports",
+    by: List[str] = Query(["violation_type"]),
+    country: Optional[str] = None,
+    status: Optional[str] = None,
+    violation: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """Group-by counts over any combination of dimensions, served from the in-memory snapshot"""
+    from services import analytics_engine
+
+    if source not in analytics_engine.SOURCES:
+        raise HTTPException(status_code=400, detail="Source must be reports or cases")
+    try:
+        return analytics_engine.group_counts(
+            source, by, country=country, status=status, violation=violation, start=start, end=end
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# === GET /analytics/crosstab ===
+@analytics_router.get("/crosstab")
+def get_crosstab(
+    source: str = "reports",
+    rows: List[str] = Query(["violation_type"]),
+    columns: str = "country",
+    country: Optional[str] = None,
+    status: Optional[str] = None,
+    violation: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """Cross-tabulate counts, e.g. violation type x country, or violation type and country x month"""
+    from services import analytics_engine
+
+    if source not in analytics_engine.SOURCES:
+        raise HTTPException(status_code=400, detail="Source must be reports or cases")
+    try:
+        return analytics_engine.crosstab(
+            source, rows, columns, country=country, status=status, violation=violation, start=start, end=end
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# === GET /analytics/percentiles ===
+@analytics_router.get("/percentiles")
+def get_percentiles(
+    source: str = "reports",
+    by: List[str] = Query([]),
+    q: List[float] = Query([50, 90, 99]),
+    country: Optional[str] = None,
+    status: Optional[str] = None,
+    violation: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """Percentiles of the reporting delay in days (incident to report), optionally per group"""
+    from services import analytics_engine
+
+    if source not in analytics_engine.SOURCES:
+        raise HTTPException(status_code=400, detail="Source must be reports or cases")
+    if any(p < 0 or p > 100 for p in q):
+        raise HTTPException(status_code=400, detail="Percentiles must be between 0 and 100")
+    try:
+        return analytics_engine.percentiles(
+            source, by, q, country=country, status=status, violation=violation, start=start, end=end
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# === GET /analytics/trends ===
+@analytics_router.get("/trends")
+def get_trends(
+    source: str = "reports",
+    period: str = "week",
+    group_by: List[str] = Query(["violation_type", "country"]),
+    window: int = Query(4, ge=1, le=52),
+    threshold: float = Query(3.0, gt=0),
+    min_count: int = Query(3, ge=1),
+    violation: Optional[str] = None,
+    country: Optional[str] = None,
+    include_points: bool = True,
+):
+    """Rolling means, seasonal decomposition and spike alerts per violation type and country
+
+    Only closed buckets are analysed. Fits are cached per series and refitted
+    only when a new bucket closes or the series' data changes.
+    """
+    from services import analytics_engine, trends
+
+    if source not in analytics_engine.SOURCES:
+        raise HTTPException(status_code=400, detail="Source must be reports or cases")
+    try:
+        return trends.compute_trends(
+            source,
+            period,
+            group_by,
+            window=window,
+            threshold=threshold,
+            min_count=min_count,
+            include_points=include_points,
+            violation_type=violation,
+            country=country,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# === GET /analytics/snapshot ===
+@analytics_router.get("/snapshot")
+def get_snapshot_info():
+    """Show when the in-memory analytics snapshot was last built"""
+    from services import analytics_engine
+
+    return analytics_engine.snapshot.info()
+
+
+# === POST /analytics/snapshot/refresh ===
+@analytics_router.post("/snapshot/refresh")
+def refresh_snapshot(current_user: User = Depends(require_roles([UserRole.ADMIN]))):
+    """Rebuild the in-memory analytics snapshot now; other workers rebuild within ANALYTICS_SNAPSHOT_POLL seconds"""
+    from services import analytics_engine
+
+    bump_data_version(analytics_engine.REFRESH_SIGNAL)
+    analytics_engine.snapshot.refresh()
+    return analytics_engine.snapshot.info()
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Header, Query, Response
+from pydantic import BaseModel, Field, TypeAdapter, ValidationInfo, field_validator
 from typing import List, Optional
 from datetime import datetime, timezone
 from bson.objectid import ObjectId
@@ -7,9 +7,27 @@ import shutil
 import os
 import uuid
 import json
-from db import cases, case_status_history
+from itertools import chain
+from pymongo import ReturnDocument
+from db import ARCHIVE_COLLECTIONS, cases, case_status_history, cases_archive, search_db
+from services import archival, geo
+from routers.geo import nearest, parse_sources
+from services.responses import MongoJSONResponse, validated_response
+from services.versioning import (
+    INITIAL_VERSION,
+    current_version,
+    parse_if_match,
+    raise_for_missing,
+    set_etag,
+    version_filter,
+    version_increment,
+)
 
 case_router = APIRouter()
+# Filtered listings tolerate bounded staleness and read from the search tier,
+# unless the client asks for fresh=true after its own write
+search_cases = search_db["cases"]
+search_cases_archive = search_db[ARCHIVE_COLLECTIONS["cases"]]
 
 
 # === Pydantic Models ===
@@ -28,7 +46,20 @@ class Evidence(BaseModel):
 class CaseLocation(BaseModel):
     country: str
     region: Optional[str]
-    coordinates: dict
+    # Stored as a GeoJSON Point for the 2dsphere index
+    coordinates: Optional[dict] = None
+
+    @field_validator("coordinates", mode="before")
+    @classmethod
+    def normalise_coordinates(cls, value, info: ValidationInfo):
+        try:
+            return geo.to_geojson_point(value)
+        except ValueError:
+            # Stored cases are read back through this model too; one legacy
+            # value (fixed by scripts/migrate_geo.py) must not fail a listing
+            if (info.context or {}).get("submitted"):
+                raise
+            return None
 
 
 class CaseModel(BaseModel):
@@ -48,6 +79,14 @@ class CaseModel(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     incident_report_id: Optional[str] = None
+    # Set by the API; send it back as If-Match when updating the case
+    version: int = 0
+    # Set when the case was moved to the archive tier
+    archived_at: Optional[datetime] = None
+
+
+# Compiled once; list_cases validates and serializes through it
+CASE_LIST = TypeAdapter(List[CaseModel])
 
 
 # === Helper: Save uploaded file ===
@@ -67,7 +106,7 @@ async def create_case(
 ):
     try:
         case_data = json.loads(case)
-        case_obj = CaseModel(**case_data)
+        case_obj = CaseModel.model_validate(case_data, context={"submitted": True})
 
         # Save uploaded files and construct Evidence list
         saved_evidence = []
@@ -86,6 +125,7 @@ async def create_case(
         case_dict["evidence"] = [e.dict() for e in saved_evidence]
         case_dict["created_at"] = datetime.now(timezone.utc)
         case_dict["updated_at"] = datetime.now(timezone.utc)
+        case_dict["version"] = INITIAL_VERSION
 
         cases.insert_one(case_dict)
         case_status_history.insert_one(
@@ -109,6 +149,8 @@ def list_cases(
     status: Optional[str] = None,
     country: Optional[str] = None,
     violation: Optional[str] = None,
+    include_archived: bool = False,
+    fresh: bool = Query(False, description="Read from the primary, e.g. right after this client wrote"),
 ):
     query = {}
     if status:
@@ -118,48 +160,175 @@ def list_cases(
     if violation:
         query["violation_types"] = {"$in": [violation]}
 
-    results = list(cases.find(query))
-    for r in results:
-        r["_id"] = str(r["_id"])  # Convert ObjectId to string
-    return results
+    # _id is not part of CaseModel, so it is never fetched
+    working, archive = (cases, cases_archive) if fresh else (search_cases, search_cases_archive)
+    results = working.find(query, {"_id": 0})
+    if include_archived:
+        results = chain(results, archive.find(query, {"_id": 0}))
+    return validated_response(CASE_LIST, results)
+
+
+# === POST /cases/bulk-status ===
+BULK_STATUS_MAX_CASES = 1000
+
+
+class BulkStatusUpdate(BaseModel):
+    case_ids: List[str] = Field(..., min_length=1, max_length=BULK_STATUS_MAX_CASES)
+    status: str
+
+
+@case_router.post("/bulk-status", response_model=dict)
+def bulk_update_case_status(update: BulkStatusUpdate):
+    """Move many cases to one status; reports an outcome per case ID
+
+    One read for the current statuses, one update_many and one insert_many of
+    history entries, however many cases are in the batch. Cases changed by
+    another request between the read and the update are reported as
+    "conflict", at the cost of one more read.
+    """
+    case_ids = list(dict.fromkeys(update.case_ids))
+    previous = {
+        doc["case_id"]: doc.get("status")
+        for doc in cases.find({"case_id": {"$in": case_ids}}, {"_id": 0, "case_id": 1, "status": 1})
+    }
+    to_update = [c for c in case_ids if c in previous and previous[c] != update.status]
+
+    now = datetime.now(timezone.utc)
+    conflicts = set()
+    if to_update:
+        # Each case must still have the status it was read with, so one moved
+        # by another request in the meantime is skipped, not given a wrong
+        # previous_status
+        by_previous = {}
+        for case_id in to_update:
+            by_previous.setdefault(previous[case_id], []).append(case_id)
+        result = cases.update_many(
+            {"$or": [{"case_id": {"$in": ids}, "status": status} for status, ids in by_previous.items()]},
+            {"$set": {"status": update.status, "updated_at": now}, **version_increment()},
+        )
+        if result.modified_count != len(to_update):
+            # Only the cases carrying this update's timestamp were changed here
+            changed = {
+                doc["case_id"]
+                for doc in cases.find(
+                    {"case_id": {"$in": to_update}, "status": update.status, "updated_at": now},
+                    {"_id": 0, "case_id": 1},
+                )
+            }
+            conflicts = set(to_update) - changed
+            to_update = [case_id for case_id in to_update if case_id in changed]
+    if to_update:
+        case_status_history.insert_many(
+            [
+                {
+                    "case_id": case_id,
+                    "status": update.status,
+                    "previous_status": previous[case_id],
+                    "timestamp": now,
+                    "changed_by": "admin",
+                }
+                for case_id in to_update
+            ],
+            ordered=False,
+        )
+
+    results = []
+    for case_id in case_ids:
+        if case_id not in previous:
+            outcome = "not_found"
+        elif case_id in to_update:
+            outcome = "updated"
+        elif case_id in conflicts:
+            outcome = "conflict"
+        else:
+            outcome = "unchanged"
+        results.append({"case_id": case_id, "outcome": outcome, "previous_status": previous.get(case_id)})
+    return {
+        "status": update.status,
+        "updated": len(to_update),
+        "unchanged": sum(r["outcome"] == "unchanged" for r in results),
+        "not_found": sum(r["outcome"] == "not_found" for r in results),
+        "conflict": len(conflicts),
+        "results": results,
+    }
 
 
 # === GET /cases/{case_id} ===
 @case_router.get("/{case_id}", response_model=CaseModel)
-def get_case(case_id: str):
+def get_case(case_id: str, response: Response, include_archived: bool = False):
     result = cases.find_one({"case_id": case_id})
+    if not result and include_archived:
+        result = cases_archive.find_one({"case_id": case_id})
     if not result:
         raise HTTPException(status_code=404, detail="Case not found")
+    set_etag(response, current_version(result))
     result["_id"] = str(result["_id"])  # Convert ObjectId to string
     return result
 
 
+# === GET /cases/{case_id}/nearby ===
+@case_router.get("/{case_id}/nearby")
+def get_nearby_incidents(
+    case_id: str,
+    radius_km: float = Query(20, gt=0, le=geo.MAX_RADIUS_KM),
+    source: str = "all",
+    limit: int = Query(50, ge=1, le=geo.MAX_RESULTS),
+):
+    """Other cases and reports within `radius_km` of this case, nearest first"""
+    case = cases.find_one({"case_id": case_id}, {"location.coordinates": 1})
+    if not case:
+        raise HTTPException(status_code=404, detail="Case not found")
+    try:
+        origin = geo.to_geojson_point((case.get("location") or {}).get("coordinates"))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=f"Case coordinates are invalid ({e}); run scripts/migrate_geo.py")
+    if not origin:
+        raise HTTPException(status_code=409, detail="Case has no coordinates")
+    results = nearest(parse_sources(source), origin, limit, radius_km, exclude_case=case_id)
+    return MongoJSONResponse(results)
+
+
 # === PATCH /cases/{case_id} ===
 @case_router.patch("/{case_id}", response_model=dict)
-def update_case_status(case_id: str, status: str):
-    result = cases.update_one(
-        {"case_id": case_id},
-        {"$set": {"status": status, "updated_at": datetime.now(timezone.utc)}},
+def update_case_status(
+    case_id: str,
+    status: str,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+):
+    """Set a case's status; with If-Match, only if the case is still at that version"""
+    expected = parse_if_match(if_match)
+    key = {"case_id": case_id}
+    previous = cases.find_one_and_update(
+        {**key, **version_filter(expected)},
+        {
+            "$set": {"status": status, "updated_at": datetime.now(timezone.utc)},
+            **version_increment(),
+        },
+        projection={"status": 1, "version": 1},
+        return_document=ReturnDocument.BEFORE,
     )
-    if result.modified_count == 0:
-        raise HTTPException(status_code=404, detail="Case not found")
+    if previous is None:
+        raise_for_missing(cases, key, expected, "Case not found")
 
     case_status_history.insert_one(
         {
             "case_id": case_id,
             "status": status,
+            "previous_status": previous.get("status"),
             "timestamp": datetime.now(timezone.utc),
             "changed_by": "admin",
         }
     )
 
+    set_etag(response, current_version(previous) + 1)
     return {"message": "Case status updated"}
 
 
 # === DELETE /cases/{case_id} ===
 @case_router.delete("/{case_id}", response_model=dict)
 def archive_case(case_id: str):
-    result = cases.delete_one({"case_id": case_id})
-    if result.deleted_count == 0:
+    """Move the case and its status history to the archive tier"""
+    if not archival.archive_case(case_id):
         raise HTTPException(status_code=404, detail="Case not found")
     return {"message": "Case archived successfully"}
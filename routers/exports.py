@@ -0,0 +1,92 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from models.user import User, UserRole
+from security.auth import require_roles
+
+export_router = APIRouter()
+
+# Media type, file extension and services.columnar writer for each format.
+# services.columnar (pyarrow) is only imported once an export is requested.
+FORMATS = {
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows", "stream_arrow"),
+    "parquet": ("application/vnd.apache.parquet", "parquet", "stream_parquet"),
+}
+DEFAULT_BATCH_SIZE = 5000
+
+
+# === Helper: stream a dataset in the requested format ===
+def export_dataset(dataset: str, format: str, query: dict, batch_size: int):
+    if format not in FORMATS:
+        raise HTTPException(
+            status_code=400, detail="Format must be one of: arrow, parquet"
+        )
+    from services import columnar
+
+    media_type, extension, writer = FORMATS[format]
+    schema = columnar.DATASETS[dataset]["schema"]
+    batches = columnar.iter_record_batches(dataset, query, batch_size)
+    return StreamingResponse(
+        getattr(columnar, writer)(batches, schema),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{dataset}.{extension}"'
+        },
+    )
+
+
+# === GET /exports/cases ===
+@export_router.get("/cases")
+def export_cases(
+    format: str = "arrow",
+    status: Optional[str] = None,
+    country: Optional[str] = None,
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=100, le=50000),
+):
+    """Export cases as an Arrow IPC stream or Parquet file"""
+    query = {}
+    if status:
+        query["status"] = status
+    if country:
+        query["location.country"] = country
+    return export_dataset("cases", format, query, batch_size)
+
+
+# === GET /exports/reports ===
+@export_router.get("/reports")
+def export_reports(
+    format: str = "arrow",
+    status: Optional[str] = None,
+    country: Optional[str] = None,
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=100, le=50000),
+):
+    """Export incident reports (without contact details) as Arrow or Parquet"""
+    query = {}
+    if status:
+        query["status"] = status
+    if country:
+        query["incident_details.location.country"] = country
+    return export_dataset("reports", format, query, batch_size)
+
+
+# === GET /exports/status-history ===
+@export_router.get("/status-history")
+def export_status_history(
+    format: str = "arrow",
+    case_id: Optional[str] = None,
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=100, le=50000),
+):
+    """Export the case status history as Arrow or Parquet"""
+    query = {"case_id": case_id} if case_id else {}
+    return export_dataset("status_history", format, query, batch_size)
+
+
+# === GET /exports/risk-assessments ===
+@export_router.get("/risk-assessments")
+def export_risk_assessments(
+    format: str = "arrow",
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=100, le=50000),
+    current_user: User = Depends(require_roles([UserRole.ADMIN, UserRole.CASE_MANAGER])),
+):
+    """Export victim risk assessment logs as Arrow or Parquet (restricted access)"""
+    return export_dataset("risk_assessments", format, {}, batch_size)
@@ -0,0 +1,105 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Optional, Tuple
+from pymongo.errors import OperationFailure
+from db import search_db
+from services import geo
+from services.responses import MongoJSONResponse
+
+geo_router = APIRouter()
+
+# Map queries tolerate bounded staleness like the other listings
+SOURCES = {
+    "cases": search_db["cases"],
+    "reports": search_db["incident_reports"],
+}
+COLLECTION_NAMES = {"cases": "cases", "reports": "incident_reports"}
+# $geoNear without a usable 2dsphere index fails with IndexNotFound or
+# NoQueryExecutionPlans; an invalid query geometry fails with BadValue
+GEO_INDEX_MISSING = {27, 291}
+BAD_VALUE = 2
+
+
+# === Helper: run $geoNear on each source and merge by distance ===
+def nearest(
+    sources: List[str],
+    origin: dict,
+    limit: int,
+    max_distance_km: Optional[float] = None,
+    shape: Optional[dict] = None,
+    bounds: Optional[Tuple[float, float, float, float]] = None,
+    violation: Optional[str] = None,
+    exclude_case: Optional[str] = None,
+) -> list:
+    results = []
+    for source in sources:
+        name = COLLECTION_NAMES[source]
+        query = geo.within_query(name, shape, bounds) if shape else {}
+        if violation:
+            field = "violation_types" if source == "cases" else "incident_details.violation_types"
+            query[field] = violation
+        if exclude_case and source == "cases":
+            query["case_id"] = {"$ne": exclude_case}
+        pipeline = geo.near_pipeline(name, origin, limit, max_distance_km, query)
+        try:
+            results.extend(SOURCES[source].aggregate(pipeline))
+        except OperationFailure as e:
+            errmsg = (e.details or {}).get("errmsg", str(e))
+            # $geoNear needs the 2dsphere index, which needs clean coordinates
+            if e.code in GEO_INDEX_MISSING:
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Geospatial index unavailable for {source}; run scripts/migrate_geo.py ({errmsg})",
+                )
+            if e.code == BAD_VALUE:
+                raise HTTPException(status_code=400, detail=f"Invalid geometry: {errmsg}")
+            raise
+    results.sort(key=lambda r: r["distance_km"])
+    return results[:limit]
+
+
+def parse_sources(source: str) -> List[str]:
+    if source == "all":
+        return list(SOURCES)
+    if source not in SOURCES:
+        raise HTTPException(status_code=400, detail="source must be cases, reports or all")
+    return [source]
+
+
+# === GET /geo/near ===
+@geo_router.get("/near")
+def incidents_near(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(20, gt=0, le=geo.MAX_RADIUS_KM),
+    source: str = "all",
+    violation: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=geo.MAX_RESULTS),
+):
+    """Cases and/or reports within `radius_km` of a point, nearest first"""
+    results = nearest(parse_sources(source), geo.point(lon, lat), limit, radius_km, violation=violation)
+    return MongoJSONResponse(results)
+
+
+# === GET /geo/within ===
+@geo_router.get("/within")
+def incidents_within(
+    bbox: Optional[str] = Query(None, description="minLon,minLat,maxLon,maxLat"),
+    polygon: Optional[str] = Query(None, description="lon,lat;lon,lat;lon,lat;..."),
+    source: str = "all",
+    violation: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=geo.MAX_RESULTS),
+):
+    """Cases and/or reports inside a bounding box or polygon, nearest to its centre first"""
+    if (bbox is None) == (polygon is None):
+        raise HTTPException(status_code=400, detail="Pass exactly one of bbox or polygon")
+    bounds = None
+    try:
+        if bbox:
+            bounds = geo.parse_bbox(bbox)
+            shape = geo.bbox_polygon(bounds)
+        else:
+            shape = geo.parse_polygon(polygon)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    results = nearest(parse_sources(source), geo.centroid(shape), limit, shape=shape, bounds=bounds, violation=violation)
+    return MongoJSONResponse(results)
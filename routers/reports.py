@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Header, Query, Response
+from fastapi.responses import FileResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
 import os
@@ -7,10 +9,30 @@ import json
 import shutil
 import uuid
 from bson.objectid import ObjectId
-from db import incident_reports, report_evidence, cases
+from pymongo import ReturnDocument
+from db import analytics_db, search_db, incident_reports, report_evidence, cases
+from routers.analytics import TIME_UNITS, build_timeline_pipeline, validate_timezone
+from security.auth import get_current_user
+from services import pdf_reports
+from services.responses import MongoJSONResponse
+from services.versioning import (
+    INITIAL_VERSION,
+    current_version,
+    parse_if_match,
+    raise_for_missing,
+    set_etag,
+    version_filter,
+    version_increment,
+)
 
 report_router = APIRouter()
 MEDIA_DIR = "media"
+# Listings read from the search tier (the primary with fresh=true), aggregates
+# from the analytics tier
+search_reports = search_db["incident_reports"]
+analytics_reports = analytics_db["incident_reports"]
+# PDF jobs for public datasets need no login, so the bearer token is optional
+optional_bearer = HTTPBearer(auto_error=False)
 
 
 # === Models ===
@@ -133,6 +155,7 @@ async def create_report(
         "evidence": saved_evidence,
         "status": "new",
         "created_at": datetime.utcnow(),
+        "version": INITIAL_VERSION,
     }
 
     incident_reports.insert_one(report)
@@ -146,6 +169,7 @@ def list_reports(
     country: Optional[str] = None,
     violation: Optional[str] = None,
     date: Optional[str] = None,
+    fresh: bool = Query(False, description="Read from the primary, e.g. right after this client wrote"),
 ):
     query = {}
     if status:
@@ -157,20 +181,32 @@ def list_reports(
     if date:
         query["incident_details.date"] = datetime.fromisoformat(date)
 
-    results = list(incident_reports.find(query))
-    for r in results:
-        r["_id"] = str(r["_id"])
-    return results
+    collection = incident_reports if fresh else search_reports
+    return MongoJSONResponse(list(collection.find(query)))
 
 
 # === PATCH /reports/{report_id} ===
 @report_router.patch("/{report_id}")
-def update_report_status(report_id: str, status: str):
-    result = incident_reports.update_one(
-        {"_id": ObjectId(report_id)}, {"$set": {"status": status}}
+def update_report_status(
+    report_id: str,
+    status: str,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+):
+    """Set a report's status; with If-Match, only if the report is still at that version"""
+    if not ObjectId.is_valid(report_id):
+        raise HTTPException(status_code=400, detail="Invalid report ID format")
+    expected = parse_if_match(if_match)
+    key = {"_id": ObjectId(report_id)}
+    previous = incident_reports.find_one_and_update(
+        {**key, **version_filter(expected)},
+        {"$set": {"status": status}, **version_increment()},
+        projection={"version": 1},
+        return_document=ReturnDocument.BEFORE,
     )
-    if result.modified_count == 0:
-        raise HTTPException(status_code=404, detail="Report not found")
+    if previous is None:
+        raise_for_missing(incident_reports, key, expected, "Report not found")
+    set_etag(response, current_version(previous) + 1)
     return {"message": "Status updated"}
 
 
@@ -194,46 +230,117 @@ def report_analytics():
         {"$group": {"_id": "$incident_details.violation_types", "count": {"$sum": 1}}},
         {"$sort": {"count": -1}},
     ]
-    stats = list(incident_reports.aggregate(pipeline))
+    stats = list(analytics_reports.aggregate(pipeline))
     return [{"violation_type": s["_id"], "count": s["count"]} for s in stats]
 
 
 # === GET /reports/analytics/timeline ===
 @report_router.get("/analytics/timeline")
-def report_timeline():
-    pipeline = [
-        {
-            "$group": {
-                "_id": {
-                    "$dateToString": {
-                        "format": "%Y-%m-%d",
-                        "date": "$incident_details.date",
-                    }
-                },
-                "count": {"$sum": 1},
-            }
-        },
-        {"$sort": {"_id": 1}},
-    ]
-    data = list(incident_reports.aggregate(pipeline))
-    return [{"date": d["_id"], "count": d["count"]} for d in data]
+def report_timeline(time_period: str = "day", tz: str = "UTC"):
+    if time_period not in TIME_UNITS:
+        raise HTTPException(
+            status_code=400, detail=f"time_period must be one of {TIME_UNITS}"
+        )
+    pipeline = build_timeline_pipeline(
+        "incident_details.date", unit=time_period, tz=validate_timezone(tz)
+    )
+    data = list(analytics_reports.aggregate(pipeline))
+    return [{"date": d["date"], "count": d["count"]} for d in data]
 
 
 # === GET /reports/analytics/geodata ===
 @report_router.get("/analytics/geodata")
 def report_geodata():
-    results = incident_reports.find(
-        {"incident_details.location.coordinates": {"$ne": None}}
+    results = analytics_reports.find(
+        {"incident_details.location.coordinates": {"$ne": None}},
+        {
+            "_id": 0,
+            "incident_details.location.coordinates.coordinates": 1,
+            "incident_details.violation_types": 1,
+            "incident_details.description": 1,
+        },
     )
     markers = []
     for r in results:
-        coords = r["incident_details"]["location"]["coordinates"]["coordinates"]
+        details = r["incident_details"]
+        coords = details["location"]["coordinates"]["coordinates"]
         markers.append(
             {
                 "lat": coords[1],
                 "lon": coords[0],
-                "violations": r["incident_details"]["violation_types"],
-                "description": r["incident_details"]["description"],
+                "violations": details["violation_types"],
+                "description": details["description"],
             }
         )
-    return markers
+    return MongoJSONResponse(markers)
+
+
+# === PDF report jobs ===
+class PdfJobRequest(BaseModel):
+    dataset: str = "reports"
+    filters: Dict[str, str] = {}
+
+
+async def authorize_pdf(dataset: str, credentials: Optional[HTTPAuthorizationCredentials]):
+    """Apply the dataset's role restriction, if any (victim records need a login)"""
+    roles = pdf_reports.required_roles(dataset)
+    if not roles:
+        return
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    user = await get_current_user(credentials)
+    if not any(role in user.roles for role in roles):
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+
+
+async def find_pdf_job(job_id: str, credentials: Optional[HTTPAuthorizationCredentials]) -> dict:
+    job = pdf_reports.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="PDF job not found")
+    await authorize_pdf(job["dataset"], credentials)
+    return job
+
+
+# === POST /reports/pdf ===
+@report_router.post("/pdf", status_code=202)
+async def request_pdf(
+    request: PdfJobRequest,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer),
+):
+    """Queue a PDF of cases, reports or victims; identical requests reuse one file"""
+    if request.dataset not in pdf_reports.DATASETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Dataset must be one of: {', '.join(pdf_reports.DATASETS)}",
+        )
+    await authorize_pdf(request.dataset, credentials)
+    try:
+        job = pdf_reports.submit(request.dataset, request.filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return pdf_reports.job_status(job)
+
+
+# === GET /reports/pdf/{job_id} ===
+@report_router.get("/pdf/{job_id}")
+async def get_pdf_job(
+    job_id: str,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer),
+):
+    """Status of a PDF job"""
+    return pdf_reports.job_status(await find_pdf_job(job_id, credentials))
+
+
+# === GET /reports/pdf/{job_id}/download ===
+@report_router.get("/pdf/{job_id}/download")
+async def download_pdf(
+    job_id: str,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer),
+):
+    """Download a finished PDF"""
+    job = await find_pdf_job(job_id, credentials)
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"PDF is not ready (status: {job['status']})")
+    if not os.path.isfile(job["path"]):
+        raise HTTPException(status_code=410, detail="PDF has expired; request it again")
+    return FileResponse(job["path"], media_type="application/pdf", filename=f"{job['dataset']}.pdf")
@@ -1,59 +1,452 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Response, Body, Header
 from typing import List, Optional
 from bson import ObjectId
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import os
+from pydantic import ValidationError
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure, PyMongoError
 from models.victim import VictimCreate, VictimUpdate, VictimResponse, RiskLevel
 from models.user import User, UserRole
-from db import individuals_collection, victim_risk_assessments  # Updated import
+from db import individuals_collection, victim_risk_assessments, search_db, analytics_db, WATCHLIST_FILTER, WATCHLIST_INDEX  # Updated import
 from security.auth import get_current_user, require_roles
 from security.encryption import encrypt_sensitive_data, decrypt_sensitive_data
+from services.risk import LEVEL_ORDER, RANK_NAMES, RISK_RANK, risk_rank
+from services.versioning import INITIAL_VERSION, current_version, parse_if_match, raise_for_missing, set_etag, version_filter
 
 router = APIRouter(prefix="/victims", tags=["victims"])
 
+# Filtered listings read from the search tier (bounded staleness), or the
+# primary with fresh=true
+search_individuals = search_db["individuals"]
+# Population-level risk trajectories are analytics reads
+analytics_assessments = analytics_db["victim_risk_assessments"]
+
 # Helper function to convert ObjectId to string
 def victim_helper(victim) -> dict:
     victim["_id"] = str(victim["_id"])
+    victim["cases_involved"] = [str(case_id) for case_id in victim.get("cases_involved") or []]
     return victim
 
+# Ids rendered as strings by the database, so results serialise as they are
+ID_FIELDS = {
+    "_id": {"$toString": "$_id"},
+    "cases_involved": {
+        "$map": {"input": {"$ifNull": ["$cases_involved", []]}, "in": {"$toString": "$$this"}}
+    },
+}
+
+# What non-admin readers may see: no contact details beyond the preferred
+# channel, and no demographics for anonymous individuals
+REDACTED_FIELDS = {
+    "type": 1,
+    "anonymous": 1,
+    "pseudonym": 1,
+    "demographics": {"$cond": [{"$eq": ["$anonymous", True]}, None, "$demographics"]},
+    "contact_info.preferred_contact": 1,
+    "risk_assessment": 1,
+    "support_services": 1,
+    "notes": 1,
+    "created_by": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "last_assessed_at": 1,
+    "last_escalated_at": 1,
+}
+
+def victim_projection(current_user: User) -> dict:
+    """Role-aware stage: redaction happens in the query, not after the documents arrive"""
+    if UserRole.ADMIN in current_user.roles:
+        return {"$set": ID_FIELDS}
+    return {"$project": {**REDACTED_FIELDS, **ID_FIELDS}}
+
+def _encrypt_contact_info(victim_dict: dict) -> dict:
+    """Encrypt the email and phone of a victim document in place"""
+    contact_info = victim_dict.get("contact_info")
+    if contact_info:
+        if contact_info.get("email"):
+            contact_info["email"] = encrypt_sensitive_data(contact_info["email"])
+        if contact_info.get("phone"):
+            contact_info["phone"] = encrypt_sensitive_data(contact_info["phone"])
+    return victim_dict
+
+def new_victim_document(victim: VictimCreate, username: str, now: datetime) -> dict:
+    """Unencrypted individuals document for a validated record"""
+    victim_dict = victim.dict()
+    victim_dict["created_at"] = now
+    victim_dict["updated_at"] = now
+    victim_dict["created_by"] = username
+    victim_dict["cases_involved"] = []
+    # Denormalised for the protection watchlist
+    victim_dict["last_assessed_at"] = now
+    victim_dict["last_escalated_at"] = None
+    victim_dict["version"] = INITIAL_VERSION
+    return victim_dict
+
+def initial_risk_log(victim_id: ObjectId, victim: VictimCreate, username: str, now: datetime) -> dict:
+    return {
+        "victim_id": victim_id,
+        "risk_level": victim.risk_assessment.level,
+        "assessed_by": username,
+        "assessed_at": now,
+        "notes": victim.risk_assessment.notes
+    }
+
 @router.post("/", response_model=dict)
 async def create_victim(
     victim: VictimCreate,
     current_user: User = Depends(require_roles([UserRole.ADMIN, UserRole.CASE_MANAGER]))
 ):
     """Create a new victim/witness record"""
-    victim_dict = victim.dict()
+    now = datetime.utcnow()
+    victim_dict = _encrypt_contact_info(new_victim_document(victim, current_user.username, now))
 
-    # Encrypt sensitive contact information
-    if victim_dict.get("contact_info"):
-        contact_info = victim_dict["contact_info"]
-        if contact_info.get("email"):
-            contact_info["email"] = encrypt_sensitive_data(contact_info["email"])
-        if contact_info.get("phone"):
-            contact_info["phone"] = encrypt_sensitive_data(contact_info["phone"])
+    try:
+        result = individuals_collection.insert_one(victim_dict)  # Updated collection name
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail=f"An individual with legacy_id {victim.legacy_id} already exists")
 
-    # Add metadata
-    victim_dict["created_at"] = datetime.utcnow()
-    victim_dict["updated_at"] = datetime.utcnow()
-    victim_dict["created_by"] = current_user.username
-    victim_dict["cases_involved"] = []
+    # Log risk assessment
+    victim_risk_assessments.insert_one(initial_risk_log(result.inserted_id, victim, current_user.username, now))
 
-    result = individuals_collection.insert_one(victim_dict)  # Updated collection name
+    return {"message": "Victim/witness created successfully", "id": str(result.inserted_id)}
 
-    # Log risk assessment
-    risk_log = {
-        "victim_id": result.inserted_id,
-        "risk_level": victim.risk_assessment.level,
-        "assessed_by": current_user.username,
-        "assessed_at": datetime.utcnow(),
-        "notes": victim.risk_assessment.notes
+# === POST /victims/bulk ===
+BULK_MAX_RECORDS = 10000
+BULK_CHUNK_SIZE = 1000
+# Contact fields are encrypted in chunks across this pool before any write
+_encryption_pool = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="encrypt")
+
+def _encrypt_chunk(docs: List[dict]) -> List[dict]:
+    return [_encrypt_contact_info(doc) for doc in docs]
+
+def _insert_chunk(collection, docs: List[dict]) -> set:
+    """Insert a chunk of documents; returns the positions that were not written
+
+    A timeout or failover can leave part of the chunk written, so after any
+    other driver error the chunk is looked up by the _ids assigned before the
+    insert.
+    """
+    try:
+        collection.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        return {error["index"] for error in e.details.get("writeErrors", [])}
+    except PyMongoError:
+        try:
+            ids = [doc["_id"] for doc in docs if "_id" in doc]
+            written = {doc["_id"] for doc in collection.find({"_id": {"$in": ids}}, {"_id": 1})}
+        except PyMongoError:
+            written = set()
+        return {position for position, doc in enumerate(docs) if doc.get("_id") not in written}
+    return set()
+
+def _imported(legacy_ids) -> dict:
+    """legacy_id -> id of the individuals already imported under those ids"""
+    if not legacy_ids:
+        return {}
+    found = individuals_collection.find({"legacy_id": {"$in": list(legacy_ids)}}, {"legacy_id": 1})
+    return {doc["legacy_id"]: str(doc["_id"]) for doc in found}
+
+@router.post("/bulk", response_model=dict)
+def bulk_create_victims(
+    records: List[dict] = Body(..., max_length=BULK_MAX_RECORDS),
+    current_user: User = Depends(require_roles([UserRole.ADMIN, UserRole.CASE_MANAGER]))
+):
+    """Import many victim/witness records; each row is validated and reported on its own"""
+    now = datetime.utcnow()
+    results = [None] * len(records)
+    valid = []
+    legacy_ids = set()
+    for index, record in enumerate(records):
+        try:
+            victim = VictimCreate.model_validate(record)
+        except ValidationError as e:
+            results[index] = {
+                "index": index,
+                "status": "invalid",
+                "errors": [{"loc": list(err["loc"]), "msg": err["msg"]} for err in e.errors()],
+            }
+            continue
+        if victim.legacy_id is not None:
+            if victim.legacy_id in legacy_ids:
+                results[index] = {
+                    "index": index,
+                    "status": "invalid",
+                    "errors": [{"loc": ["legacy_id"], "msg": "legacy_id repeated in this import"}],
+                }
+                continue
+            legacy_ids.add(victim.legacy_id)
+        valid.append((index, victim))
+
+    # Rows written by an earlier attempt of the same import are not inserted again
+    imported = _imported(legacy_ids)
+    for index, victim in valid:
+        if victim.legacy_id in imported:
+            results[index] = {"index": index, "status": "existing", "id": imported[victim.legacy_id]}
+    valid = [(index, victim) for index, victim in valid if results[index] is None]
+
+    chunks = [valid[i:i + BULK_CHUNK_SIZE] for i in range(0, len(valid), BULK_CHUNK_SIZE)]
+    plain = [[new_victim_document(victim, current_user.username, now) for _, victim in chunk] for chunk in chunks]
+    for chunk, docs in zip(chunks, _encryption_pool.map(_encrypt_chunk, plain)):
+        # Ids are assigned here so the risk logs can reference them in the same pass
+        for doc in docs:
+            doc["_id"] = ObjectId()
+        failed = _insert_chunk(individuals_collection, docs)
+        # A concurrent retry of the same import may have written some of them
+        try:
+            raced = _imported({chunk[position][1].legacy_id for position in failed} - {None})
+        except PyMongoError:
+            raced = {}
+        risk_logs, logged = [], []
+        for position, ((index, victim), doc) in enumerate(zip(chunk, docs)):
+            if position in failed:
+                if victim.legacy_id in raced:
+                    results[index] = {"index": index, "status": "existing", "id": raced[victim.legacy_id]}
+                else:
+                    results[index] = {"index": index, "status": "failed", "errors": [{"msg": "Insert failed"}]}
+                continue
+            log = initial_risk_log(doc["_id"], victim, current_user.username, now)
+            log["_id"] = ObjectId()
+            risk_logs.append(log)
+            logged.append(index)
+            results[index] = {"index": index, "status": "created", "id": str(doc["_id"])}
+        # The individuals are already written, so a missing log is reported on the row
+        for position in _insert_chunk(victim_risk_assessments, risk_logs) if risk_logs else ():
+            results[logged[position]]["risk_log"] = "failed"
+
+    counts = {"created": 0, "existing": 0, "invalid": 0, "failed": 0}
+    for result in results:
+        counts[result["status"]] += 1
+    counts["risk_logs_failed"] = sum(1 for result in results if result.get("risk_log") == "failed")
+    return {**counts, "results": results}
+
+# === Risk trajectories ===
+# Each entry alongside the one before it, per victim in assessment order
+PREVIOUS_RANK = {
+    "$setWindowFields": {
+        "partitionBy": "$victim_id",
+        "sortBy": {"assessed_at": 1},
+        "output": {"previous_rank": {"$shift": {"output": "$rank", "by": -1}}},
     }
-    victim_risk_assessments.insert_one(risk_log)
+}
+
+
+@router.get("/risk/escalations", response_model=List[dict])
+async def get_risk_escalations(
+    weeks: int = Query(12, ge=1, le=260),
+    current_user: User = Depends(require_roles([UserRole.ADMIN, UserRole.CASE_MANAGER, UserRole.ANALYST]))
+):
+    """Risk escalations per ISO week across all victims/witnesses"""
+    since = datetime.utcnow() - timedelta(weeks=weeks)
+    pipeline = [
+        {"$set": {"rank": RISK_RANK}},
+        PREVIOUS_RANK,
+        {
+            "$match": {
+                "assessed_at": {"$gte": since},
+                "previous_rank": {"$ne": None},
+                "$expr": {"$gt": ["$rank", "$previous_rank"]},
+            }
+        },
+        {
+            "$group": {
+                "_id": {"$dateTrunc": {"date": "$assessed_at", "unit": "week", "startOfWeek": "monday"}},
+                "escalations": {"$sum": 1},
+                "to_high": {"$sum": {"$cond": [{"$eq": ["$rank", 3]}, 1, 0]}},
+                "victims": {"$addToSet": "$victim_id"},
+            }
+        },
+        {"$sort": {"_id": 1}},
+        {
+            "$project": {
+                "_id": 0,
+                "week": {"$dateToString": {"date": "$_id", "format": "%Y-%m-%d"}},
+                "escalations": 1,
+                "to_high": 1,
+                "victims": {"$size": "$victims"},
+            }
+        },
+    ]
+    return list(analytics_assessments.aggregate(pipeline))
+
+
+@router.get("/risk/time-at-high", response_model=dict)
+async def get_time_at_high(
+    days: int = Query(90, ge=1, le=3650),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(require_roles([UserRole.ADMIN, UserRole.CASE_MANAGER, UserRole.ANALYST]))
+):
+    """Time spent at HIGH risk in the last `days`, overall and for the longest-exposed victims"""
+    now = datetime.utcnow()
+    since = now - timedelta(days=days)
+    pipeline = [
+        # A level holds from its assessment until the next one (or now)
+        {
+            "$setWindowFields": {
+                "partitionBy": "$victim_id",
+                "sortBy": {"assessed_at": 1},
+                "output": {"next_at": {"$shift": {"output": "$assessed_at", "by": 1}}},
+            }
+        },
+        {"$match": {"risk_level": RiskLevel.HIGH.value, "$or": [{"next_at": None}, {"next_at": {"$gt": since}}]}},
+        {
+            "$project": {
+                "victim_id": 1,
+                "start": {"$max": ["$assessed_at", since]},
+                "end": {"$ifNull": ["$next_at", now]},
+            }
+        },
+        {"$group": {"_id": "$victim_id", "ms": {"$sum": {"$subtract": ["$end", "$start"]}}}},
+        {"$match": {"ms": {"$gt": 0}}},
+        {"$sort": {"ms": -1}},
+        {
+            "$facet": {
+                "summary": [{"$group": {"_id": None, "victims": {"$sum": 1}, "ms": {"$sum": "$ms"}}}],
+                "top": [
+                    {"$limit": limit},
+                    {"$project": {"_id": 0, "victim_id": {"$toString": "$_id"}, "days_at_high": {"$divide": ["$ms", 86400000]}}},
+                ],
+            }
+        },
+    ]
+    result = next(analytics_assessments.aggregate(pipeline), {"summary": [], "top": []})
+    summary = result["summary"][0] if result["summary"] else {"victims": 0, "ms": 0}
+    total_days = summary["ms"] / 86400000
+    return {
+        "days": days,
+        "victims_at_high": summary["victims"],
+        "total_days_at_high": round(total_days, 2),
+        "mean_days_at_high": round(total_days / summary["victims"], 2) if summary["victims"] else 0.0,
+        "top": [{**row, "days_at_high": round(row["days_at_high"], 2)} for row in result["top"]],
+    }
+
+
+@router.get("/risk/rising", response_model=List[dict])
+async def get_rising_risk(
+    days: int = Query(30, ge=1, le=3650),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(require_roles([UserRole.ADMIN, UserRole.CASE_MANAGER, UserRole.ANALYST]))
+):
+    """Victims/witnesses whose current risk is above their level `days` ago"""
+    since = datetime.utcnow() - timedelta(days=days)
+    pipeline = [
+        {"$set": {"rank": RISK_RANK}},
+        {
+            "$setWindowFields": {
+                "partitionBy": "$victim_id",
+                "sortBy": {"assessed_at": 1},
+                "output": {
+                    "previous_rank": {"$shift": {"output": "$rank", "by": -1}},
+                    "current_rank": {"$last": "$rank", "window": {"documents": ["unbounded", "unbounded"]}},
+                },
+            }
+        },
+        {"$match": {"assessed_at": {"$gte": since}}},
+        {"$sort": {"victim_id": 1, "assessed_at": 1}},
+        {
+            "$group": {
+                "_id": "$victim_id",
+                # Level before the window; first in-window level for new records
+                "baseline_rank": {"$first": {"$ifNull": ["$previous_rank", "$rank"]}},
+                "current_rank": {"$last": "$current_rank"},
+                "escalations": {
+                    "$sum": {
+                        "$cond": [
+                            {"$and": [{"$ne": ["$previous_rank", None]}, {"$gt": ["$rank", "$previous_rank"]}]},
+                            1,
+                            0,
+                        ]
+                    }
+                },
+                "last_assessed_at": {"$last": "$assessed_at"},
+            }
+        },
+        {"$match": {"$expr": {"$gt": ["$current_rank", "$baseline_rank"]}}},
+        {"$sort": {"current_rank": -1, "last_assessed_at": -1}},
+        {"$limit": limit},
+        {
+            "$project": {
+                "_id": 0,
+                "victim_id": {"$toString": "$_id"},
+                "from_level": {"$arrayElemAt": [RANK_NAMES, "$baseline_rank"]},
+                "to_level": {"$arrayElemAt": [RANK_NAMES, "$current_rank"]},
+                "escalations": 1,
+                "last_assessed_at": 1,
+            }
+        },
+    ]
+    return list(analytics_assessments.aggregate(pipeline))
+
+
+# === Protection watchlist ===
+# A hint naming an index that does not exist fails with the generic BadValue
+# code, so the message tells it apart from other bad values
+BAD_VALUE = 2
+MISSING_HINT_MESSAGE = "hint provided does not correspond to an existing index"
+
+
+def is_missing_hint(error: OperationFailure) -> bool:
+    errmsg = (error.details or {}).get("errmsg", str(error))
+    return error.code == BAD_VALUE and MISSING_HINT_MESSAGE in errmsg
+
+
+def parse_watchlist_cursor(after: str):
+    """Split an X-Next-After value into (last_assessed_at, _id)"""
+    try:
+        assessed, victim_id = after.rsplit("_", 1)
+        return datetime.fromisoformat(assessed), ObjectId(victim_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid 'after' cursor")
+
+
+@router.get("/watchlist", response_model=List[dict])
+async def get_watchlist(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    after: Optional[str] = Query(None, description="X-Next-After value of the previous page"),
+    current_user: User = Depends(require_roles([UserRole.ADMIN, UserRole.CASE_MANAGER]))
+):
+    """High-risk individuals needing protection, most recently assessed first
+
+    Served from a partial index on (last_assessed_at, _id); pages continue
+    from the `after` cursor instead of skipping.
+    """
+    query = dict(WATCHLIST_FILTER)
+    if after:
+        assessed_at, victim_id = parse_watchlist_cursor(after)
+        query["$or"] = [
+            {"last_assessed_at": {"$lt": assessed_at}},
+            {"last_assessed_at": assessed_at, "_id": {"$lt": victim_id}},
+        ]
+
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"last_assessed_at": -1, "_id": -1}},
+        {"$limit": limit},
+        victim_projection(current_user),
+    ]
+    # Read from the primary: a protection queue should not lag behind updates
+    try:
+        victims = list(individuals_collection.aggregate(pipeline, hint=WATCHLIST_INDEX))
+    except OperationFailure as e:
+        if not is_missing_hint(e):
+            raise
+        raise HTTPException(
+            status_code=503,
+            detail=f"Watchlist index {WATCHLIST_INDEX} is missing; run scripts/backfill_watchlist.py",
+        )
+
+    if len(victims) == limit and victims[-1].get("last_assessed_at"):
+        last = victims[-1]
+        response.headers["X-Next-After"] = f"{last['last_assessed_at'].isoformat()}_{last['_id']}"
+    return victims
 
-    return {"message": "Victim/witness created successfully", "id": str(result.inserted_id)}
 
 @router.get("/{victim_id}", response_model=VictimResponse)
 async def get_victim(
     victim_id: str,
+    response: Response,
     current_user: User = Depends(require_roles([UserRole.ADMIN, UserRole.CASE_MANAGER, UserRole.ANALYST]))
 ):
     """Retrieve a specific victim/witness (restricted access)"""
@@ -63,6 +456,7 @@ async def get_victim(
     victim = individuals_collection.find_one({"_id": ObjectId(victim_id)})  # Updated collection name
     if not victim:
         raise HTTPException(status_code=404, detail="Victim/witness not found")
+    set_etag(response, current_version(victim))
 
     # Decrypt sensitive data for authorized users
     if victim.get("contact_info") and UserRole.ADMIN in current_user.roles:
@@ -79,72 +473,94 @@ async def get_victim(
 
 @router.get("/", response_model=List[dict])
 async def list_victims(
-    skip: int = Query(0, ge=0),
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True, description="Use `after`; cannot be combined with it"),
     limit: int = Query(10, ge=1, le=100),
+    after: Optional[str] = Query(None, description="Last id of the previous page (keyset pagination)"),
     risk_level: Optional[RiskLevel] = None,
     victim_type: Optional[str] = None,
+    fresh: bool = Query(False, description="Read from the primary, e.g. right after this client wrote"),
     current_user: User = Depends(get_current_user)
 ):
-    """List victims/witnesses with filters"""
+    """List victims/witnesses with filters
+
+    Pass the X-Next-After header of one page as `after` to fetch the next;
+    unlike the deprecated `skip`, it does not scan the skipped records.
+    """
+    if skip and after:
+        raise HTTPException(status_code=400, detail="Use either 'skip' or 'after', not both")
     query = {}
 
     if risk_level:
         query["risk_assessment.level"] = risk_level
     if victim_type:
         query["type"] = victim_type
-
-    victims = list(individuals_collection.find(query).skip(skip).limit(limit))  # Updated collection name
-
-    # Filter sensitive data based on user role
-    filtered_victims = []
-    for victim in victims:
-        victim_data = victim_helper(victim)
-
-        # Hide sensitive information for non-admin users
-        if UserRole.ADMIN not in current_user.roles:
-            if victim_data.get("contact_info"):
-                victim_data["contact_info"] = {
-                    "preferred_contact": victim_data["contact_info"].get("preferred_contact")
-                }
-            # Show only pseudonym if anonymous
-            if victim_data.get("anonymous"):
-                victim_data["demographics"] = None
-
-        filtered_victims.append(victim_data)
-
-    return filtered_victims
+    if after:
+        if not ObjectId.is_valid(after):
+            raise HTTPException(status_code=400, detail="Invalid 'after' cursor")
+        query["_id"] = {"$gt": ObjectId(after)}
+
+    pipeline = [{"$match": query}, {"$sort": {"_id": 1}}]
+    if skip:
+        pipeline.append({"$skip": skip})
+    pipeline += [{"$limit": limit}, victim_projection(current_user)]
+    collection = individuals_collection if fresh else search_individuals
+    victims = list(collection.aggregate(pipeline))
+
+    if len(victims) == limit:
+        response.headers["X-Next-After"] = victims[-1]["_id"]
+    return victims
 
 @router.patch("/{victim_id}", response_model=dict)
 async def update_victim_risk(
     victim_id: str,
     victim_update: VictimUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(require_roles([UserRole.ADMIN, UserRole.CASE_MANAGER]))
 ):
-    """Update victim/witness risk level and other information"""
+    """Update victim/witness risk level and other information
+
+    One find_one_and_update: the stored level is compared inside the update
+    and returned as it was before, so concurrent edits cannot interleave.
+    With If-Match, the update only applies to that version of the record.
+    """
     if not ObjectId.is_valid(victim_id):
         raise HTTPException(status_code=400, detail="Invalid victim ID format")
-
-    # Check if victim exists
-    existing_victim = individuals_collection.find_one({"_id": ObjectId(victim_id)})  # Updated collection name
-    if not existing_victim:
-        raise HTTPException(status_code=404, detail="Victim/witness not found")
+    expected = parse_if_match(if_match)
+    key = {"_id": ObjectId(victim_id)}
 
     # Prepare update data
     update_data = {k: v for k, v in victim_update.dict().items() if v is not None}
     update_data["updated_at"] = datetime.utcnow()
 
     # Encrypt sensitive contact information if being updated
-    if "contact_info" in update_data and update_data["contact_info"]:
-        contact_info = update_data["contact_info"]
-        if contact_info.get("email"):
-            contact_info["email"] = encrypt_sensitive_data(contact_info["email"])
-        if contact_info.get("phone"):
-            contact_info["phone"] = encrypt_sensitive_data(contact_info["phone"])
+    _encrypt_contact_info(update_data)
 
-    result = individuals_collection.update_one(  # Updated collection name
-        {"_id": ObjectId(victim_id)},
-        {"$set": update_data}
+    stages = []
+    # Keep the watchlist ordering fields in step with the assessment log
+    if "risk_assessment" in update_data:
+        update_data["last_assessed_at"] = update_data["updated_at"]
+        new_rank = LEVEL_ORDER.index(update_data["risk_assessment"]["level"]) + 1
+        stages.append({"$set": {"last_escalated_at": {"$cond": [
+            {"$gt": [new_rank, risk_rank("$risk_assessment.level")]},
+            update_data["updated_at"],
+            "$last_escalated_at",
+        ]}}})
+    # Pipeline updates read "$..." strings as field paths, so values go in as literals
+    stages.append({"$set": {
+        **{field: {"$literal": value} for field, value in update_data.items()},
+        "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]},
+    }})
+
+    previous = individuals_collection.find_one_and_update(  # Updated collection name
+        {**key, **version_filter(expected)},
+        stages,
+        projection={"risk_assessment.level": 1, "version": 1},
+        return_document=ReturnDocument.BEFORE,
     )
+    if previous is None:
+        raise_for_missing(individuals_collection, key, expected, "Victim/witness not found")
 
     # Log risk assessment change if updated
     if "risk_assessment" in update_data:
@@ -152,15 +568,13 @@ async def update_victim_risk(
             "victim_id": ObjectId(victim_id),
             "risk_level": update_data["risk_assessment"]["level"],
             "assessed_by": current_user.username,
-            "assessed_at": datetime.utcnow(),
+            "assessed_at": update_data["updated_at"],
             "notes": update_data["risk_assessment"].get("notes"),
-            "previous_level": existing_victim["risk_assessment"]["level"]
+            "previous_level": previous["risk_assessment"]["level"]
         }
         victim_risk_assessments.insert_one(risk_log)
 
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Victim/witness not found")
-
+    set_etag(response, current_version(previous) + 1)
     return {"message": "Victim/witness updated successfully"}
 
 @router.get("/case/{case_id}", response_model=List[dict])
@@ -172,24 +586,12 @@ async def get_victims_by_case(
     if not ObjectId.is_valid(case_id):
         raise HTTPException(status_code=400, detail="Invalid case ID format")
 
-    victims = list(individuals_collection.find({"cases_involved": ObjectId(case_id)}))  # Updated collection name
-
-    # Filter sensitive data based on user role
-    filtered_victims = []
-    for victim in victims:
-        victim_data = victim_helper(victim)
-
-        if UserRole.ADMIN not in current_user.roles:
-            if victim_data.get("contact_info"):
-                victim_data["contact_info"] = {
-                    "preferred_contact": victim_data["contact_info"].get("preferred_contact")
-                }
-            if victim_data.get("anonymous"):
-                victim_data["demographics"] = None
-
-        filtered_victims.append(victim_data)
-
-    return filtered_victims
+    pipeline = [
+        {"$match": {"cases_involved": ObjectId(case_id)}},
+        {"$sort": {"_id": 1}},
+        victim_projection(current_user),
+    ]
+    return list(individuals_collection.aggregate(pipeline))  # Updated collection name
 
 @router.get("/{victim_id}/risk-history", response_model=List[dict])
 async def get_victim_risk_history(
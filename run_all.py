@@ -1,31 +1,232 @@
+import argparse
+import os
+import shutil
+import signal
 import subprocess
-import threading
 import sys
-import os
-import json
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from typing import List, Optional
+
+PROFILES = {
+    # Single auto-reloading API process for local development
+    "dev": {"host": "127.0.0.1", "workers": 1, "reload": True},
+    # One uvicorn worker per core, no reloader
+    "prod": {"host": "0.0.0.0", "workers": None, "reload": False},
+}
+
+
+def log(name: str, message: str) -> None:
+    print(f"[{name.upper()}] {message}", flush=True)
+
+
+class Service:
+    """A supervised child process with readiness probing and restart backoff"""
+
+    def __init__(self, name: str, command: List[str], ready_url: str, env: Optional[dict] = None):
+        self.name = name
+        self.command = command
+        self.ready_url = ready_url
+        self.env = env
+        self.process: Optional[subprocess.Popen] = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.next_start = 0.0
+        self.ready = False
+        # Whether it has answered since the launcher started; until then a
+        # failure is a startup failure rather than a crash to recover from
+        self.was_ready = False
+
+    def start(self) -> None:
+        log(self.name, " ".join(self.command))
+        # Own process group, so signals reach the reloader or worker children too
+        self.process = subprocess.Popen(
+            self.command, env=self.env, start_new_session=os.name != "nt"
+        )
+        self.started_at = time.monotonic()
+        self.ready = False
+
+    def check_ready(self) -> bool:
+        """Probe the ready URL once (without waiting for it); True once it has answered"""
+        if not self.ready:
+            try:
+                with urllib.request.urlopen(self.ready_url, timeout=1) as response:
+                    self.ready = response.status == 200
+            except (urllib.error.URLError, ConnectionError, TimeoutError):
+                pass
+            if self.ready:
+                self.was_ready = True
+                log(self.name, f"ready at {self.ready_url}")
+        return self.ready
+
+    def exited(self) -> Optional[int]:
+        return None if self.process is None else self.process.poll()
+
+    def schedule_restart(self, reason: str) -> None:
+        # A process that stayed up for a minute starts over with a short delay
+        if time.monotonic() - self.started_at > 60:
+            self.restarts = 0
+        delay = min(2 ** self.restarts, 30)
+        self.restarts += 1
+        self.next_start = time.monotonic() + delay
+        log(self.name, f"{reason}; restarting in {delay}s")
+        self.process = None
+
+    def kill(self) -> None:
+        self.signal(signal.SIGKILL if os.name != "nt" else signal.SIGTERM)
+        self.process.wait()
+
+    def signal(self, signum: int) -> None:
+        if self.process is None or self.process.poll() is not None:
+            return
+        if os.name == "nt":
+            self.process.terminate()
+        else:
+            os.killpg(self.process.pid, signum)
+
+    def stop(self, grace: float) -> None:
+        if self.process is None:
+            return
+        try:
+            self.process.wait(timeout=grace)
+        except subprocess.TimeoutExpired:
+            log(self.name, f"still running after {grace:.0f}s; killing")
+            self.kill()
+
+
+class Supervisor:
+    """Start services, restart them when they crash, and shut down gracefully"""
+
+    def __init__(self, services: List[Service], ready_timeout: float, grace: float):
+        self.services = services
+        self.ready_timeout = ready_timeout
+        self.grace = grace
+        self.stopping = False
+
+    def _handle_signal(self, signum, frame) -> None:
+        if self.stopping:
+            return
+        log("launcher", f"received {signal.Signals(signum).name}; shutting down")
+        self.stopping = True
+
+    def run(self) -> int:
+        signal.signal(signal.SIGINT, self._handle_signal)
+        signal.signal(signal.SIGTERM, self._handle_signal)
+
+        for service in self.services:
+            service.start()
+
+        # Readiness is probed in the same loop that handles crashes and
+        # signals, so a slow service never blocks the others
+        code = 0
+        while not self.stopping:
+            for service in self.services:
+                if service.process is None:
+                    if time.monotonic() >= service.next_start:
+                        service.start()
+                    continue
+                returncode = service.exited()
+                if returncode is not None:
+                    problem = f"exited with code {returncode}"
+                elif not service.check_ready() and time.monotonic() - service.started_at > self.ready_timeout:
+                    problem = f"not ready after {self.ready_timeout:.0f}s"
+                    service.kill()
+                else:
+                    continue
+                if not service.was_ready:
+                    log(service.name, f"{problem} during startup; shutting down")
+                    code = 1
+                    self.stopping = True
+                    break
+                service.schedule_restart(problem)
+            time.sleep(0.5)
+
+        # uvicorn and streamlit both finish in-flight work on SIGTERM
+        for service in self.services:
+            service.signal(signal.SIGTERM)
+        for service in self.services:
+            service.stop(self.grace)
+        log("launcher", "stopped")
+        return code
+
+
+def api_command(args) -> List[str]:
+    command = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", args.host,
+        "--port", str(args.port),
+        "--timeout-graceful-shutdown", str(int(args.grace)),
+    ]
+    if args.reload:
+        command.append("--reload")
+    else:
+        command += ["--workers", str(args.workers), "--no-access-log", "--proxy-headers"]
+    return command
+
 
+def streamlit_command(args) -> List[str]:
+    command = [
+        sys.executable, "-m", "streamlit", "run", "streamlit_app.py",
+        "--server.port", str(args.streamlit_port),
+    ]
+    if args.profile == "prod":
+        command += ["--server.headless", "true", "--server.address", args.host]
+    return command
 
-def run_fastapi():
-    print("[FASTAPI] Starting backend server...")
-    subprocess.run([sys.executable, "-m", "uvicorn", "main:app", "--reload"])
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Launch the Human Rights MIS API and frontend")
+    parser.add_argument("--profile", choices=PROFILES, default=os.getenv("HRM_PROFILE", "dev"))
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=None, help="API worker processes (prod default: CPU count)")
+    parser.add_argument("--streamlit-port", type=int, default=8501)
+    parser.add_argument("--no-frontend", action="store_true", help="run the API only")
+    parser.add_argument("--ready-timeout", type=float, default=60.0, help="seconds each (re)started service has to answer before it is restarted, or the launcher exits at startup")
+    parser.add_argument("--grace", type=float, default=30.0, help="seconds allowed for in-flight requests on shutdown")
+    args = parser.parse_args()
 
-def run_streamlit():
-    print("[STREAMLIT] Launching frontend interface...")
-    subprocess.run(["python", "-m", "streamlit", "run", "streamlit_app.py"])
+    profile = PROFILES[args.profile]
+    args.host = args.host or profile["host"]
+    args.reload = profile["reload"]
+    if args.reload:
+        args.workers = 1  # uvicorn ignores --workers with --reload
+    else:
+        args.workers = args.workers or int(os.getenv("WEB_CONCURRENCY", "0")) or os.cpu_count() or 1
+    return args
 
 
 if __name__ == "__main__":
     os.chdir(
         os.path.dirname(os.path.abspath(__file__))
     )  # ensure script runs from project root
-    print("Launching Human Rights MIS ...\n")
+    args = parse_args()
+    print(f"Launching Human Rights MIS ({args.profile}, {args.workers} API worker(s)) ...\n")
 
-    t1 = threading.Thread(target=run_fastapi)
-    t2 = threading.Thread(target=run_streamlit)
+    api_env = dict(os.environ)
+    metrics_dir = None
+    if args.workers > 1:
+        # Workers share nothing but the listening socket; /metrics aggregates
+        # every worker through prometheus_client's multiprocess files
+        metrics_dir = tempfile.mkdtemp(prefix="hrm-metrics-")
+        api_env["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
 
-    t1.start()
-    t2.start()
+    probe_host = "127.0.0.1" if args.host in ("0.0.0.0", "::") else args.host
+    services = [Service("fastapi", api_command(args), f"http://{probe_host}:{args.port}/", api_env)]
+    if not args.no_frontend:
+        services.append(
+            Service(
+                "streamlit",
+                streamlit_command(args),
+                f"http://{probe_host}:{args.streamlit_port}/_stcore/health",
+            )
+        )
 
-    t1.join()
-    t2.join()
+    try:
+        code = Supervisor(services, args.ready_timeout, args.grace).run()
+    finally:
+        if metrics_dir:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+    sys.exit(code)
@@ -0,0 +1,109 @@
+"""Backfill the protection watchlist fields on individuals.
+
+Sets last_assessed_at to the time of each individual's latest risk assessment
+and last_escalated_at to the latest assessment that raised their level, both
+taken from victim_risk_assessments. Individuals without logged assessments
+fall back to risk_assessment.assessed_at, updated_at or created_at. Creates
+the watchlist partial index afterwards. Safe to run more than once.
+
+    python scripts/backfill_watchlist.py
+"""
+import argparse
+import os
+import sys
+import time
+
+from pymongo import MongoClient, UpdateOne
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import DATABASE_NAME, MONGODB_URL, ensure_watchlist_index  # noqa: E402
+from services.risk import RISK_RANK  # noqa: E402
+
+
+def assessment_times(database):
+    """Latest assessment and latest escalation per victim, via window functions"""
+    pipeline = [
+        {"$set": {"rank": RISK_RANK}},
+        {
+            "$setWindowFields": {
+                "partitionBy": "$victim_id",
+                "sortBy": {"assessed_at": 1},
+                "output": {"previous_rank": {"$shift": {"output": "$rank", "by": -1}}},
+            }
+        },
+        {
+            "$group": {
+                "_id": "$victim_id",
+                "last_assessed_at": {"$max": "$assessed_at"},
+                # $max skips the nulls of non-escalating entries
+                "last_escalated_at": {
+                    "$max": {
+                        "$cond": [
+                            {"$and": [{"$ne": ["$previous_rank", None]}, {"$gt": ["$rank", "$previous_rank"]}]},
+                            "$assessed_at",
+                            None,
+                        ]
+                    }
+                },
+            }
+        },
+    ]
+    return database["victim_risk_assessments"].aggregate(pipeline, allowDiskUse=True)
+
+
+def backfill(database, batch_size: int = 1000) -> dict:
+    started = time.perf_counter()
+    individuals = database["individuals"]
+    updated = 0
+    batch = []
+    for row in assessment_times(database):
+        batch.append(
+            UpdateOne(
+                {"_id": row["_id"]},
+                {"$set": {"last_assessed_at": row["last_assessed_at"], "last_escalated_at": row["last_escalated_at"]}},
+            )
+        )
+        if len(batch) == batch_size:
+            updated += individuals.bulk_write(batch, ordered=False).matched_count
+            batch = []
+    if batch:
+        updated += individuals.bulk_write(batch, ordered=False).matched_count
+
+    # Records whose assessments were never logged
+    fallback = individuals.update_many(
+        {"last_assessed_at": {"$exists": False}},
+        [
+            {
+                "$set": {
+                    "last_assessed_at": {"$ifNull": ["$risk_assessment.assessed_at", "$updated_at", "$created_at"]},
+                    "last_escalated_at": None,
+                }
+            }
+        ],
+    )
+    index = ensure_watchlist_index(database)
+    return {
+        "from_assessments": updated,
+        "from_record_dates": fallback.modified_count,
+        "index": index,
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--mongodb-url", default=MONGODB_URL)
+    parser.add_argument("--database", default=DATABASE_NAME)
+    args = parser.parse_args()
+
+    result = backfill(MongoClient(args.mongodb_url)[args.database], args.batch_size)
+    print(
+        f"updated {result['from_assessments']:,} individuals from the assessment log and "
+        f"{result['from_record_dates']:,} from record dates in {result['seconds']}s; index {result['index']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,485 @@
+"""Seeded synthetic data generator for load testing.
+
+Produces schema-valid documents for cases, case_status_history,
+incident_reports, individuals and victim_risk_assessments with realistic
+skew: a few countries and violation types dominate, incidents cluster in
+recent years, coordinates scatter around country centroids, and risk levels
+escalate over time. Documents are generated and bulk-inserted in parallel
+worker processes; the same seed always yields the same data.
+
+    python scripts/generate_synthetic_data.py --cases 1000000 --reports 2000000 \
+        --individuals 500000 --workers 8 --seed 42 --drop
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from multiprocessing import Pool
+
+import numpy as np
+from bson import ObjectId
+from pymongo import MongoClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# (country, lat, lon, spread in degrees, relative weight)
+COUNTRIES = [
+    ("Palestine", 31.9, 35.2, 0.35, 30),
+    ("Syria", 35.0, 38.5, 1.5, 18),
+    ("Yemen", 15.5, 47.5, 1.5, 12),
+    ("Sudan", 15.6, 30.2, 2.5, 10),
+    ("Myanmar", 21.0, 96.0, 2.0, 8),
+    ("Ukraine", 49.0, 32.0, 2.5, 8),
+    ("Afghanistan", 34.5, 66.0, 2.0, 6),
+    ("Democratic Republic of the Congo", -2.5, 23.5, 3.0, 5),
+    ("Iraq", 33.2, 43.7, 1.5, 4),
+    ("Libya", 27.0, 17.0, 2.5, 3),
+    ("Ethiopia", 9.1, 40.5, 2.0, 3),
+    ("Somalia", 5.2, 46.2, 2.0, 2),
+    ("Mali", 17.6, -4.0, 2.5, 2),
+    ("Venezuela", 7.0, -66.0, 2.0, 1),
+    ("Colombia", 4.6, -74.1, 2.0, 1),
+]
+VIOLATION_TYPES = [
+    ("arbitrary_detention", 20),
+    ("property_destruction", 16),
+    ("forced_displacement", 14),
+    ("arbitrary_arrest", 12),
+    ("torture", 9),
+    ("extrajudicial_killing", 7),
+    ("discrimination", 6),
+    ("freedom_of_expression_violation", 5),
+    ("enforced_disappearance", 4),
+    ("child_rights_violation", 3),
+    ("sexual_violence", 2),
+    ("economic_exploitation", 2),
+]
+CASE_STATUSES = ["new", "under_investigation", "resolved"]
+REPORT_STATUSES = ["new", "under_review", "verified", "rejected"]
+PRIORITIES = ["low", "medium", "high"]
+REPORTER_TYPES = ["victim", "witness", "ngo_worker"]
+RISK_LEVELS = ["low", "medium", "high"]
+THREATS = ["intimidation", "surveillance", "physical_threats", "legal_threats", "economic_threats", "family_threats"]
+EVIDENCE_TYPES = [("image", "png"), ("application", "pdf"), ("video", "mp4")]
+
+# Collection order matters: individuals link to case _ids
+KINDS = ["cases", "incident_reports", "individuals"]
+KIND_IDS = {kind: i + 1 for i, kind in enumerate(KINDS)}
+NOW = datetime(2025, 6, 1)
+
+
+def _weights(pairs):
+    w = np.array([p[-1] for p in pairs], dtype=float)
+    return w / w.sum()
+
+
+COUNTRY_P = _weights(COUNTRIES)
+VIOLATION_P = _weights(VIOLATION_TYPES)
+
+
+def synthetic_id(kind: str, seed: int, index: int, when: datetime) -> ObjectId:
+    """Deterministic ObjectId: real timestamp prefix, (kind, seed, index) suffix"""
+    suffix = (KIND_IDS[kind] << 60) | ((seed & 0xFFF) << 48) | index
+    return ObjectId(struct.pack(">IQ", int(when.timestamp()), suffix))
+
+
+# === Vectorized attribute sampling ===
+def _sample_common(rng, size: int):
+    countries = rng.choice(len(COUNTRIES), size=size, p=COUNTRY_P)
+    centroids = np.array([[c[1], c[2], c[3]] for c in COUNTRIES])[countries]
+    lat = np.clip(centroids[:, 0] + rng.normal(0, centroids[:, 2]), -89.9, 89.9)
+    lon = np.clip(centroids[:, 1] + rng.normal(0, centroids[:, 2]), -179.9, 179.9)
+    # Most incidents are recent: exponential age (mean ~14 months) within 6 years
+    age_days = np.minimum(rng.exponential(420, size=size), 6 * 365)
+    dates = [NOW - timedelta(days=float(d), seconds=int(s)) for d, s in zip(age_days, rng.integers(0, 86400, size))]
+    n_violations = rng.choice([1, 2, 3], size=size, p=[0.6, 0.3, 0.1])
+    return countries, lat, lon, dates, n_violations
+
+
+def _violations(rng, count: int) -> list:
+    idx = rng.choice(len(VIOLATION_TYPES), size=count, replace=False, p=VIOLATION_P)
+    return [VIOLATION_TYPES[i][0] for i in idx]
+
+
+def _evidence(rng, evidence_files: list, fraction: float, with_date: bool) -> list:
+    if not evidence_files or rng.random() >= fraction:
+        return []
+    items = []
+    for path in rng.choice(evidence_files, size=rng.integers(1, 4)):
+        kind = {"png": "image", "pdf": "application", "mp4": "video"}[path.rsplit(".", 1)[1]]
+        item = {"type": kind, "url": f"/{path}", "description": os.path.basename(path)}
+        if with_date:
+            item["date_captured"] = None
+        items.append(item)
+    return items
+
+
+# === Document builders ===
+def _sample_cases(rng, size: int):
+    countries, lat, lon, dates, n_violations = _sample_common(rng, size)
+    statuses = rng.choice(len(CASE_STATUSES), size=size, p=[0.35, 0.4, 0.25])
+    priorities = rng.choice(len(PRIORITIES), size=size, p=[0.3, 0.45, 0.25])
+    report_delay = rng.gamma(2.0, 6.0, size=size)
+    reported = [d + timedelta(days=float(delay)) for d, delay in zip(dates, report_delay)]
+    return countries, lat, lon, dates, n_violations, statuses, priorities, reported
+
+
+@lru_cache(maxsize=64)
+def _case_reported_dates(seed: int, chunk_index: int, size: int) -> tuple:
+    # Replays only the vectorised draws of the case chunk, not its documents
+    rng = np.random.default_rng([seed, KIND_IDS["cases"], chunk_index])
+    return tuple(_sample_cases(rng, size)[-1])
+
+
+def case_object_id(seed: int, index: int, options: dict) -> ObjectId:
+    """_id build_cases gives case `index`, for references from other collections"""
+    batch_size = options["batch_size"]
+    chunk_index, offset = divmod(index, batch_size)
+    size = min(batch_size, options["case_count"] - chunk_index * batch_size)
+    return synthetic_id("cases", seed, index, _case_reported_dates(seed, chunk_index, size)[offset])
+
+
+def build_cases(rng, seed: int, start: int, size: int, options: dict):
+    countries, lat, lon, dates, n_violations, statuses, priorities, reported_dates = _sample_cases(rng, size)
+
+    cases, history = [], []
+    for i in range(size):
+        index = start + i
+        occurred = dates[i]
+        reported = reported_dates[i]
+        case_id = f"HRM-S{seed:x}-{index:x}"
+        status = CASE_STATUSES[statuses[i]]
+        country = COUNTRIES[countries[i]][0]
+        violations = _violations(rng, n_violations[i])
+        cases.append(
+            {
+                "_id": synthetic_id("cases", seed, index, reported),
+                "case_id": case_id,
+                "title": f"{violations[0].replace('_', ' ').capitalize()} in {country} #{index}",
+                "description": f"Synthetic case {index} documented in {country}.",
+                "violation_types": violations,
+                "status": status,
+                "priority": PRIORITIES[priorities[i]],
+                "location": {
+                    "country": country,
+                    "region": f"Region {int(rng.integers(1, 12))}",
+                    "coordinates": {"type": "Point", "coordinates": [round(float(lon[i]), 6), round(float(lat[i]), 6)]},
+                },
+                "date_occurred": occurred,
+                "date_reported": reported,
+                "victims": [],
+                "perpetrators": [],
+                "evidence": _evidence(rng, options["evidence_files"], options["evidence_fraction"], True),
+                "created_by": "synthetic",
+                "created_at": reported,
+                "updated_at": reported,
+                "incident_report_id": None,
+            }
+        )
+        # Status history walks new -> ... -> current status
+        changed = reported
+        for step in CASE_STATUSES[: statuses[i] + 1]:
+            history.append({"case_id": case_id, "status": step, "timestamp": changed, "changed_by": "synthetic"})
+            changed += timedelta(days=float(rng.gamma(2.0, 10.0)))
+    return {"cases": cases, "case_status_history": history}
+
+
+def build_reports(rng, seed: int, start: int, size: int, options: dict):
+    countries, lat, lon, dates, n_violations = _sample_common(rng, size)
+    statuses = rng.choice(len(REPORT_STATUSES), size=size, p=[0.4, 0.3, 0.2, 0.1])
+    reporter = rng.choice(len(REPORTER_TYPES), size=size, p=[0.45, 0.35, 0.2])
+    anonymous = rng.random(size) < 0.6
+    delay = rng.gamma(1.5, 3.0, size=size)
+
+    reports = []
+    for i in range(size):
+        index = start + i
+        created = dates[i] + timedelta(days=float(delay[i]))
+        reports.append(
+            {
+                "_id": synthetic_id("incident_reports", seed, index, created),
+                "report_id": f"IR-S{seed:x}-{index:x}",
+                "reporter_type": REPORTER_TYPES[reporter[i]],
+                "anonymous": bool(anonymous[i]),
+                "contact_info": None
+                if anonymous[i]
+                else {"email": f"reporter{index}@example.org", "phone": None, "preferred_contact": "email"},
+                "incident_details": {
+                    "date": dates[i],
+                    "location": {
+                        "country": COUNTRIES[countries[i]][0],
+                        "city": f"City {int(rng.integers(1, 40))}",
+                        "coordinates": {"type": "Point", "coordinates": [round(float(lon[i]), 6), round(float(lat[i]), 6)]},
+                    },
+                    "description": f"Synthetic incident report {index}.",
+                    "violation_types": _violations(rng, n_violations[i]),
+                },
+                "evidence": _evidence(rng, options["evidence_files"], options["evidence_fraction"], False),
+                "status": REPORT_STATUSES[statuses[i]],
+                "created_at": created,
+            }
+        )
+    return {"incident_reports": reports}
+
+
+def build_individuals(rng, seed: int, start: int, size: int, options: dict):
+    from security.encryption import encrypt_sensitive_data
+
+    anonymous = rng.random(size) < 0.5
+    kinds = rng.choice(["victim", "witness", "both"], size=size, p=[0.6, 0.3, 0.1])
+    ages = rng.integers(6, 85, size=size)
+    age_days = np.minimum(rng.exponential(300, size=size), 5 * 365)
+
+    individuals, assessments = [], []
+    for i in range(size):
+        index = start + i
+        created = NOW - timedelta(days=float(age_days[i]))
+        victim_id = synthetic_id("individuals", seed, index, created)
+
+        # Risk trajectory: a few assessments, mostly stable, sometimes escalating
+        level = int(rng.choice(3, p=[0.5, 0.35, 0.15]))
+        when = created
+        previous = None
+        escalated = None
+        for _ in range(int(rng.integers(1, 5))):
+            assessments.append(
+                {
+                    "victim_id": victim_id,
+                    "risk_level": RISK_LEVELS[level],
+                    "assessed_by": "synthetic",
+                    "assessed_at": when,
+                    "notes": None,
+                    **({"previous_level": RISK_LEVELS[previous]} if previous is not None else {}),
+                }
+            )
+            if previous is not None and level > previous:
+                escalated = when
+            previous = level
+            level = int(np.clip(level + rng.choice([-1, 0, 1], p=[0.2, 0.55, 0.25]), 0, 2))
+            when += timedelta(days=float(rng.gamma(2.0, 20.0)))
+            if when > NOW:
+                break
+        final = RISK_LEVELS[previous]
+        last_assessed = assessments[-1]["assessed_at"]
+
+        contact_info = None
+        if not anonymous[i]:
+            contact_info = {
+                "email": encrypt_sensitive_data(f"person{index}@example.org"),
+                "phone": encrypt_sensitive_data(f"+970{index:09d}"[:13]),
+                "secure_messaging": None,
+                "preferred_contact": "email",
+            }
+        case_count = options["case_count"]
+        cases_involved = (
+            [case_object_id(seed, int(rng.integers(0, case_count)), options)]
+            if case_count and rng.random() < 0.7
+            else []
+        )
+        threats = list(rng.choice(THREATS, size=int(rng.integers(0, 3)), replace=False))
+        individuals.append(
+            {
+                "_id": victim_id,
+                "type": str(kinds[i]),
+                "anonymous": bool(anonymous[i]),
+                "pseudonym": f"Person-{index:x}",
+                "demographics": {
+                    "gender": str(rng.choice(["male", "female", "non-binary", "prefer_not_to_say"], p=[0.47, 0.47, 0.02, 0.04])),
+                    "age": int(ages[i]),
+                    "ethnicity": None,
+                    "occupation": None,
+                },
+                "contact_info": contact_info,
+                "risk_assessment": {
+                    "level": final,
+                    "threats": threats,
+                    "protection_needed": final == "high" or bool(rng.random() < 0.1),
+                    "notes": None,
+                    "assessed_by": "synthetic",
+                    "assessed_at": last_assessed,
+                },
+                "support_services": [],
+                "notes": None,
+                "created_at": created,
+                "updated_at": last_assessed,
+                "last_assessed_at": last_assessed,
+                "last_escalated_at": escalated,
+                "created_by": "synthetic",
+                "cases_involved": cases_involved,
+            }
+        )
+    return {"individuals": individuals, "victim_risk_assessments": assessments}
+
+
+BUILDERS = {"cases": build_cases, "incident_reports": build_reports, "individuals": build_individuals}
+
+
+# === Validation against the API models ===
+def validate_sample(kind: str, documents: dict) -> None:
+    """Validate the first generated document of a chunk with the API's Pydantic model"""
+    if kind == "cases":
+        from routers.cases import CaseModel
+
+        CaseModel(**documents["cases"][0])
+    elif kind == "incident_reports":
+        from routers.reports import ReportModel
+
+        ReportModel(**documents["incident_reports"][0])
+    else:
+        from models.victim import VictimResponse
+
+        doc = dict(documents["individuals"][0], _id=str(documents["individuals"][0]["_id"]))
+        doc["cases_involved"] = [str(c) for c in doc["cases_involved"]]
+        doc["contact_info"] = None  # encrypted values are not valid emails
+        VictimResponse(**doc)
+
+
+# === Workers ===
+_worker_db = None
+
+
+def _init_worker(mongodb_url: str, database_name: str) -> None:
+    global _worker_db
+    _worker_db = MongoClient(mongodb_url)[database_name]
+
+
+def _run_chunk(task) -> tuple:
+    kind, chunk_index, start, size, seed, options = task
+    rng = np.random.default_rng([seed, KIND_IDS[kind], chunk_index])
+    documents = BUILDERS[kind](rng, seed, start, size, options)
+    if chunk_index == 0 or options["validate_all"]:
+        validate_sample(kind, documents)
+    if options["dry_run"]:
+        return kind, {name: len(docs) for name, docs in documents.items()}
+    for name, docs in documents.items():
+        if docs:
+            _worker_db[name].insert_many(docs, ordered=False, bypass_document_validation=True)
+    return kind, {name: len(docs) for name, docs in documents.items()}
+
+
+def write_dummy_evidence(count: int) -> list:
+    """Create a small pool of dummy evidence files shared by all documents"""
+    os.makedirs("media/case_evidence", exist_ok=True)
+    png = bytes.fromhex("89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+                        "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082")
+    pdf = b"%PDF-1.4\n1 0 obj<<>>endobj\ntrailer<<>>\n%%EOF\n"
+    mp4 = b"\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00mp42isom"
+    payloads = {"png": png, "pdf": pdf, "mp4": mp4}
+    paths = []
+    for i in range(count):
+        _, extension = EVIDENCE_TYPES[i % len(EVIDENCE_TYPES)]
+        path = f"media/case_evidence/synthetic_{i:04d}.{extension}"
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(payloads[extension])
+        paths.append(path)
+    return paths
+
+
+def generate(
+    cases: int = 10000,
+    reports: int = 20000,
+    individuals: int = 5000,
+    seed: int = 42,
+    workers: int = os.cpu_count() or 1,
+    batch_size: int = 5000,
+    evidence_files: int = 100,
+    evidence_fraction: float = 0.2,
+    drop: bool = False,
+    dry_run: bool = False,
+    validate_all: bool = False,
+    mongodb_url: str = None,
+    database_name: str = None,
+) -> dict:
+    """Generate and load the dataset; returns inserted counts per collection"""
+    from db import MONGODB_URL, DATABASE_NAME, bump_data_version, prepare_collections
+
+    mongodb_url = mongodb_url or MONGODB_URL
+    database_name = database_name or DATABASE_NAME
+
+    if not dry_run:
+        # Same collection layout and indexes as the API creates on startup
+        prepare_collections(MongoClient(mongodb_url)[database_name])
+
+    if drop and not dry_run:
+        database = MongoClient(mongodb_url)[database_name]
+        database["cases"].delete_many({"created_by": "synthetic"})
+        database["case_status_history"].delete_many({"changed_by": "synthetic"})
+        database["incident_reports"].delete_many({"report_id": {"$regex": "^IR-S"}})
+        # victim_risk_assessments is a time-series collection, and MongoDB
+        # before 7.0 only deletes from those by the metaField (victim_id)
+        synthetic = database["individuals"].find({"created_by": "synthetic"}, {"_id": 1}).batch_size(batch_size)
+        victim_ids = []
+        for doc in synthetic:
+            victim_ids.append(doc["_id"])
+            if len(victim_ids) == batch_size:
+                database["victim_risk_assessments"].delete_many({"victim_id": {"$in": victim_ids}})
+                victim_ids = []
+        if victim_ids:
+            database["victim_risk_assessments"].delete_many({"victim_id": {"$in": victim_ids}})
+        database["individuals"].delete_many({"created_by": "synthetic"})
+
+    options = {
+        "evidence_files": write_dummy_evidence(evidence_files) if evidence_files and not dry_run else [],
+        "evidence_fraction": evidence_fraction,
+        "case_count": cases,
+        "batch_size": batch_size,
+        "dry_run": dry_run,
+        "validate_all": validate_all,
+    }
+    tasks = []
+    for kind, total in (("cases", cases), ("incident_reports", reports), ("individuals", individuals)):
+        for chunk_index, start in enumerate(range(0, total, batch_size)):
+            tasks.append((kind, chunk_index, start, min(batch_size, total - start), seed, options))
+
+    totals = {}
+    with Pool(workers, initializer=_init_worker, initargs=(mongodb_url, database_name)) as pool:
+        for _, counts in pool.imap_unordered(_run_chunk, tasks):
+            for name, n in counts.items():
+                totals[name] = totals.get(name, 0) + n
+    if not dry_run:
+        # Written around the API, so its cached list and analytics ETags are invalidated here
+        bump_data_version(*totals, database=MongoClient(mongodb_url)[database_name])
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--cases", type=int, default=10000)
+    parser.add_argument("--reports", type=int, default=20000)
+    parser.add_argument("--individuals", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--evidence-files", type=int, default=100, help="size of the dummy evidence file pool")
+    parser.add_argument("--evidence-fraction", type=float, default=0.2, help="share of cases/reports with evidence")
+    parser.add_argument("--drop", action="store_true", help="remove previously generated synthetic documents first")
+    parser.add_argument("--dry-run", action="store_true", help="generate and validate without inserting")
+    parser.add_argument("--validate-all", action="store_true", help="validate one document of every chunk")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    totals = generate(
+        cases=args.cases,
+        reports=args.reports,
+        individuals=args.individuals,
+        seed=args.seed,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        evidence_files=args.evidence_files,
+        evidence_fraction=args.evidence_fraction,
+        drop=args.drop,
+        dry_run=args.dry_run,
+        validate_all=args.validate_all,
+    )
+    elapsed = time.perf_counter() - started
+    for name, n in sorted(totals.items()):
+        print(f"{name:<26} {n:>10,}")
+    print(f"Done in {elapsed:.1f}s ({sum(totals.values()) / max(elapsed, 1e-9):,.0f} docs/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Normalise case and report coordinates to GeoJSON and create 2dsphere indexes.
+
+Rewrites every location that is not already a valid GeoJSON Point (e.g.
+{"lat": .., "lon": ..} or a bare [lon, lat] pair) in cases and
+incident_reports. Values that cannot be read as a point are moved to a
+sibling `coordinates_legacy` field (e.g. location.coordinates_legacy) and
+cleared to null, so the 2dsphere indexes can be built without losing the
+original; their ids are listed. --dry-run only reports what would change.
+Safe to run more than once.
+
+    python scripts/migrate_geo.py --dry-run
+    python scripts/migrate_geo.py
+"""
+import argparse
+import os
+import sys
+import time
+
+from pymongo import MongoClient, UpdateOne
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import DATABASE_NAME, GEO_INDEXES, MONGODB_URL, bump_data_version, ensure_geo_indexes  # noqa: E402
+from services.geo import to_geojson_point  # noqa: E402
+
+ID_FIELDS = {"cases": "case_id", "incident_reports": "report_id"}
+
+
+def not_geojson(field: str) -> dict:
+    """Documents whose field is set but is not a two-number GeoJSON Point within range
+
+    Out-of-range points are selected too: to_geojson_point rejects them, so
+    they are cleared instead of blocking the 2dsphere index build.
+    """
+    return {
+        field: {"$ne": None},
+        "$nor": [{
+            f"{field}.type": "Point",
+            f"{field}.coordinates.0": {"$type": "number", "$gte": -180, "$lte": 180},
+            f"{field}.coordinates.1": {"$type": "number", "$gte": -90, "$lte": 90},
+            f"{field}.coordinates.2": {"$exists": False},
+        }],
+    }
+
+
+def normalise_collection(database, collection: str, field: str, batch_size: int, dry_run: bool) -> dict:
+    counts = {"normalised": 0, "cleared": 0, "cleared_ids": []}
+    id_field = ID_FIELDS[collection]
+    legacy_field = f"{field}_legacy"
+    batch = []
+    started = time.perf_counter()
+    for doc in database[collection].find(not_geojson(field), {field: 1, id_field: 1}).batch_size(batch_size):
+        value = doc
+        for key in field.split("."):
+            value = value.get(key) if isinstance(value, dict) else None
+        try:
+            update = {"$set": {field: to_geojson_point(value)}}
+            counts["normalised"] += 1
+        except ValueError:
+            # Location evidence is kept as submitted, next to the cleared field
+            update = {"$set": {field: None, legacy_field: value}}
+            counts["cleared"] += 1
+            counts["cleared_ids"].append(doc.get(id_field, doc["_id"]))
+        batch.append(UpdateOne({"_id": doc["_id"]}, update))
+        if len(batch) == batch_size:
+            if not dry_run:
+                database[collection].bulk_write(batch, ordered=False)
+            batch = []
+    if batch and not dry_run:
+        database[collection].bulk_write(batch, ordered=False)
+    counts["seconds"] = round(time.perf_counter() - started, 1)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    parser.add_argument("--mongodb-url", default=MONGODB_URL)
+    parser.add_argument("--database", default=DATABASE_NAME)
+    args = parser.parse_args()
+
+    database = MongoClient(args.mongodb_url)[args.database]
+    for collection, field in GEO_INDEXES.items():
+        counts = normalise_collection(database, collection, field, args.batch_size, args.dry_run)
+        verb = "would normalise" if args.dry_run else "normalised"
+        cleared = "would be cleared" if args.dry_run else "cleared"
+        print(
+            f"{collection}: {verb} {counts['normalised']:,} locations, "
+            f"{counts['cleared']:,} unreadable ones {cleared} ({counts['seconds']}s)"
+        )
+        if counts["cleared_ids"]:
+            print(f"  unreadable, kept in {field}_legacy: " + ", ".join(map(str, counts["cleared_ids"])))
+    if not args.dry_run:
+        bump_data_version(*GEO_INDEXES, database=database)
+        print("2dsphere indexes " + ("ready" if ensure_geo_indexes(database) else "could not be created"))
+
+
+if __name__ == "__main__":
+    main()
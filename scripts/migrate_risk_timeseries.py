@@ -0,0 +1,114 @@
+"""Convert victim_risk_assessments into a time-series collection.
+
+Renames the existing collection to victim_risk_assessments_legacy, creates
+the time-series collection (timeField assessed_at, metaField victim_id) and
+copies the entries across in batches. Entries without a usable assessed_at
+are skipped and reported. The legacy collection is kept for inspection until
+the script is run again with --drop-legacy. Stop the API first: an insert
+that lands between the rename and the create would recreate a regular
+collection.
+
+    python scripts/migrate_risk_timeseries.py
+    python scripts/migrate_risk_timeseries.py --drop-legacy
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import DATABASE_NAME, MONGODB_URL, RISK_TIMESERIES  # noqa: E402
+
+COLLECTION = "victim_risk_assessments"
+LEGACY = f"{COLLECTION}_legacy"
+
+
+def is_timeseries(database, name: str) -> bool:
+    info = next(database.list_collections(filter={"name": name}), None)
+    return bool(info and info.get("type") == "timeseries")
+
+
+def normalise(doc: dict):
+    """Return the entry as stored in the time-series collection, or None to skip it"""
+    if not isinstance(doc.get("assessed_at"), datetime):
+        return None
+    victim_id = doc.get("victim_id")
+    if isinstance(victim_id, str) and ObjectId.is_valid(victim_id):
+        doc["victim_id"] = ObjectId(victim_id)
+    return doc
+
+
+def copy_entries(database, batch_size: int) -> dict:
+    source, target = database[LEGACY], database[COLLECTION]
+    copied = skipped = 0
+    batch = []
+    started = time.perf_counter()
+    for doc in source.find().sort("_id", 1).batch_size(batch_size):
+        entry = normalise(doc)
+        if entry is None:
+            skipped += 1
+            continue
+        batch.append(entry)
+        if len(batch) == batch_size:
+            target.insert_many(batch, ordered=False)
+            copied += len(batch)
+            batch = []
+            print(f"  {copied:,} copied", flush=True)
+    if batch:
+        target.insert_many(batch, ordered=False)
+        copied += len(batch)
+    return {"copied": copied, "skipped": skipped, "seconds": round(time.perf_counter() - started, 1)}
+
+
+def migrate(database, batch_size: int = 5000, drop_legacy: bool = False) -> None:
+    names = set(database.list_collection_names())
+
+    if is_timeseries(database, COLLECTION):
+        print(f"{COLLECTION} is already a time-series collection")
+        if LEGACY in names and drop_legacy:
+            legacy_count = database[LEGACY].estimated_document_count()
+            count = database[COLLECTION].count_documents({})
+            if count < legacy_count:
+                sys.exit(f"Refusing to drop {LEGACY}: {count:,} entries migrated, {legacy_count:,} in legacy")
+            database.drop_collection(LEGACY)
+            print(f"dropped {LEGACY}")
+        return
+
+    if LEGACY in names:
+        sys.exit(f"{LEGACY} already exists; inspect or remove it before migrating again")
+
+    if COLLECTION in names:
+        database[COLLECTION].rename(LEGACY)
+        print(f"renamed {COLLECTION} -> {LEGACY}")
+    database.create_collection(COLLECTION, timeseries=RISK_TIMESERIES)
+    print(f"created time-series collection {COLLECTION} {RISK_TIMESERIES}")
+
+    if LEGACY in database.list_collection_names():
+        result = copy_entries(database, batch_size)
+        print(
+            f"copied {result['copied']:,} entries in {result['seconds']}s; "
+            f"skipped {result['skipped']:,} without an assessed_at date"
+        )
+        if drop_legacy:
+            database.drop_collection(LEGACY)
+            print(f"dropped {LEGACY}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--drop-legacy", action="store_true", help="drop the renamed regular collection once copied")
+    parser.add_argument("--mongodb-url", default=MONGODB_URL)
+    parser.add_argument("--database", default=DATABASE_NAME)
+    args = parser.parse_args()
+
+    migrate(MongoClient(args.mongodb_url)[args.database], args.batch_size, args.drop_legacy)
+
+
+if __name__ == "__main__":
+    main()
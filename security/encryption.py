@@ -1,6 +1,7 @@
 from cryptography.fernet import Fernet
 import os
 import base64
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,29 +9,33 @@ load_dotenv()
 
 ENCRYPTION_KEY = os.environ.get("ENCRYPTION_KEY")
 
+_cipher_suite = None
+_cipher_lock = threading.Lock()
 
 
-# Ensure key is bytes
-if isinstance(ENCRYPTION_KEY, str):
-    ENCRYPTION_KEY = ENCRYPTION_KEY.encode()
+def get_cipher() -> Fernet:
+    """Build the Fernet cipher on first use instead of at import time"""
+    global _cipher_suite, ENCRYPTION_KEY
+    with _cipher_lock:
+        if _cipher_suite is None:
+            key = ENCRYPTION_KEY.encode() if isinstance(ENCRYPTION_KEY, str) else ENCRYPTION_KEY
+            try:
+                _cipher_suite = Fernet(key)
+            except (ValueError, TypeError) as e:
+                print(f"❌ Invalid encryption key: {e}")
 
-try:
-    cipher_suite = Fernet(ENCRYPTION_KEY)
-    print("✅ Encryption module initialized successfully")
-except ValueError as e:
-    print(f"❌ Invalid encryption key: {e}")
-
-    # Generate a temporary key to prevent crash
-    ENCRYPTION_KEY = Fernet.generate_key()
-    cipher_suite = Fernet(ENCRYPTION_KEY)
-    print("🔑 Using temporary encryption key for this session")
+                # Generate a temporary key to prevent crash
+                ENCRYPTION_KEY = Fernet.generate_key()
+                _cipher_suite = Fernet(ENCRYPTION_KEY)
+                print("🔑 Using temporary encryption key for this session")
+    return _cipher_suite
 
 def encrypt_sensitive_data(data: str) -> str:
     """Encrypt sensitive data like contact information"""
     if not data:
         return data
     try:
-        encrypted_data = cipher_suite.encrypt(data.encode())
+        encrypted_data = get_cipher().encrypt(data.encode())
         return base64.b64encode(encrypted_data).decode()
     except Exception as e:
         print(f"Encryption error: {e}")
@@ -42,7 +47,7 @@ def decrypt_sensitive_data(encrypted_data: str) -> str:
         return encrypted_data
     try:
         decoded_data = base64.b64decode(encrypted_data.encode())
-        decrypted_data = cipher_suite.decrypt(decoded_data)
+        decrypted_data = get_cipher().decrypt(decoded_data)
         return decrypted_data.decode()
     except Exception as e:
         print(f"Decryption error: {e}")
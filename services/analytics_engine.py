@@ -0,0 +1,249 @@
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from pymongo.errors import PyMongoError
+
+from db import get_data_versions
+from services.columnar import read_table
+
+SNAPSHOT_TTL_SECONDS = int(os.getenv("ANALYTICS_SNAPSHOT_TTL", "300"))
+# POST /analytics/snapshot/refresh bumps this data_versions counter; every
+# worker checks it at most once per poll interval and rebuilds when it moved
+REFRESH_SIGNAL = "analytics_snapshot"
+REFRESH_POLL_SECONDS = float(os.getenv("ANALYTICS_SNAPSHOT_POLL", "10"))
+
+# Main event date and the "reporting delay" metric for each source
+SOURCES = {
+    "cases": {
+        "dataset": "cases",
+        "date": "date_occurred",
+        "delay_from": "date_occurred",
+        "delay_to": "date_reported",
+        "dimensions": ["violation_type", "country", "region", "status", "priority", "month", "year"],
+    },
+    "reports": {
+        "dataset": "reports",
+        "date": "incident_date",
+        "delay_from": "incident_date",
+        "delay_to": "created_at",
+        "dimensions": ["violation_type", "country", "city", "status", "reporter_type", "month", "year"],
+    },
+}
+CATEGORICAL = ["country", "region", "city", "status", "priority", "reporter_type"]
+
+
+# === Snapshot construction ===
+def _build_frames(source: str) -> Dict[str, pd.DataFrame]:
+    """Load one source into a document frame and an exploded per-violation frame"""
+    spec = SOURCES[source]
+    df = read_table(spec["dataset"]).to_pandas()
+
+    dates = df[spec["date"]].dt.tz_convert(None)
+    df["date"] = dates
+    df["month"] = dates.dt.to_period("M").astype(str)
+    df["year"] = dates.dt.year.astype("Int64").astype(str)
+    df["delay_days"] = (
+        df[spec["delay_to"]] - df[spec["delay_from"]]
+    ).dt.total_seconds() / 86400.0
+
+    for column in CATEGORICAL:
+        if column in df:
+            df[column] = df[column].astype("category")
+
+    violations = df.explode("violation_types").rename(
+        columns={"violation_types": "violation_type"}
+    )
+    violations = violations[violations["violation_type"].notna()]
+    violations["violation_type"] = violations["violation_type"].astype("category")
+
+    return {"documents": df.drop(columns=["violation_types"]), "violations": violations}
+
+
+class AnalyticsSnapshot:
+    """In-memory columnar copy of cases and reports, refreshed in the background"""
+
+    def __init__(self, ttl_seconds: int = SNAPSHOT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.refreshed_at: Optional[datetime] = None
+        self.build_seconds: Optional[float] = None
+        self._frames: Dict[str, Dict[str, pd.DataFrame]] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._signal_version = None
+        self._signal_checked_at = 0.0
+
+    def refresh(self) -> None:
+        """Rebuild every source frame and swap them in atomically"""
+        started = time.perf_counter()
+        signal_version = _refresh_signal()
+        frames = {source: _build_frames(source) for source in SOURCES}
+        with self._lock:
+            self._frames = frames
+            self._signal_version = signal_version
+            self._loaded_at = time.monotonic()
+            self.refreshed_at = datetime.utcnow()
+            self.build_seconds = round(time.perf_counter() - started, 3)
+            self._refreshing = False
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        finally:
+            self._refreshing = False
+
+    def frames(self, source: str) -> Dict[str, pd.DataFrame]:
+        """Return the frames for a source, refreshing when stale
+
+        The first call builds the snapshot synchronously. After that a stale
+        snapshot keeps being served while a single background thread rebuilds it.
+        """
+        if not self._frames:
+            with self._lock:
+                needs_build = not self._frames
+            if needs_build:
+                self.refresh()
+        elif time.monotonic() - self._loaded_at > self.ttl_seconds or self._refresh_requested():
+            with self._lock:
+                start = not self._refreshing
+                self._refreshing = True
+            if start:
+                threading.Thread(target=self._refresh_in_background, daemon=True).start()
+        return self._frames[source]
+
+    def _refresh_requested(self) -> bool:
+        """Whether another worker was asked to refresh since this snapshot was built"""
+        now = time.monotonic()
+        if now - self._signal_checked_at < REFRESH_POLL_SECONDS:
+            return False
+        self._signal_checked_at = now
+        return _refresh_signal() != self._signal_version
+
+    def info(self) -> dict:
+        return {
+            "refreshed_at": self.refreshed_at,
+            "build_seconds": self.build_seconds,
+            "ttl_seconds": self.ttl_seconds,
+            "rows": {
+                source: len(frames["documents"]) for source, frames in self._frames.items()
+            },
+        }
+
+
+def _refresh_signal() -> Optional[int]:
+    try:
+        return get_data_versions([REFRESH_SIGNAL]).get(REFRESH_SIGNAL, {}).get("version")
+    except PyMongoError:
+        return None
+
+
+snapshot = AnalyticsSnapshot()
+
+
+# === Vectorized queries ===
+def _validate_dimensions(source: str, dimensions: List[str]) -> None:
+    allowed = SOURCES[source]["dimensions"]
+    unknown = [d for d in dimensions if d not in allowed]
+    if unknown:
+        raise ValueError(
+            f"Unknown dimension(s) {unknown} for {source}; allowed: {allowed}"
+        )
+
+
+def _naive_utc(value: datetime) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    return ts.tz_convert(None) if ts.tzinfo else ts
+
+
+def _select(
+    source: str,
+    dimensions: List[str],
+    country: Optional[str] = None,
+    status: Optional[str] = None,
+    violation: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> pd.DataFrame:
+    """Pick the right frame for the dimensions and apply filters as one boolean mask"""
+    _validate_dimensions(source, dimensions)
+    frames = snapshot.frames(source)
+    per_violation = "violation_type" in dimensions or violation is not None
+    df = frames["violations"] if per_violation else frames["documents"]
+
+    mask = np.ones(len(df), dtype=bool)
+    if country:
+        mask &= (df["country"] == country).to_numpy()
+    if status:
+        mask &= (df["status"] == status).to_numpy()
+    if violation:
+        mask &= (df["violation_type"] == violation).to_numpy()
+    if start:
+        mask &= (df["date"] >= _naive_utc(start)).to_numpy()
+    if end:
+        mask &= (df["date"] < _naive_utc(end)).to_numpy()
+    return df[mask]
+
+
+def _records(df: pd.DataFrame) -> List[dict]:
+    """Convert a result frame to JSON-safe records (NaN -> None)"""
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def group_counts(source: str, dimensions: List[str], **filters) -> List[dict]:
+    """Count documents (or violations) for every combination of the dimensions"""
+    df = _select(source, dimensions, **filters)
+    counts = (
+        df.groupby(dimensions, observed=True, sort=False)
+        .size()
+        .reset_index(name="count")
+        .sort_values("count", ascending=False)
+    )
+    return _records(counts)
+
+
+def crosstab(source: str, rows: List[str], columns: str, **filters) -> dict:
+    """Pivot counts into a rows x columns matrix"""
+    df = _select(source, rows + [columns], **filters)
+    table = pd.crosstab(
+        [df[r].astype(str) for r in rows], df[columns].astype(str)
+    ).sort_index(axis=1)
+    return {
+        "rows": rows,
+        "columns": columns,
+        "index": [list(i) if isinstance(i, tuple) else [i] for i in table.index],
+        "column_values": table.columns.tolist(),
+        "values": table.to_numpy().tolist(),
+    }
+
+
+def percentiles(
+    source: str,
+    dimensions: List[str],
+    q: List[float],
+    metric: str = "delay_days",
+    **filters,
+) -> List[dict]:
+    """Percentiles of a numeric metric, optionally per group"""
+    df = _select(source, dimensions, **filters)
+    df = df[df[metric].notna()]
+    quantiles = [p / 100.0 for p in q]
+    labels = [f"p{p:g}" for p in q]
+
+    if not dimensions:
+        if len(df):
+            values = [float(v) for v in np.quantile(df[metric].to_numpy(), quantiles)]
+        else:
+            values = [None] * len(q)
+        return [dict(zip(labels, values), count=len(df))]
+
+    grouped = df.groupby(dimensions, observed=True)[metric]
+    result = grouped.quantile(quantiles).unstack()
+    result.columns = labels
+    result["count"] = grouped.size()
+    return _records(result.reset_index())
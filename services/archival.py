@@ -0,0 +1,131 @@
+"""Hot/cold tiering for cases.
+
+Closed cases are moved, with their status history, from the working
+collections into zstd-compressed archive collections (db.ARCHIVE_COLLECTIONS),
+so list endpoints and aggregations only touch open work. Moves are batched
+and run as background jobs tracked in archive_jobs.
+
+Each batch copies before it deletes. An interrupted move can leave a case in
+both tiers, and the next run completes it (the archive copy is replaced with
+the current working document); it never loses documents.
+"""
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from pymongo import ReplaceOne
+
+from db import (
+    archive_jobs,
+    bump_data_version,
+    case_status_history,
+    case_status_history_archive,
+    cases,
+    cases_archive,
+)
+
+# Analytics, exports, geo queries and PDF reports only read the working tier,
+# so "resolved" (a status cases still report on) is not archived by default
+ARCHIVE_STATUSES = [s.strip() for s in os.getenv("ARCHIVE_STATUSES", "closed,archived").split(",") if s.strip()]
+# Cases untouched for this long in one of ARCHIVE_STATUSES are archived
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+
+
+def candidates_query(older_than_days: int = ARCHIVE_AFTER_DAYS) -> dict:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    return {"status": {"$in": ARCHIVE_STATUSES}, "updated_at": {"$lt": cutoff}}
+
+
+def _copy(target, docs: List[dict]) -> None:
+    """Write into an archive collection, replacing copies left by an interrupted move
+
+    The working document is authoritative: it may have changed since an
+    earlier copy was made.
+    """
+    if not docs:
+        return
+    target.bulk_write([ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in docs], ordered=False)
+
+
+def move_cases(query: dict, limit: int) -> Tuple[int, int]:
+    """Move up to `limit` cases matching `query` and their history
+
+    Returns (candidates found, cases moved); cases reopened during the move
+    are found but stay in the working set.
+    """
+    docs = list(cases.find(query).limit(limit))
+    if not docs:
+        return 0, 0
+    archived_at = datetime.now(timezone.utc)
+    for doc in docs:
+        doc["archived_at"] = archived_at
+    case_ids = [doc["case_id"] for doc in docs]
+    history = list(case_status_history.find({"case_id": {"$in": case_ids}}))
+
+    _copy(cases_archive, docs)
+    _copy(case_status_history_archive, history)
+
+    # The query is repeated so a case reopened meanwhile stays in the working set
+    ids = [doc["_id"] for doc in docs]
+    cases.delete_many({"_id": {"$in": ids}, **query})
+    still_hot = {doc["case_id"] for doc in cases.find({"_id": {"$in": ids}}, {"case_id": 1})}
+    if still_hot:
+        cases_archive.delete_many({"_id": {"$in": [d["_id"] for d in docs if d["case_id"] in still_hot]}})
+        case_status_history_archive.delete_many({"_id": {"$in": [h["_id"] for h in history if h["case_id"] in still_hot]}})
+
+    moved_history = [h["_id"] for h in history if h["case_id"] not in still_hot]
+    if moved_history:
+        case_status_history.delete_many({"_id": {"$in": moved_history}})
+    return len(docs), len(docs) - len(still_hot)
+
+
+def archive_case(case_id: str) -> bool:
+    """Move one case to the archive whatever its status; False if it is not in the working set"""
+    return move_cases({"case_id": case_id}, limit=1)[1] > 0
+
+
+# === Background jobs ===
+def start_job(older_than_days: int, batch_size: int, requested_by: str) -> dict:
+    job = {
+        "_id": uuid.uuid4().hex,
+        "status": "pending",
+        "older_than_days": older_than_days,
+        "batch_size": batch_size,
+        "statuses": ARCHIVE_STATUSES,
+        "moved": 0,
+        "batches": 0,
+        "requested_by": requested_by,
+        "created_at": datetime.now(timezone.utc),
+    }
+    archive_jobs.insert_one(job)
+    return job
+
+
+def run_job(job_id: str) -> None:
+    """Move matching cases batch by batch until none are left; run via BackgroundTasks"""
+    job = archive_jobs.find_one({"_id": job_id})
+    query = candidates_query(job["older_than_days"])
+    archive_jobs.update_one({"_id": job_id}, {"$set": {"status": "running", "started_at": datetime.now(timezone.utc)}})
+    try:
+        while True:
+            # A batch whose cases were all reopened moves none, but later
+            # batches may still hold candidates
+            found, moved = move_cases(query, job["batch_size"])
+            if not found:
+                break
+            if moved:
+                bump_data_version("cases")
+            archive_jobs.update_one({"_id": job_id}, {"$inc": {"moved": moved, "batches": 1}})
+    except Exception as e:
+        archive_jobs.update_one(
+            {"_id": job_id},
+            {"$set": {"status": "failed", "error": str(e), "finished_at": datetime.now(timezone.utc)}},
+        )
+        return
+    archive_jobs.update_one({"_id": job_id}, {"$set": {"status": "done", "finished_at": datetime.now(timezone.utc)}})
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    return archive_jobs.find_one({"_id": job_id})
@@ -0,0 +1,246 @@
+import io
+from typing import Callable, Dict, Iterator, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from db import analytics_db
+
+# Exports and the analytics snapshot are bulk reads that can go to a secondary
+cases = analytics_db["cases"]
+case_status_history = analytics_db["case_status_history"]
+incident_reports = analytics_db["incident_reports"]
+victim_risk_assessments = analytics_db["victim_risk_assessments"]
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+# === Row flatteners ===
+def _point(coordinates) -> tuple:
+    """Return (lon, lat) from a GeoJSON point dict, or (None, None)"""
+    if isinstance(coordinates, dict):
+        values = coordinates.get("coordinates")
+        if isinstance(values, (list, tuple)) and len(values) == 2:
+            return float(values[0]), float(values[1])
+    return None, None
+
+
+def _case_row(doc: dict) -> dict:
+    location = doc.get("location") or {}
+    lon, lat = _point(location.get("coordinates"))
+    return {
+        "case_id": doc.get("case_id"),
+        "title": doc.get("title"),
+        "status": doc.get("status"),
+        "priority": doc.get("priority"),
+        "violation_types": doc.get("violation_types") or [],
+        "country": location.get("country"),
+        "region": location.get("region"),
+        "lon": lon,
+        "lat": lat,
+        "date_occurred": doc.get("date_occurred"),
+        "date_reported": doc.get("date_reported"),
+        "created_by": doc.get("created_by"),
+        "created_at": doc.get("created_at"),
+        "updated_at": doc.get("updated_at"),
+        "incident_report_id": doc.get("incident_report_id"),
+    }
+
+
+def _report_row(doc: dict) -> dict:
+    details = doc.get("incident_details") or {}
+    location = details.get("location") or {}
+    lon, lat = _point(location.get("coordinates"))
+    return {
+        "report_id": doc.get("report_id"),
+        "reporter_type": doc.get("reporter_type"),
+        "anonymous": doc.get("anonymous"),
+        "status": doc.get("status"),
+        "assigned_to": doc.get("assigned_to"),
+        "violation_types": details.get("violation_types") or [],
+        "country": location.get("country"),
+        "city": location.get("city"),
+        "lon": lon,
+        "lat": lat,
+        "incident_date": details.get("date"),
+        "created_at": doc.get("created_at"),
+    }
+
+
+def _risk_row(doc: dict) -> dict:
+    return {
+        "assessment_id": str(doc["_id"]),
+        "victim_id": str(doc.get("victim_id")),
+        "risk_level": doc.get("risk_level"),
+        "previous_level": doc.get("previous_level"),
+        "assessed_by": doc.get("assessed_by"),
+        "assessed_at": doc.get("assessed_at"),
+    }
+
+
+def _status_row(doc: dict) -> dict:
+    return {
+        "case_id": doc.get("case_id"),
+        "status": doc.get("status"),
+        "changed_by": doc.get("changed_by"),
+        "timestamp": doc.get("timestamp"),
+    }
+
+
+# === Dataset definitions ===
+TIMESTAMP = pa.timestamp("ms", tz="UTC")
+
+DATASETS: Dict[str, dict] = {
+    "cases": {
+        "collection": cases,
+        # Free-text description and evidence are left out of the columnar export
+        "projection": {"description": 0, "evidence": 0, "perpetrators": 0, "victims": 0},
+        "row": _case_row,
+        "schema": pa.schema(
+            [
+                ("case_id", pa.string()),
+                ("title", pa.string()),
+                ("status", pa.string()),
+                ("priority", pa.string()),
+                ("violation_types", pa.list_(pa.string())),
+                ("country", pa.string()),
+                ("region", pa.string()),
+                ("lon", pa.float64()),
+                ("lat", pa.float64()),
+                ("date_occurred", TIMESTAMP),
+                ("date_reported", TIMESTAMP),
+                ("created_by", pa.string()),
+                ("created_at", TIMESTAMP),
+                ("updated_at", TIMESTAMP),
+                ("incident_report_id", pa.string()),
+            ]
+        ),
+    },
+    "reports": {
+        "collection": incident_reports,
+        # Contact details of reporters never leave the API through exports
+        "projection": {"contact_info": 0, "evidence": 0, "incident_details.description": 0},
+        "row": _report_row,
+        "schema": pa.schema(
+            [
+                ("report_id", pa.string()),
+                ("reporter_type", pa.string()),
+                ("anonymous", pa.bool_()),
+                ("status", pa.string()),
+                ("assigned_to", pa.string()),
+                ("violation_types", pa.list_(pa.string())),
+                ("country", pa.string()),
+                ("city", pa.string()),
+                ("lon", pa.float64()),
+                ("lat", pa.float64()),
+                ("incident_date", TIMESTAMP),
+                ("created_at", TIMESTAMP),
+            ]
+        ),
+    },
+    "risk_assessments": {
+        "collection": victim_risk_assessments,
+        "projection": {"notes": 0},
+        "row": _risk_row,
+        "schema": pa.schema(
+            [
+                ("assessment_id", pa.string()),
+                ("victim_id", pa.string()),
+                ("risk_level", pa.string()),
+                ("previous_level", pa.string()),
+                ("assessed_by", pa.string()),
+                ("assessed_at", TIMESTAMP),
+            ]
+        ),
+    },
+    "status_history": {
+        "collection": case_status_history,
+        "projection": {"_id": 0},
+        "row": _status_row,
+        "schema": pa.schema(
+            [
+                ("case_id", pa.string()),
+                ("status", pa.string()),
+                ("changed_by", pa.string()),
+                ("timestamp", TIMESTAMP),
+            ]
+        ),
+    },
+}
+
+
+# === Batched reads ===
+def iter_record_batches(
+    dataset: str, query: Optional[dict] = None, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[pa.RecordBatch]:
+    """Read a dataset with a batched cursor and yield Arrow record batches"""
+    spec = DATASETS[dataset]
+    schema: pa.Schema = spec["schema"]
+    to_row: Callable[[dict], dict] = spec["row"]
+
+    cursor = spec["collection"].find(
+        query or {}, spec["projection"], batch_size=batch_size
+    )
+    rows = []
+    for doc in cursor:
+        rows.append(to_row(doc))
+        if len(rows) >= batch_size:
+            yield pa.RecordBatch.from_pylist(rows, schema=schema)
+            rows = []
+    if rows:
+        yield pa.RecordBatch.from_pylist(rows, schema=schema)
+
+
+def read_table(
+    dataset: str, query: Optional[dict] = None, batch_size: int = DEFAULT_BATCH_SIZE
+) -> pa.Table:
+    """Materialize a whole dataset as an Arrow table"""
+    batches = list(iter_record_batches(dataset, query, batch_size))
+    return pa.Table.from_batches(batches, schema=DATASETS[dataset]["schema"])
+
+
+# === Streaming writers ===
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands buffered bytes back to the caller"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_arrow(batches: Iterator[pa.RecordBatch], schema: pa.Schema) -> Iterator[bytes]:
+    """Encode record batches as an Arrow IPC stream, one chunk per batch"""
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema)
+    try:
+        for batch in batches:
+            writer.write_batch(batch)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def stream_parquet(batches: Iterator[pa.RecordBatch], schema: pa.Schema) -> Iterator[bytes]:
+    """Encode record batches as Parquet, one row group per batch"""
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            writer.write_batch(batch)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
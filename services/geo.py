@@ -0,0 +1,202 @@
+"""GeoJSON normalisation and $geoNear pipelines for cases and reports.
+
+Both collections keep their location as a GeoJSON Point, which the 2dsphere
+indexes created by db.ensure_geo_indexes cover:
+    cases             location.coordinates
+    incident_reports  incident_details.location.coordinates
+"""
+from typing import List, Optional, Tuple
+
+from db import GEO_INDEXES
+
+MAX_RADIUS_KM = 1000
+MAX_RESULTS = 1000
+# Older clients sent {"lat": .., "lon": ..} and similar; each pair is (lat key, lon key)
+_LAT_LON_KEYS = [("lat", "lon"), ("lat", "lng"), ("latitude", "longitude")]
+
+
+def point(lon: float, lat: float) -> dict:
+    if not (-180 <= lon <= 180) or not (-90 <= lat <= 90):
+        raise ValueError("Latitude must be between -90 and 90, Longitude between -180 and 180")
+    return {"type": "Point", "coordinates": [float(lon), float(lat)]}
+
+
+def to_geojson_point(value) -> Optional[dict]:
+    """Normalise a stored or submitted location to a GeoJSON Point
+
+    Accepts a GeoJSON Point, a bare [lon, lat] pair or a lat/lon mapping.
+    Returns None for None; raises ValueError for anything else.
+    """
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        if "coordinates" in value:
+            if value.get("type", "Point") != "Point":
+                raise ValueError("Only GeoJSON Point coordinates are supported")
+            return to_geojson_point(value["coordinates"])
+        for lat_key, lon_key in _LAT_LON_KEYS:
+            if lat_key in value and lon_key in value:
+                return point(_number(value[lon_key]), _number(value[lat_key]))
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        return point(_number(value[0]), _number(value[1]))
+    raise ValueError("Coordinates must be a GeoJSON Point or a lat/lon pair")
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Coordinate {value!r} is not a number")
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """"minLon,minLat,maxLon,maxLat" as (min_lon, min_lat, max_lon, max_lat)"""
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise ValueError("bbox must be minLon,minLat,maxLon,maxLat")
+    if min_lon >= max_lon or min_lat >= max_lat:
+        raise ValueError("bbox minimums must be below its maximums")
+    point(min_lon, min_lat)
+    point(max_lon, max_lat)
+    # Polygon edges are great circles: at 180 degrees or wider the longitude
+    # edges are ambiguous and MongoDB rejects the geometry
+    if max_lon - min_lon >= 180:
+        raise ValueError("bbox must span less than 180 degrees of longitude")
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def bbox_polygon(bounds: Tuple[float, float, float, float]) -> dict:
+    """The bounding box as a closed GeoJSON Polygon
+
+    Its latitude edges are great circles, which bulge poleward of the
+    requested latitudes; within_query() clips to the exact box.
+    """
+    min_lon, min_lat, max_lon, max_lat = bounds
+    return polygon([(min_lon, min_lat), (max_lon, min_lat), (max_lon, max_lat), (min_lon, max_lat)])
+
+
+def parse_polygon(text: str) -> dict:
+    """"lon,lat;lon,lat;..." (at least three vertices) as a closed GeoJSON Polygon"""
+    try:
+        vertices = [tuple(float(v) for v in pair.split(",")) for pair in text.split(";") if pair.strip()]
+    except ValueError:
+        raise ValueError("polygon must be lon,lat pairs separated by ';'")
+    if any(len(v) != 2 for v in vertices):
+        raise ValueError("polygon must be lon,lat pairs separated by ';'")
+    if vertices and vertices[0] == vertices[-1]:
+        vertices = vertices[:-1]
+    if len(vertices) < 3:
+        raise ValueError("polygon needs at least three vertices")
+    if len(set(vertices)) != len(vertices):
+        raise ValueError("polygon must not repeat a vertex")
+    if _self_intersects(vertices):
+        raise ValueError("polygon edges must not cross")
+    return polygon(vertices)
+
+
+def _self_intersects(vertices: List[Tuple[float, float]]) -> bool:
+    """Whether any two non-adjacent edges of the ring cross (planar test on lon/lat)"""
+    edges = list(zip(vertices, vertices[1:] + vertices[:1]))
+    for i, (a, b) in enumerate(edges):
+        for j in range(i + 2, len(edges)):
+            if i == 0 and j == len(edges) - 1:
+                continue  # the first and last edges share the closing vertex
+            c, d = edges[j]
+            if _segments_cross(a, b, c, d):
+                return True
+    return False
+
+
+def _segments_cross(a, b, c, d) -> bool:
+    def orientation(p, q, r):
+        cross = (q[0] - p[0]) * (r[1] - p[1]) - (q[1] - p[1]) * (r[0] - p[0])
+        return (cross > 0) - (cross < 0)
+
+    def on_segment(p, q, r):
+        return min(p[0], r[0]) <= q[0] <= max(p[0], r[0]) and min(p[1], r[1]) <= q[1] <= max(p[1], r[1])
+
+    o1, o2, o3, o4 = orientation(a, b, c), orientation(a, b, d), orientation(c, d, a), orientation(c, d, b)
+    if o1 != o2 and o3 != o4:
+        return True
+    return (
+        (o1 == 0 and on_segment(a, c, b))
+        or (o2 == 0 and on_segment(a, d, b))
+        or (o3 == 0 and on_segment(c, a, d))
+        or (o4 == 0 and on_segment(c, b, d))
+    )
+
+
+def polygon(vertices: List[Tuple[float, float]]) -> dict:
+    for lon, lat in vertices:
+        point(lon, lat)
+    ring = [[lon, lat] for lon, lat in vertices]
+    return {"type": "Polygon", "coordinates": [ring + [ring[0]]]}
+
+
+def centroid(shape: dict) -> dict:
+    """Vertex average; only used as the origin for ordering results by distance"""
+    ring = shape["coordinates"][0][:-1]
+    return point(sum(v[0] for v in ring) / len(ring), sum(v[1] for v in ring) / len(ring))
+
+
+# What each source returns, flattened to the same shape
+PROJECTIONS = {
+    "cases": {
+        "_id": 0,
+        "source": {"$literal": "cases"},
+        "id": "$case_id",
+        "title": "$title",
+        "status": "$status",
+        "violation_types": "$violation_types",
+        "date": "$date_occurred",
+        "country": "$location.country",
+        "lon": {"$arrayElemAt": ["$location.coordinates.coordinates", 0]},
+        "lat": {"$arrayElemAt": ["$location.coordinates.coordinates", 1]},
+        "distance_km": {"$round": [{"$divide": ["$distance_m", 1000]}, 3]},
+    },
+    "incident_reports": {
+        "_id": 0,
+        "source": {"$literal": "reports"},
+        "id": "$report_id",
+        "title": {"$substrCP": ["$incident_details.description", 0, 100]},
+        "status": "$status",
+        "violation_types": "$incident_details.violation_types",
+        "date": "$incident_details.date",
+        "country": "$incident_details.location.country",
+        "lon": {"$arrayElemAt": ["$incident_details.location.coordinates.coordinates", 0]},
+        "lat": {"$arrayElemAt": ["$incident_details.location.coordinates.coordinates", 1]},
+        "distance_km": {"$round": [{"$divide": ["$distance_m", 1000]}, 3]},
+    },
+}
+
+
+def near_pipeline(
+    collection: str,
+    origin: dict,
+    limit: int,
+    max_distance_km: Optional[float] = None,
+    query: Optional[dict] = None,
+) -> list:
+    """Documents nearest to `origin` first, served from the 2dsphere index"""
+    geo_near = {
+        "near": origin,
+        "key": GEO_INDEXES[collection],
+        "distanceField": "distance_m",
+        "spherical": True,
+        "query": query or {},
+    }
+    if max_distance_km is not None:
+        geo_near["maxDistance"] = max_distance_km * 1000
+    return [{"$geoNear": geo_near}, {"$limit": limit}, {"$project": PROJECTIONS[collection]}]
+
+
+def within_query(collection: str, shape: dict, bounds: Optional[Tuple[float, float, float, float]] = None) -> dict:
+    """$geoWithin `shape`; with `bounds`, also clipped to that lon/lat box"""
+    field = GEO_INDEXES[collection]
+    query = {field: {"$geoWithin": {"$geometry": shape}}}
+    if bounds:
+        min_lon, min_lat, max_lon, max_lat = bounds
+        query[f"{field}.coordinates.0"] = {"$gte": min_lon, "$lte": max_lon}
+        query[f"{field}.coordinates.1"] = {"$gte": min_lat, "$lte": max_lat}
+    return query
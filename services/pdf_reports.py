@@ -0,0 +1,395 @@
+import hashlib
+import importlib.util
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import List, Optional
+
+from db import READ_TIERS, analytics_db, get_data_versions, pdf_jobs
+from models.user import UserRole
+
+# fpdf is imported by the worker processes only; the API process just queues jobs.
+
+# Generated files live outside media/, which is served without authentication
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "hrm_pdf_reports"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))
+# A finished PDF is reused for identical requests for this long
+PDF_CACHE_TTL_SECONDS = int(os.getenv("PDF_CACHE_TTL_SECONDS", "900"))
+# Pending jobs older than this are assumed lost (e.g. the API restarted)
+PDF_JOB_TIMEOUT_SECONDS = int(os.getenv("PDF_JOB_TIMEOUT_SECONDS", "600"))
+PDF_MAX_ROWS = int(os.getenv("PDF_MAX_ROWS", "10000"))
+PDF_FONT_PATH = os.getenv("PDF_FONT_PATH")
+FALLBACK_FONTS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/usr/local/share/fonts/DejaVuSans.ttf",
+    "/Library/Fonts/DejaVuSans.ttf",
+    "C:\\Windows\\Fonts\\DejaVuSans.ttf",
+]
+# Bump when the layout changes so cached files are not reused
+TEMPLATE_VERSION = 1
+# PDFs are read from the analytics tier, which may lag a write by this long;
+# a PDF rendered within it of the last write is not offered to later requests
+ANALYTICS_LAG_SECONDS = (
+    READ_TIERS["analytics"]["max_staleness"] if READ_TIERS["analytics"]["read_preference"] != "primary" else 0
+)
+MAX_CELL_CHARS = 160
+
+
+# === Row builders (one list of strings per document) ===
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_text(v).replace("_", " ") for v in value)
+    text = str(value)
+    return text if len(text) <= MAX_CELL_CHARS else text[: MAX_CELL_CHARS - 3] + "..."
+
+
+def _case_row(doc: dict) -> list:
+    location = doc.get("location") or {}
+    return [
+        doc.get("case_id"),
+        doc.get("title"),
+        (doc.get("status") or "").replace("_", " "),
+        doc.get("priority"),
+        location.get("country"),
+        location.get("region"),
+        doc.get("violation_types"),
+        doc.get("date_occurred"),
+        doc.get("description"),
+    ]
+
+
+def _report_row(doc: dict) -> list:
+    details = doc.get("incident_details") or {}
+    location = details.get("location") or {}
+    return [
+        doc.get("report_id"),
+        (doc.get("status") or "").replace("_", " "),
+        details.get("date"),
+        location.get("country"),
+        location.get("city"),
+        details.get("violation_types"),
+        details.get("description"),
+    ]
+
+
+def _victim_row(doc: dict) -> list:
+    risk = doc.get("risk_assessment") or {}
+    # Demographics of anonymous individuals are never printed
+    demographics = {} if doc.get("anonymous") else (doc.get("demographics") or {})
+    return [
+        str(doc["_id"]),
+        doc.get("type"),
+        doc.get("pseudonym"),
+        "Yes" if doc.get("anonymous") else "No",
+        risk.get("level"),
+        "Yes" if risk.get("protection_needed") else "No",
+        demographics.get("age"),
+        demographics.get("gender"),
+    ]
+
+
+DATASETS = {
+    "cases": {
+        "title": "Cases",
+        "collection": "cases",
+        "filters": {"status": "status", "country": "location.country", "violation": "violation_types"},
+        "sort": [("date_occurred", -1)],
+        "columns": [
+            ("Case ID", 12), ("Title", 24), ("Status", 12), ("Priority", 8), ("Country", 12),
+            ("Region", 12), ("Violations", 22), ("Occurred", 10), ("Description", 40),
+        ],
+        "projection": {
+            "case_id": 1, "title": 1, "status": 1, "priority": 1, "location.country": 1,
+            "location.region": 1, "violation_types": 1, "date_occurred": 1, "description": 1,
+        },
+        "row": _case_row,
+        "roles": None,
+    },
+    "reports": {
+        "title": "Incident Reports",
+        "collection": "incident_reports",
+        "filters": {
+            "status": "status",
+            "country": "incident_details.location.country",
+            "violation": "incident_details.violation_types",
+            "date": "incident_details.date",
+        },
+        # Same matching as GET /reports/?date=
+        "parsers": {"date": datetime.fromisoformat},
+        "sort": [("incident_details.date", -1)],
+        "columns": [
+            ("Report ID", 14), ("Status", 12), ("Date", 10), ("Country", 12),
+            ("City", 12), ("Violations", 24), ("Description", 52),
+        ],
+        "projection": {
+            "report_id": 1, "status": 1, "incident_details.date": 1, "incident_details.location.country": 1,
+            "incident_details.location.city": 1, "incident_details.violation_types": 1,
+            "incident_details.description": 1,
+        },
+        "row": _report_row,
+        "roles": None,
+    },
+    "victims": {
+        "title": "Victim/Witness Records",
+        "collection": "individuals",
+        "filters": {"risk_level": "risk_assessment.level", "victim_type": "type"},
+        "sort": [("_id", 1)],
+        "columns": [
+            ("ID", 22), ("Type", 10), ("Pseudonym", 18), ("Anonymous", 10),
+            ("Risk Level", 10), ("Protection", 10), ("Age", 6), ("Gender", 10),
+        ],
+        # Contact details are never part of a PDF
+        "projection": {
+            "type": 1, "pseudonym": 1, "anonymous": 1, "risk_assessment.level": 1,
+            "risk_assessment.protection_needed": 1, "demographics.age": 1, "demographics.gender": 1,
+        },
+        "row": _victim_row,
+        "roles": [UserRole.ADMIN, UserRole.CASE_MANAGER, UserRole.ANALYST],
+    },
+}
+
+
+def build_query(dataset: str, filters: dict) -> dict:
+    spec = DATASETS[dataset]
+    unknown = set(filters) - set(spec["filters"])
+    if unknown:
+        raise ValueError(f"Unknown filter(s) for {dataset}: {', '.join(sorted(unknown))}")
+    parsers = spec.get("parsers", {})
+    return {
+        spec["filters"][name]: parsers[name](value) if name in parsers else value
+        for name, value in filters.items()
+        if value not in (None, "")
+    }
+
+
+def query_hash(dataset: str, filters: dict, data_version: int = 0) -> str:
+    """Stable key for a dataset, its filters and its data version; identical requests share one file"""
+    payload = {
+        "dataset": dataset,
+        "filters": build_query(dataset, filters),
+        "template": TEMPLATE_VERSION,
+        "data_version": data_version,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+
+# === Rendering (runs in a worker process) ===
+def find_font() -> Optional[str]:
+    for path in [PDF_FONT_PATH, *FALLBACK_FONTS]:
+        if path and os.path.isfile(path):
+            return path
+    return None
+
+
+def _new_pdf(title: str, subtitle: str):
+    from fpdf import FPDF
+
+    class ReportPDF(FPDF):
+        def header(self):
+            self.set_font(self.body_font, "B", 13)
+            self.cell(0, 8, self.clean(title), new_x="LMARGIN", new_y="NEXT")
+            self.set_font(self.body_font, "", 8)
+            self.cell(0, 5, self.clean(subtitle), new_x="LMARGIN", new_y="NEXT")
+            self.ln(2)
+
+        def footer(self):
+            self.set_y(-12)
+            self.set_font(self.body_font, "", 8)
+            self.cell(0, 6, f"Page {self.page_no()}/{{nb}}", align="C")
+
+        def clean(self, text: str) -> str:
+            # The built-in Helvetica font only covers latin-1
+            if self.body_font == "helvetica":
+                return text.encode("latin-1", "replace").decode("latin-1")
+            return text
+
+    pdf = ReportPDF(orientation="L", format="A4")
+    font = find_font()
+    if font:
+        root, extension = os.path.splitext(font)
+        bold = f"{root}-Bold{extension}"
+        pdf.add_font("body", "", font)
+        pdf.add_font("body", "B", bold if os.path.isfile(bold) else font)
+        pdf.body_font = "body"
+        # Shaping (Arabic joining, bidi) needs the optional uharfbuzz package
+        if importlib.util.find_spec("uharfbuzz"):
+            pdf.set_text_shaping(True)
+    else:
+        pdf.body_font = "helvetica"
+    pdf.set_title(title)
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.alias_nb_pages()
+    return pdf
+
+
+def render_report(dataset: str, filters: dict, path: str) -> dict:
+    """Render a dataset as a paginated table and write it atomically to `path`"""
+    from fpdf.fonts import FontFace
+
+    spec = DATASETS[dataset]
+    query = build_query(dataset, filters)
+    cursor = (
+        analytics_db[spec["collection"]]
+        .find(query, spec["projection"])
+        .sort(spec["sort"])
+        .limit(PDF_MAX_ROWS + 1)
+        .batch_size(1000)
+    )
+
+    generated = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+    described = ", ".join(f"{k}={v}" for k, v in sorted(filters.items()) if v) or "no filters"
+    pdf = _new_pdf(spec["title"], f"Generated {generated} - {described}")
+    pdf.add_page()
+    pdf.set_font(pdf.body_font, "", 7)
+
+    rows = 0
+    truncated = False
+    headings = FontFace(emphasis="BOLD", fill_color=(225, 225, 225))
+    with pdf.table(
+        col_widths=tuple(width for _, width in spec["columns"]),
+        headings_style=headings,
+        line_height=4,
+        text_align="LEFT",
+        repeat_headings=1,
+    ) as table:
+        heading = table.row()
+        for name, _ in spec["columns"]:
+            heading.cell(name)
+        for doc in cursor:
+            if rows == PDF_MAX_ROWS:
+                truncated = True
+                break
+            row = table.row()
+            for value in spec["row"](doc):
+                row.cell(pdf.clean(_text(value)))
+            rows += 1
+
+    if truncated:
+        pdf.ln(4)
+        pdf.cell(0, 6, f"Truncated to the first {PDF_MAX_ROWS:,} rows; narrow the filters for a complete report.")
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial_path = f"{path}.{uuid.uuid4().hex}.part"
+    pdf.output(partial_path)
+    os.replace(partial_path, path)
+    return {"rows": rows, "pages": pdf.pages_count, "truncated": truncated, "size_bytes": os.path.getsize(path)}
+
+
+# === Job queue (API process) ===
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn, so workers never inherit the parent's MongoClient sockets
+            _executor = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+    return _executor
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _reusable(job: dict) -> bool:
+    now = datetime.now(timezone.utc)
+    if job["status"] == "pending":
+        return now - _as_utc(job["created_at"]) < timedelta(seconds=PDF_JOB_TIMEOUT_SECONDS)
+    return (
+        job["status"] == "done"
+        and job.get("settled", True)
+        and now - _as_utc(job["finished_at"]) < timedelta(seconds=PDF_CACHE_TTL_SECONDS)
+        and os.path.isfile(job["path"])
+    )
+
+
+def _finish(job_id: str, future) -> None:
+    try:
+        result = future.result()
+    except Exception as e:
+        update = {"status": "failed", "error": str(e) or type(e).__name__}
+    else:
+        update = {"status": "done", **result}
+    update["finished_at"] = datetime.now(timezone.utc)
+    pdf_jobs.update_one({"_id": job_id}, {"$set": update})
+
+
+def submit(dataset: str, filters: dict) -> dict:
+    """Queue a PDF for rendering, or return the job that already covers this query
+
+    The key includes the dataset's data_versions counter, so any write through
+    the API makes the next request render a fresh file.
+    """
+    collection = DATASETS[dataset]["collection"]
+    version = get_data_versions([collection]).get(collection, {})
+    key = query_hash(dataset, filters, version.get("version", 0))
+    for job in pdf_jobs.find({"key": key, "status": {"$in": ["pending", "done"]}}).sort("created_at", -1).limit(1):
+        if _reusable(job):
+            return {**job, "cached": True}
+
+    job = {
+        "_id": uuid.uuid4().hex,
+        "key": key,
+        "dataset": dataset,
+        "filters": filters,
+        "status": "pending",
+        "path": os.path.join(PDF_CACHE_DIR, f"{key}.pdf"),
+        "created_at": datetime.now(timezone.utc),
+    }
+    # Rendered right after a write, the file may miss it on a lagging secondary
+    last_write = version.get("updated_at")
+    job["settled"] = last_write is None or job["created_at"] - _as_utc(last_write) >= timedelta(
+        seconds=ANALYTICS_LAG_SECONDS
+    )
+    pdf_jobs.insert_one(job)
+    future = get_executor().submit(render_report, dataset, filters, job["path"])
+    future.add_done_callback(partial(_finish, job["_id"]))
+    return {**job, "cached": False}
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    return pdf_jobs.find_one({"_id": job_id})
+
+
+def job_status(job: dict) -> dict:
+    status = {
+        "job_id": job["_id"],
+        "dataset": job["dataset"],
+        "filters": job.get("filters", {}),
+        "status": job["status"],
+        "cached": job.get("cached", False),
+        "created_at": job["created_at"],
+    }
+    for field in ("finished_at", "rows", "pages", "truncated", "size_bytes", "error"):
+        if field in job:
+            status[field] = job[field]
+    if job["status"] == "done":
+        status["download_url"] = f"/reports/pdf/{job['_id']}/download"
+    return status
+
+
+def required_roles(dataset: str) -> Optional[List[UserRole]]:
+    return DATASETS[dataset]["roles"]
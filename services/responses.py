@@ -0,0 +1,38 @@
+"""Fast serialization for large list responses.
+
+Endpoints that return many documents skip FastAPI's response_model pass
+(validate, convert to JSON-compatible Python, then json.dumps) and hand the
+documents straight to orjson. ObjectIds are converted during serialization,
+so the handlers no longer rewrite ``_id`` document by document. Where a model
+defines the response shape, a TypeAdapter compiled once at import validates
+and serializes in a single pydantic-core pass instead.
+"""
+from typing import Any, Iterable
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from starlette.responses import Response
+
+
+def _default(value: Any):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class MongoJSONResponse(ORJSONResponse):
+    """orjson response that also serializes ObjectIds (as strings)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def validated_response(adapter: TypeAdapter, documents: Iterable[dict]) -> Response:
+    """Validate documents against a precompiled adapter and serialize them in Rust"""
+    return Response(adapter.dump_json(adapter.validate_python(documents)), media_type="application/json")
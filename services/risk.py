@@ -0,0 +1,25 @@
+"""Risk levels as ordered numbers, for aggregations over risk assessments.
+
+Shared by routers/victims.py and scripts/backfill_watchlist.py, so "rose" and
+"escalated" are plain comparisons in both.
+"""
+from models.victim import RiskLevel
+
+
+def risk_rank(level: str) -> dict:
+    """Expression ranking a risk level (field path or literal) as 1 (low) to 3 (high)"""
+    return {
+        "$switch": {
+            "branches": [
+                {"case": {"$eq": [level, RiskLevel.HIGH.value]}, "then": 3},
+                {"case": {"$eq": [level, RiskLevel.MEDIUM.value]}, "then": 2},
+            ],
+            "default": 1,
+        }
+    }
+
+
+RISK_RANK = risk_rank("$risk_level")
+# Level names indexed by rank
+RANK_NAMES = [None, RiskLevel.LOW.value, RiskLevel.MEDIUM.value, RiskLevel.HIGH.value]
+LEVEL_ORDER = RANK_NAMES[1:]
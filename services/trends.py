@@ -0,0 +1,194 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.stats import median_abs_deviation
+from statsmodels.tsa.seasonal import STL
+
+from services.analytics_engine import snapshot
+
+# Pandas period frequency and seasonal cycle length for each bucket size.
+# "W-SUN" periods end on Sunday, i.e. ISO weeks starting on Monday.
+PERIODS = {
+    "day": ("D", 7),
+    "week": ("W-SUN", 52),
+    "month": ("M", 12),
+}
+GROUP_DIMENSIONS = ["violation_type", "country"]
+
+
+# === Series fitting ===
+def _fit(counts: np.ndarray, seasonal_period: int, window: int) -> Dict[str, np.ndarray]:
+    """Rolling mean, STL decomposition and robust z-scores against a causal baseline
+
+    STL needs two full seasonal cycles; shorter series get no seasonal
+    component. Each bucket is scored against what the previous buckets predict
+    (rolling median of the deseasonalized counts plus last cycle's seasonal
+    value), so a spike in the newest bucket is not absorbed into the trend.
+    """
+    series = pd.Series(counts, dtype=float)
+    rolling_mean = series.rolling(window, min_periods=1).mean().to_numpy()
+
+    if len(series) >= 2 * seasonal_period + 1:
+        fit = STL(series, period=seasonal_period, robust=True).fit()
+        trend, seasonal = fit.trend.to_numpy(), fit.seasonal.to_numpy()
+    else:
+        trend = series.rolling(window, min_periods=1, center=True).median().to_numpy()
+        seasonal = np.zeros(len(series))
+
+    seasonal_prior = pd.Series(seasonal).shift(seasonal_period).fillna(0.0)
+    baseline = (series - seasonal).shift(1).rolling(window, min_periods=1).median()
+    expected = (baseline + seasonal_prior).fillna(series).to_numpy()
+    residual = series.to_numpy() - expected
+
+    scale = median_abs_deviation(residual, scale="normal") if len(residual) > 1 else 0.0
+    if not scale:
+        scale = residual.std() or 1.0
+    zscore = (residual - np.median(residual)) / scale
+
+    return {
+        "rolling_mean": rolling_mean,
+        "trend": trend,
+        "seasonal": seasonal,
+        "expected": expected,
+        "zscore": zscore,
+    }
+
+
+class TrendCache:
+    """Fitted series keyed by (source, period, window, series key)
+
+    A cached fit is reused as long as the series' closed buckets are unchanged,
+    so only series that gained a newly closed bucket (or new data) are refitted.
+    """
+
+    def __init__(self):
+        self._fits: Dict[tuple, Tuple[tuple, Dict[str, np.ndarray]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, fingerprint: tuple, compute) -> Dict[str, np.ndarray]:
+        with self._lock:
+            cached = self._fits.get(key)
+        if cached and cached[0] == fingerprint:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        result = compute()
+        with self._lock:
+            self._fits[key] = (fingerprint, result)
+        return result
+
+
+trend_cache = TrendCache()
+
+
+# === Bucketed series ===
+def _bucketed_counts(
+    source: str, period: str, group_by: List[str], **filters
+) -> Tuple[pd.DataFrame, pd.PeriodIndex]:
+    """Counts per closed bucket for every series, as a zero-filled wide frame"""
+    freq, _ = PERIODS[period]
+    df = snapshot.frames(source)["violations"]
+    for column in ("violation_type", "country"):
+        if filters.get(column):
+            df = df[df[column] == filters[column]]
+    df = df[df["date"].notna()]
+
+    last_closed = pd.Timestamp.utcnow().tz_convert(None).to_period(freq) - 1
+    buckets = df["date"].dt.to_period(freq)
+    df = df.assign(bucket=buckets)[buckets <= last_closed]
+    if df.empty:
+        return pd.DataFrame(), pd.PeriodIndex([], freq=freq)
+
+    index = pd.period_range(df["bucket"].min(), last_closed, freq=freq)
+    if group_by:
+        keys = [df[g].astype(str) for g in group_by]
+    else:
+        keys = [pd.Series("all", index=df.index, name="series")]
+    wide = (
+        df.groupby(keys + [df["bucket"]], observed=True)
+        .size()
+        .unstack(level=-1, fill_value=0)
+        .reindex(columns=index, fill_value=0)
+    )
+    return wide, index
+
+
+def compute_trends(
+    source: str = "reports",
+    period: str = "week",
+    group_by: Optional[List[str]] = None,
+    window: int = 4,
+    threshold: float = 3.0,
+    min_count: int = 3,
+    include_points: bool = True,
+    violation_type: Optional[str] = None,
+    country: Optional[str] = None,
+) -> dict:
+    """Fit every series and flag spikes in the most recent closed bucket"""
+    if period not in PERIODS:
+        raise ValueError(f"Period must be one of {list(PERIODS)}")
+    group_by = GROUP_DIMENSIONS if group_by is None else group_by
+    unknown = [g for g in group_by if g not in GROUP_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown group(s) {unknown}; allowed: {GROUP_DIMENSIONS}")
+
+    _, seasonal_period = PERIODS[period]
+    wide, index = _bucketed_counts(
+        source, period, group_by, violation_type=violation_type, country=country
+    )
+    bucket_starts = [p.start_time.date().isoformat() for p in index]
+
+    series_out, alerts = [], []
+    for key, row in wide.iterrows():
+        key = key if isinstance(key, tuple) else (key,)
+        counts = row.to_numpy(dtype=np.int64)
+        # Drop leading empty buckets so every series starts at its first event
+        first = int(np.argmax(counts > 0))
+        counts, starts = counts[first:], bucket_starts[first:]
+
+        fit = trend_cache.get(
+            (source, period, window, tuple(group_by), key),
+            (starts[0], starts[-1], counts.tobytes()),
+            lambda: _fit(counts, seasonal_period, window),
+        )
+        spikes = (fit["zscore"] > threshold) & (counts >= min_count)
+
+        labels = dict(zip(group_by, key)) if group_by else {}
+        latest = {
+            "bucket": starts[-1],
+            "count": int(counts[-1]),
+            "rolling_mean": round(float(fit["rolling_mean"][-1]), 3),
+            "zscore": round(float(fit["zscore"][-1]), 3),
+            "spike": bool(spikes[-1]),
+        }
+        entry = {**labels, "latest": latest, "spikes": int(spikes.sum())}
+        if include_points:
+            entry["points"] = [
+                {
+                    "bucket": starts[i],
+                    "count": int(counts[i]),
+                    "rolling_mean": round(float(fit["rolling_mean"][i]), 3),
+                    "trend": round(float(fit["trend"][i]), 3),
+                    "seasonal": round(float(fit["seasonal"][i]), 3),
+                    "expected": round(float(fit["expected"][i]), 3),
+                    "zscore": round(float(fit["zscore"][i]), 3),
+                    "spike": bool(spikes[i]),
+                }
+                for i in range(len(counts))
+            ]
+        series_out.append(entry)
+        if latest["spike"]:
+            alerts.append({**labels, **latest})
+
+    alerts.sort(key=lambda a: a["zscore"], reverse=True)
+    return {
+        "source": source,
+        "period": period,
+        "last_closed_bucket": bucket_starts[-1] if bucket_starts else None,
+        "alerts": alerts,
+        "series": series_out,
+    }
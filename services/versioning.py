@@ -0,0 +1,63 @@
+"""Optimistic concurrency for PATCH endpoints.
+
+Documents carry an integer ``version`` that every update increments. Clients
+send the version they read back as ``If-Match``; the update only matches if
+the document is still at that version, so the check and the write are one
+atomic ``find_one_and_update``. Documents written before versioning have no
+``version`` field and count as version 0.
+"""
+from typing import Optional
+
+from fastapi import HTTPException, Response
+
+INITIAL_VERSION = 1
+
+
+def etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def current_version(doc: dict) -> int:
+    return doc.get("version") or 0
+
+
+def parse_if_match(value: Optional[str]) -> Optional[int]:
+    """Expected version from an If-Match header; None when absent or ``*``"""
+    if value is None or value.strip() == "*":
+        return None
+    tag = value.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    if not tag.isdigit():
+        raise HTTPException(status_code=400, detail="If-Match must be a version ETag such as \"3\"")
+    return int(tag)
+
+
+def version_filter(version: Optional[int]) -> dict:
+    """Query clause that only matches the expected version"""
+    if version is None:
+        return {}
+    # null also matches documents without the field
+    return {"version": version or None}
+
+
+def version_increment() -> dict:
+    return {"$inc": {"version": 1}}
+
+
+def set_etag(response: Response, version: int) -> None:
+    response.headers["ETag"] = etag(version)
+
+
+def raise_for_missing(collection, key: dict, expected: Optional[int], not_found: str):
+    """Explain why a conditional update matched nothing: 404 if the document
+    is gone, otherwise 412 with its current ETag"""
+    doc = collection.find_one(key, {"version": 1})
+    if doc is None or expected is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    raise HTTPException(
+        status_code=412,
+        detail="Document was modified by someone else; reload it and retry",
+        headers={"ETag": etag(current_version(doc))},
+    )
@@ -1,20 +1,20 @@
 import pandas as pd
 import streamlit as st
-import requests
 from datetime import datetime, timezone
 import uuid
 import os
 import json
+import time
 import folium
 from streamlit_folium import st_folium
 import plotly.express as px
 import io
 import base64
 import csv
-from fpdf import FPDF
 
-
-API_BASE = "http://localhost:8000"
+import api_client as api
+import maps
+from api_client import API_BASE
 
 st.set_page_config(page_title="Human Rights MIS", layout="wide")
 st.title("\U0001f6e1️ Human Rights Monitor MIS")
@@ -22,7 +22,6 @@ st.title("\U0001f6e1️ Human Rights Monitor MIS")
 ACCESS_CODES = {"Lawyer": "LEGAL123", "Admin": "ADMIN123"}
 
 import streamlit as st
-import requests
 import json
 from datetime import datetime, date
 from typing import Optional, Dict, Any
@@ -246,22 +245,10 @@ def prepare_victim_data(victim_type, anonymous, pseudonym, gender, age, ethnicit
 def submit_victim_data(victim_data):
     """Submit victim data to the API"""
     try:
-        # Replace with your actual API endpoint
-        API_BASE_URL = "http://your-api-base-url"  # Update this
-
         # You'll need to get the auth token (implement based on your auth system)
         auth_token = get_auth_token()  # Implement this function
 
-        headers = {
-            "Authorization": f"Bearer {auth_token}",
-            "Content-Type": "application/json"
-        }
-
-        response = requests.post(
-            f"{API_BASE_URL}/victims/",
-            headers=headers,
-            json=victim_data
-        )
+        response = api.post("/victims/", token=auth_token, json=victim_data)
 
         if response.status_code == 200:
             st.success("✅ Victim/Witness record created successfully!")
@@ -273,12 +260,37 @@ def submit_victim_data(victim_data):
     except Exception as e:
         st.error(f"❌ Error submitting data: {str(e)}")
 
+def keyset_cursor(key, filters, load):
+    """(shown, after) for a listing paged with the API's `after` cursor
+
+    Nothing is shown until the first `load` (its Load button); loading again
+    or changing the filters goes back to the first page.
+    """
+    state = st.session_state.setdefault(f"pages_{key}", {"shown": False, "filters": None, "cursors": [None]})
+    if load or state["filters"] != filters:
+        state.update(shown=state["shown"] or load, filters=filters, cursors=[None])
+    return state["shown"], state["cursors"][-1]
+
+
+def keyset_controls(key, next_after):
+    """Previous/next buttons; `next_after` is the page's X-Next-After header"""
+    cursors = st.session_state[f"pages_{key}"]["cursors"]
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        if len(cursors) > 1:
+            st.button("◀ Previous", key=f"previous_{key}", on_click=cursors.pop)
+    with col2:
+        if next_after:
+            st.button("Next ▶", key=f"next_{key}", on_click=cursors.append, args=(next_after,))
+    with col3:
+        st.caption(f"Page {len(cursors)}")
+
 def list_victims_interface():
     """Interface to list and filter victims"""
     st.subheader("📋 Victim/Witness List")
 
     # Filters
-    col1, col2, col3, col4 = st.columns(4)
+    col1, col2, col3 = st.columns(3)
 
     with col1:
         risk_filter = st.selectbox("Filter by Risk Level", ["All", "low", "medium", "high"])
@@ -287,29 +299,25 @@ def list_victims_interface():
         type_filter = st.selectbox("Filter by Type", ["All", "victim", "witness", "both"])
 
     with col3:
-        skip = st.number_input("Skip records", min_value=0, value=0)
-
-    with col4:
         limit = st.number_input("Limit records", min_value=1, max_value=100, value=10)
 
-    if st.button("Load Victims", type="primary"):
-        load_victims_list(risk_filter, type_filter, skip, limit)
+    load = st.button("Load Victims", type="primary")
+    active, after = keyset_cursor("victims_list", (risk_filter, type_filter, limit), load)
+    if active:
+        load_victims_list(risk_filter, type_filter, limit, after)
 
-def load_victims_list(risk_filter, type_filter, skip, limit):
-    """Load and display victims list"""
+def load_victims_list(risk_filter, type_filter, limit, after=None):
+    """Load and display one page of the victims list"""
     try:
-        API_BASE_URL = "http://your-api-base-url"  # Update this
         auth_token = get_auth_token()  # Implement this function
 
-        headers = {"Authorization": f"Bearer {auth_token}"}
-
-        params = {"skip": skip, "limit": limit}
+        params = {"limit": limit, "after": after}
         if risk_filter != "All":
             params["risk_level"] = risk_filter
         if type_filter != "All":
             params["victim_type"] = type_filter
 
-        response = requests.get(f"{API_BASE_URL}/victims/", headers=headers, params=params)
+        response = api.get("/victims/", params=params, token=auth_token)
 
         if response.status_code == 200:
             victims = response.json()
@@ -338,6 +346,7 @@ def load_victims_list(risk_filter, type_filter, skip, limit):
                             st.write(f"**Notes:** {victim.get('notes')}")
             else:
                 st.info("No victims/witnesses found with the current filters.")
+            keyset_controls("victims_list", response.next_after)
 
         else:
             st.error(f"Error loading data: {response.status_code}")
@@ -357,12 +366,9 @@ def victims_by_case_interface():
 def search_victims_by_case(case_id):
     """Search for victims associated with a specific case"""
     try:
-        API_BASE_URL = "http://your-api-base-url"  # Update this
         auth_token = get_auth_token()  # Implement this function
 
-        headers = {"Authorization": f"Bearer {auth_token}"}
-
-        response = requests.get(f"{API_BASE_URL}/victims/case/{case_id}", headers=headers)
+        response = api.get(f"/victims/case/{case_id}", token=auth_token)
 
         if response.status_code == 200:
             victims = response.json()
@@ -394,12 +400,9 @@ def risk_history_interface():
 def get_risk_history(victim_id):
     """Get risk assessment history for a victim"""
     try:
-        API_BASE_URL = "http://your-api-base-url"  # Update this
         auth_token = get_auth_token()  # Implement this function
 
-        headers = {"Authorization": f"Bearer {auth_token}"}
-
-        response = requests.get(f"{API_BASE_URL}/victims/{victim_id}/risk-history", headers=headers)
+        response = api.get(f"/victims/{victim_id}/risk-history", token=auth_token)
 
         if response.status_code == 200:
             history = response.json()
@@ -432,6 +435,29 @@ def get_auth_token():
         st.error("Authentication required. Please log in first.")
         return None
 
+def show_incident_map(clusters_res, points_path, points_params, key):
+    """Draw point-level geodata, or server-side clusters when there are too many points"""
+    if not clusters_res.ok or not clusters_res.json()["total"]:
+        st.info("No geographic data available yet.")
+        return
+
+    summary = clusters_res.json()
+    if summary["total"] <= maps.MAP_POINT_LIMIT:
+        points = api.get(points_path, params=points_params)
+        m = maps.incident_map(points.json() if points.ok else [])
+    else:
+        st.caption(
+            f"{summary['total']:,} incidents, grouped into "
+            f"{summary['cell']}° cells on the server."
+        )
+        m = maps.cluster_map(summary["clusters"])
+
+    if m is None:
+        st.info("No geographic data available yet.")
+        return
+    # Nothing is read back from the map, so panning does not trigger reruns
+    st_folium(m, width=1000, height=600, key=key, returned_objects=[])
+
 # Integration with your existing code
 def main():
     """Main function showing how to integrate with your existing radio button logic"""
@@ -495,25 +521,58 @@ def generate_csv_download(data, filename="export.csv"):
     return href
 
 
-def generate_pdf_download(data, title="Report", filename="report.pdf"):
-    pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
-    pdf.set_font("Arial", "B", size=14)
-    pdf.cell(200, 10, txt=title, ln=True, align="C")
-    pdf.set_font("Arial", size=12)
-    pdf.ln(10)
-
-    for item in data:
-        for key, val in item.items():
-            pdf.multi_cell(0, 10, f"{key.title()}: {val}")
-        pdf.ln(5)
-
-    pdf_data = pdf.output(dest="S").encode("latin-1")
-    b64 = base64.b64encode(pdf_data).decode()
-
-    href = f'<a href="data:application/pdf;base64,{b64}" download="{filename}"> Download PDF</a>'
-    return href
+def pdf_export(dataset, filters, key, token=None):
+    """Ask the API to render a PDF of `dataset` and offer the file once it is ready"""
+    state_key = f"pdf_job_{key}"
+    if st.button("Prepare PDF", key=f"prepare_pdf_{key}"):
+        res = api.post(
+            "/reports/pdf", json={"dataset": dataset, "filters": filters}, token=token
+        )
+        if res.ok:
+            st.session_state[state_key] = res.json()["job_id"]
+        else:
+            st.error(f" Error requesting PDF: {res.text}")
+    if st.session_state.get(state_key):
+        pdf_job_status(st.session_state[state_key], token)
+
+
+def pdf_job_status(job_id, token=None, wait_seconds=120):
+    # Poll in place; a second "Prepare PDF" click resumes the same job
+    placeholder = st.empty()
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        res = api.get(f"/reports/pdf/{job_id}", token=token, cache=False)
+        if not res.ok:
+            placeholder.error(f" Error checking PDF: {res.text}")
+            return
+        job = res.json()
+        if job["status"] != "pending":
+            break
+        if time.monotonic() > deadline:
+            placeholder.info(" Still rendering. Click Prepare PDF again to check on it.")
+            return
+        placeholder.info(" Rendering PDF on the server...")
+        time.sleep(1)
+    placeholder.empty()
+
+    if job["status"] == "failed":
+        st.error(f" PDF generation failed: {job.get('error')}")
+    else:
+        filename = f"{job['dataset']}.pdf"
+        if token:
+            data = api.download(job["download_url"], token=token)
+            if data is None:
+                st.error(" PDF is no longer available; prepare it again.")
+                return
+            st.download_button(
+                " Download PDF", data, file_name=filename,
+                mime="application/pdf", key=f"download_{job_id}",
+            )
+        else:
+            # Public datasets are fetched by the browser straight from the API
+            st.link_button(" Download PDF", f"{API_BASE}{job['download_url']}")
+        truncated = " (truncated)" if job.get("truncated") else ""
+        st.caption(f"{job['rows']:,} rows, {job['pages']} pages{truncated}")
 
 
 # Create media directory if it doesn't exist
@@ -686,8 +745,8 @@ if "\U0001f4c1 Case Management" in available_tabs:
                         }
 
                         # Send to FastAPI
-                        res = requests.post(
-                            f"{API_BASE}/cases/",
+                        res = api.post(
+                            "/cases/",
                             data={"case": json.dumps(data)},
                             files=upload_tuples,
                         )
@@ -737,7 +796,7 @@ if "\U0001f4c1 Case Management" in available_tabs:
             if violation_filter != "All":
                 params["violation"] = violation_filter
 
-            res = requests.get(f"{API_BASE}/cases/", params=params)
+            res = api.get("/cases/", params=params)
             if res.ok:
                 cases = res.json()
                 if not cases:
@@ -763,10 +822,7 @@ if "\U0001f4c1 Case Management" in available_tabs:
                 generate_csv_download(flat_cases, filename="cases.csv"),
                 unsafe_allow_html=True,
             )
-            st.markdown(
-                generate_pdf_download(flat_cases, title="Cases", filename="cases.pdf"),
-                unsafe_allow_html=True,
-            )
+            pdf_export("cases", params, key="cases")
 
             for case in cases:
                 with st.expander(
@@ -831,7 +887,7 @@ if "\U0001f4c1 Case Management" in available_tabs:
 
         elif cm_tab == " Edit Case" and role == "Admin":
             st.subheader("Edit Case Status")
-            res = requests.get(f"{API_BASE}/cases/")
+            res = api.get("/cases/")
             if res.ok:
                 cases = res.json()
                 case_options = {
@@ -843,10 +899,10 @@ if "\U0001f4c1 Case Management" in available_tabs:
                 )
                 case_id = case_options[selected_case]
 
-                current_status = next(
-                    (case["status"] for case in cases if case["case_id"] == case_id),
-                    "new",
+                selected = next(
+                    (case for case in cases if case["case_id"] == case_id), {}
                 )
+                current_status = selected.get("status", "new")
                 new_status = st.selectbox(
                     "Update Status",
                     ["new", "under_investigation", "resolved"],
@@ -857,20 +913,28 @@ if "\U0001f4c1 Case Management" in available_tabs:
                 )
 
                 if st.button("Update Case Status"):
-                    res = requests.patch(
-                        f"{API_BASE}/cases/{case_id}", params={"status": new_status}
+                    res = api.patch(
+                        f"/cases/{case_id}",
+                        params={"status": new_status},
+                        headers={"If-Match": f'"{selected.get("version", 0)}"'},
                     )
                     if res.ok:
                         st.success(" Case status updated successfully!")
+                    elif res.status_code == 412:
+                        st.warning(
+                            " This case was changed by someone else. Reload and try again."
+                        )
                     else:
                         st.error(f" Error updating case: {res.text}")
 
         elif cm_tab == " Delete Case" and role == "Admin":
             st.subheader("Delete Case")
             st.warning(
-                " This action cannot be undone. Deleted cases cannot be recovered."
+                " The case and its status history move to the archive. They no"
+                " longer appear in case lists or analytics unless archived cases"
+                " are included."
             )
-            res = requests.get(f"{API_BASE}/cases/")
+            res = api.get("/cases/")
             if res.ok:
                 cases = res.json()
                 case_options = {
@@ -883,9 +947,9 @@ if "\U0001f4c1 Case Management" in available_tabs:
                 case_id = case_options[selected_case]
 
                 if st.button("Confirm Delete"):
-                    res = requests.delete(f"{API_BASE}/cases/{case_id}")
+                    res = api.delete(f"/cases/{case_id}")
                     if res.ok:
-                        st.success(" Case deleted successfully!")
+                        st.success(" Case archived successfully!")
                     else:
                         st.error(f" Error deleting case: {res.text}")
 
@@ -1038,8 +1102,8 @@ if "\U0001f4cb Incident Reporting" in available_tabs:
                                 )
 
                             # Submit report
-                            res = requests.post(
-                                f"{API_BASE}/reports/",
+                            res = api.post(
+                                "/reports/",
                                 data=form_data,
                                 files=files_to_upload,
                             )
@@ -1061,19 +1125,19 @@ if "\U0001f4cb Incident Reporting" in available_tabs:
                 )
 
             with col2:
-                selected_location = st.text_input("Location (Country or City)")
+                selected_country = st.text_input("Country")
             with col3:
                 selected_date = st.date_input("Filter by Incident Date", value=None)
 
             params = {}
             if selected_status != "All":
                 params["status"] = selected_status
-            if selected_location:
-                params["location"] = selected_location
+            if selected_country:
+                params["country"] = selected_country
             if selected_date:
                 params["date"] = selected_date.isoformat()
 
-            res = requests.get(f"{API_BASE}/reports/", params=params)
+            res = api.get("/reports/", params=params)
             if res.ok:
                 reports = res.json()
                 if not reports:
@@ -1104,14 +1168,8 @@ if "\U0001f4cb Incident Reporting" in available_tabs:
                         ),
                         unsafe_allow_html=True,
                     )
-                    st.markdown(
-                        generate_pdf_download(
-                            flat_reports,
-                            title="Incident Reports",
-                            filename="incident_reports.pdf",
-                        ),
-                        unsafe_allow_html=True,
-                    )
+                    # Same filters as the listing above
+                    pdf_export("reports", params, key="reports")
 
                     for report in reports:
                         d = report["incident_details"]
@@ -1185,8 +1243,18 @@ if "\U0001f4cb Incident Reporting" in available_tabs:
                                         )
 
         elif ir_tab == " Analytics":
+            # The three aggregates are independent, so fetch them together
+            results = api.fetch_all({
+                "violations": ("/reports/analytics", None),
+                "timeline": ("/reports/analytics/timeline", None),
+                "geo_clusters": (
+                    "/analytics/geodata/clusters",
+                    {"source": "reports", "cell": maps.SERVER_CLUSTER_CELL_DEGREES},
+                ),
+            })
+
             st.subheader(" Violation Types Distribution")
-            res = requests.get(f"{API_BASE}/reports/analytics")
+            res = results["violations"]
             if res.ok and res.json():
                 df = pd.DataFrame(res.json())
                 df = df.rename(
@@ -1207,7 +1275,7 @@ if "\U0001f4cb Incident Reporting" in available_tabs:
                 st.info("No violation data available yet.")
 
             st.subheader(" Timeline of Reports")
-            res2 = requests.get(f"{API_BASE}/reports/analytics/timeline")
+            res2 = results["timeline"]
             if res2.ok and res2.json():
                 timeline_df = pd.DataFrame(res2.json())
                 timeline_df["date"] = pd.to_datetime(timeline_df["date"])
@@ -1223,36 +1291,12 @@ if "\U0001f4cb Incident Reporting" in available_tabs:
                 st.info("No timeline data available.")
 
             st.subheader(" Incident Heatmap")
-            geo = requests.get(f"{API_BASE}/reports/analytics/geodata")
-            if geo.ok and geo.json():
-                geo_df = pd.DataFrame(geo.json())
-                if not geo_df.empty:
-                    m = folium.Map(
-                        location=[geo_df["lat"].mean(), geo_df["lon"].mean()],
-                        zoom_start=5,
-                    )
-
-                    # Add heatmap
-                    from folium.plugins import HeatMap
-
-                    heat_data = [
-                        [row["lat"], row["lon"]] for index, row in geo_df.iterrows()
-                    ]
-                    HeatMap(heat_data).add_to(m)
-
-                    # Add individual markers
-                    for _, row in geo_df.iterrows():
-                        folium.Marker(
-                            location=[row["lat"], row["lon"]],
-                            tooltip=row.get("description", "Incident")[:50],
-                            popup=f"<b>Violations:</b> {', '.join(row.get('violations', []))}<br><b>Date:</b> {row.get('date', 'N/A')}",
-                        ).add_to(m)
-
-                    st_folium(m, width=1000, height=600, key="analytics_map")
-                else:
-                    st.info("No geodata available yet.")
-            else:
-                st.info("No geodata available yet.")
+            show_incident_map(
+                results["geo_clusters"],
+                "/reports/analytics/geodata",
+                None,
+                key="reports_analytics_map",
+            )
 
 
 if "\U0001f5a5 Victim/Witness Database" in available_tabs and role == "Admin":
@@ -1400,11 +1444,10 @@ if "\U0001f5a5 Victim/Witness Database" in available_tabs and role == "Admin":
 
                         # Submit to API
                         try:
-                            headers = {"Authorization": f"Bearer {st.session_state.get('access_code', '')}"}
-                            res = requests.post(
-                                f"{API_BASE}/victims/",
+                            res = api.post(
+                                "/victims/",
                                 json=victim_data,
-                                headers=headers
+                                token=st.session_state.get('access_code', '')
                             )
 
                             if res.ok:
@@ -1419,26 +1462,36 @@ if "\U0001f5a5 Victim/Witness Database" in available_tabs and role == "Admin":
             st.subheader("View Victim/Witness Records")
 
             # Filters
-            col1, col2, col3, col4 = st.columns(4)
+            col1, col2, col3 = st.columns(3)
             with col1:
                 type_filter = st.selectbox("Type", ["All", "victim", "witness", "both"])
             with col2:
                 risk_filter = st.selectbox("Risk Level", ["All", "low", "medium", "high"])
             with col3:
-                skip = st.number_input("Skip", min_value=0, value=0)
-            with col4:
                 limit = st.number_input("Limit", min_value=1, max_value=100, value=10)
 
-            if st.button("Load Records"):
-                params = {"skip": skip, "limit": limit}
+            # The PDF covers every record matching the filters, not just this page
+            pdf_filters = {}
+            if type_filter != "All":
+                pdf_filters["victim_type"] = type_filter
+            if risk_filter != "All":
+                pdf_filters["risk_level"] = risk_filter
+            pdf_export(
+                "victims", pdf_filters, key="victims",
+                token=st.session_state.get('access_code', ''),
+            )
+
+            load = st.button("Load Records")
+            active, after = keyset_cursor("victim_records", (type_filter, risk_filter, limit), load)
+            if active:
+                params = {"limit": limit, "after": after}
                 if type_filter != "All":
                     params["victim_type"] = type_filter
                 if risk_filter != "All":
                     params["risk_level"] = risk_filter
 
                 try:
-                    headers = {"Authorization": f"Bearer {st.session_state.get('access_code', '')}"}
-                    res = requests.get(f"{API_BASE}/victims/", params=params, headers=headers)
+                    res = api.get("/victims/", params=params, token=st.session_state.get('access_code', ''))
 
                     if res.ok:
                         victims = res.json()
@@ -1468,14 +1521,6 @@ if "\U0001f5a5 Victim/Witness Database" in available_tabs and role == "Admin":
                                 generate_csv_download(flat_victims, filename="victim_records.csv"),
                                 unsafe_allow_html=True,
                             )
-                            st.markdown(
-                                generate_pdf_download(
-                                    flat_victims,
-                                    title="Victim/Witness Records",
-                                    filename="victim_records.pdf"
-                                ),
-                                unsafe_allow_html=True,
-                            )
 
                             # Display records
                             for victim in victims:
@@ -1551,6 +1596,7 @@ if "\U0001f5a5 Victim/Witness Database" in available_tabs and role == "Admin":
                                     # Timestamps
                                     if victim.get("created_at"):
                                         st.caption(f"Created: {victim['created_at']}")
+                        keyset_controls("victim_records", res.next_after)
                     else:
                         st.error(f"❌ Error loading records: {res.text}")
                 except Exception as e:
@@ -1577,8 +1623,7 @@ if "\U0001f5a5 Victim/Witness Database" in available_tabs and role == "Admin":
                 if st.button("Delete Record", type="secondary"):
                     if confirm_delete:
                         try:
-                            headers = {"Authorization": f"Bearer {st.session_state.get('access_code', '')}"}
-                            res = requests.delete(f"{API_BASE}/victims/{victim_id}", headers=headers)
+                            res = api.delete(f"/victims/{victim_id}", token=st.session_state.get('access_code', ''))
 
                             if res.ok:
                                 st.success("✅ Record deleted successfully!")
@@ -1598,128 +1643,135 @@ if "\U0001f5a5 Analytics Dashboard" in available_tabs:
     with tabs[available_tabs.index("\U0001f5a5 Analytics Dashboard")]:
         st.header("\U0001f5a5 System Analytics Dashboard")
 
-        # Summary statistics
-        st.subheader("\U0001f4ca System Overview")
-        res = requests.get(f"{API_BASE}/analytics/summary")
-        if res.ok:
-            stats = res.json()
+        # Each section gets a container; its controls are drawn first so every
+        # request is known up front and the four calls can run concurrently.
+        overview_section = st.container()
+        violations_section = st.container()
+        timeline_section = st.container()
+        geo_section = st.container()
+
+        with overview_section:
+            st.subheader("\U0001f4ca System Overview")
+
+        with violations_section:
+            st.subheader("\U0001f4c8 Violation Analysis")
             col1, col2 = st.columns(2)
             with col1:
-                st.metric("Total Cases", stats["cases"]["total"])
-                st.metric("Total Reports", stats["reports"]["total"])
+                source = st.selectbox("Data Source", ["reports", "cases"])
             with col2:
-                st.write("**Case Status Distribution**")
-                case_status_df = pd.DataFrame(stats["cases"]["by_status"])
-                if not case_status_df.empty:
-                    st.bar_chart(case_status_df.set_index("_id"))
-
-                st.write("**Report Status Distribution**")
-                report_status_df = pd.DataFrame(stats["reports"]["by_status"])
-                if not report_status_df.empty:
-                    st.bar_chart(report_status_df.set_index("_id"))
-
-        # Violation analysis
-        st.subheader("\U0001f4c8 Violation Analysis")
-        col1, col2 = st.columns(2)
-        with col1:
-            source = st.selectbox("Data Source", ["reports", "cases"])
-        with col2:
-            time_range = st.selectbox(
-                "Time Range", ["All", "7 days", "30 days", "90 days"]
-            )
+                time_range = st.selectbox(
+                    "Time Range", ["All", "7 days", "30 days", "90 days"]
+                )
 
         days = None
         if time_range != "All":
             days = int(time_range.split()[0])
 
-        res = requests.get(
-            f"{API_BASE}/analytics/violations", params={"source": source, "days": days}
-        )
-        if res.ok and res.json():
-            df = pd.DataFrame(res.json())
-            df = df.rename(
-                columns={"violation_type": "Violation Type", "count": "Count"}
-            )
-            df["Violation Type"] = (
-                df["Violation Type"].str.replace("_", " ").str.title()
-            )
-
-            fig = px.pie(
-                df,
-                values="Count",
-                names="Violation Type",
-                title=f"Violation Types Distribution ({source.title()})",
-            )
-            st.plotly_chart(fig, use_container_width=True)
-
-            fig2 = px.bar(
-                df,
-                x="Violation Type",
-                y="Count",
-                title=f"Violation Types Count ({source.title()})",
-                color="Violation Type",
-            )
-            st.plotly_chart(fig2, use_container_width=True)
-        else:
-            st.info("No violation data available yet.")
-
-        # Timeline analysis
-        st.subheader("\U0001f4c6 Timeline Analysis")
-        col1, col2 = st.columns(2)
-        with col1:
-            timeline_source = st.selectbox("Timeline Source", ["reports", "cases"])
-        with col2:
-            time_group = st.selectbox("Group By", ["day", "week", "month", "year"])
+        with timeline_section:
+            st.subheader("\U0001f4c6 Timeline Analysis")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                timeline_source = st.selectbox("Timeline Source", ["reports", "cases"])
+            with col2:
+                time_group = st.selectbox("Group By", ["day", "week", "month", "year"])
+            with col3:
+                split_by_violation = st.checkbox("Split by violation type")
+
+        timeline_params = {"source": timeline_source, "time_period": time_group}
+        if split_by_violation:
+            timeline_params["group_by"] = "violation_type"
+
+        with geo_section:
+            st.subheader("\U0001f5fa Geographic Distribution")
+            geo_source = st.selectbox("Map Source", ["reports", "cases"])
+
+        results = api.fetch_all({
+            "summary": ("/analytics/summary", None),
+            "violations": ("/analytics/violations", {"source": source, "days": days}),
+            "timeline": ("/analytics/timeline", timeline_params),
+            "geo_clusters": (
+                "/analytics/geodata/clusters",
+                {"source": geo_source, "cell": maps.SERVER_CLUSTER_CELL_DEGREES},
+            ),
+        })
 
-        res = requests.get(
-            f"{API_BASE}/analytics/timeline",
-            params={"source": timeline_source, "time_period": time_group},
-        )
-        if res.ok and res.json():
-            timeline_df = pd.DataFrame(res.json())
-            timeline_df["date"] = pd.to_datetime(timeline_df["date"])
-
-            fig = px.line(
-                timeline_df,
-                x="date",
-                y="count",
-                title=f"{timeline_source.title()} Over Time (Grouped by {time_group})",
-                labels={"date": "Date", "count": "Count"},
-            )
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("No timeline data available yet.")
+        # Summary statistics
+        with overview_section:
+            res = results["summary"]
+            if res.ok:
+                stats = res.json()
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("Total Cases", stats["cases"]["total"])
+                    st.metric("Total Reports", stats["reports"]["total"])
+                with col2:
+                    st.write("**Case Status Distribution**")
+                    case_status_df = pd.DataFrame(stats["cases"]["by_status"])
+                    if not case_status_df.empty:
+                        st.bar_chart(case_status_df.set_index("_id"))
 
-        # Geographic analysis
-        st.subheader("\U0001f5fa Geographic Distribution")
-        geo_source = st.selectbox("Map Source", ["reports", "cases"])
+                    st.write("**Report Status Distribution**")
+                    report_status_df = pd.DataFrame(stats["reports"]["by_status"])
+                    if not report_status_df.empty:
+                        st.bar_chart(report_status_df.set_index("_id"))
 
-        res = requests.get(
-            f"{API_BASE}/analytics/geodata", params={"source": geo_source}
-        )
-        if res.ok and res.json():
-            geo_df = pd.DataFrame(res.json())
+        # Violation analysis
+        with violations_section:
+            res = results["violations"]
+            if res.ok and res.json():
+                df = pd.DataFrame(res.json())
+                df = df.rename(
+                    columns={"violation_type": "Violation Type", "count": "Count"}
+                )
+                df["Violation Type"] = (
+                    df["Violation Type"].str.replace("_", " ").str.title()
+                )
 
-            m = folium.Map(
-                location=[geo_df["lat"].mean(), geo_df["lon"].mean()],
-                zoom_start=5,
-            )
+                fig = px.pie(
+                    df,
+                    values="Count",
+                    names="Violation Type",
+                    title=f"Violation Types Distribution ({source.title()})",
+                )
+                st.plotly_chart(fig, use_container_width=True)
 
-            # Add heatmap
-            from folium.plugins import HeatMap
+                fig2 = px.bar(
+                    df,
+                    x="Violation Type",
+                    y="Count",
+                    title=f"Violation Types Count ({source.title()})",
+                    color="Violation Type",
+                )
+                st.plotly_chart(fig2, use_container_width=True)
+            else:
+                st.info("No violation data available yet.")
 
-            heat_data = [[row["lat"], row["lon"]] for _, row in geo_df.iterrows()]
-            HeatMap(heat_data).add_to(m)
+        # Timeline analysis
+        with timeline_section:
+            res = results["timeline"]
+            if res.ok and res.json():
+                timeline_df = pd.DataFrame(res.json())
+                timeline_df["date"] = pd.to_datetime(timeline_df["date"])
 
-            # Add markers
-            for _, row in geo_df.iterrows():
-                folium.Marker(
-                    [row["lat"], row["lon"]],
-                    tooltip=f"{', '.join(row['violations'])}",
-                    popup=row["description"],
-                ).add_to(m)
+                fig = px.line(
+                    timeline_df,
+                    x="date",
+                    y="count",
+                    color="series" if split_by_violation else None,
+                    hover_data=["label"],
+                    title=f"{timeline_source.title()} Over Time (Grouped by {time_group})",
+                    labels={"date": "Date", "count": "Count", "series": "Violation Type"},
+                )
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.info("No timeline data available yet.")
 
-            st_folium(m, width=1000, height=600, key="analytics_map")
-        else:
-            st.info("No geographic data available yet.")
+        # Geographic analysis
+        with geo_section:
+            show_incident_map(
+                results["geo_clusters"],
+                "/analytics/geodata",
+                {"source": geo_source},
+                key="analytics_map",
+            )
 